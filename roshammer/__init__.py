@@ -2,5 +2,35 @@
 """
 roshammer is a fuzzing and random input generation tool for ROS applications.
 """
-from .roshammer import ROSHammer
-from .core import Fuzzer, AppContainer, App
+import importlib
+import sys
+
+# the public classes of the package are imported lazily, since their modules
+# pull in ROSWire, docker-py, and NumPy, which are slow to import and are not
+# needed by every entry point (e.g., the command-line interface).
+_LAZY_ATTRIBUTES = {
+    'ROSHammer': '.roshammer',
+    'Fuzzer': '.core',
+    'AppContainer': '.core',
+    'App': '.core'
+}
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
+
+
+# module-level __getattr__ is only supported by Python 3.7 onwards
+if sys.version_info < (3, 7):
+    from .roshammer import ROSHammer
+    from .core import Fuzzer, AppContainer, App
@@ -2,29 +2,104 @@
 """
 This module provides functionality for fuzzing ROS bags.
 """
-__all__ = ('Bag', 'BagInjector')
+__all__ = ('Bag', 'BagView', 'BagInjector', 'BagSerialiser', 'BAG_OPERATORS',
+           'SingleOrderMutations', 'calibrate_playback', 'normalise_mutations')
 
-from typing import Sequence, Iterator, Any, Optional, List, Iterable, Tuple
+from typing import (Sequence, Iterator, Any, Optional, List, Iterable, Tuple,
+                    Collection, Dict, FrozenSet, Union, Callable)
+import io
 import os
 import time
 import bisect
+import pickle
 import random
 import tempfile
 import logging
 import threading
 
 import attr
-from roswire.definitions import TypeDatabase, Message
+import numpy as np
+from roswire.definitions import TypeDatabase, Message, Time
 from roswire.bag.core import BagMessage
 from roswire.bag import BagWriter, BagReader
 
-from .core import Input, InputInjector, Mutation, Mutator, AppInstance
+from .core import (Input, InputInjector, Mutation, Mutator, AppInstance,
+                   AppDescription, SeedSerialiser, Fuzzer)
 
 logger: logging.Logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+NSECS_PER_SEC = 1000000000
+
+Positions = Union[range, np.ndarray]
+
+
+def time_to_nsecs(time: Time) -> int:
+    """Converts a given ROS timestamp to nanoseconds.
+
+    Raises
+    ------
+    ValueError
+        if the seconds or nanoseconds of the timestamp are not integral.
+    """
+    secs, nsecs = int(time.secs), int(time.nsecs)
+    if secs != time.secs or nsecs != time.nsecs:
+        raise ValueError(f'timestamp is not integral: {time}')
+    return secs * NSECS_PER_SEC + nsecs
+
+
+def nsecs_to_time(nsecs: int) -> Time:
+    """Converts a given number of nanoseconds to a ROS timestamp."""
+    secs, nsecs = divmod(int(nsecs), NSECS_PER_SEC)
+    return Time(secs=secs, nsecs=nsecs)
+
+
+@attr.s(frozen=True, slots=True, eq=False)
+class BagView(Sequence[BagMessage]):
+    """
+    Provides a read-only view of a subset of the messages within a bag,
+    ordered by their timestamps, without copying those messages.
+
+    Since attrs cannot compare NumPy arrays, views are compared and hashed
+    by hand, via their parent bag and positions.
+    """
+    _bag: 'Bag' = attr.ib(repr=False)
+    _positions: Positions = attr.ib()
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, BagView):
+            return NotImplemented
+        return np.array_equal(self._positions, other._positions) \
+            and (self._bag is other._bag or self._bag == other._bag)
+
+    def __hash__(self) -> int:
+        return hash((self._bag, tuple(int(p) for p in self._positions)))
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return BagView(self._bag, self._positions[index])
+        return self._bag[int(self._positions[index])]
+
+    def __iter__(self) -> Iterator[BagMessage]:
+        bag = self._bag
+        for position in self._positions:
+            yield bag[int(position)]
+
+    @property
+    def positions(self) -> Positions:
+        """The positions of the messages in this view within the bag."""
+        return self._positions
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    """Marks a given array as read-only."""
+    array.flags.writeable = False
+    return array
+
 
-@attr.s(frozen=True, slots=True)
 class Bag(Sequence[BagMessage]):
     """
     Stores the contents of a ROS bag as a sequence of messages, ordered by
@@ -34,8 +109,76 @@ class Bag(Sequence[BagMessage]):
     insertion, swapping) maintain the message ordering invariant: the messages
     within the bag are chronologically by their timestamps, from earliest to
     latest.
+
+    Bags are stored in a columnar form: message payloads are kept in a tuple,
+    while timestamps (in nanoseconds) and topic IDs are kept in compact,
+    read-only NumPy arrays. Topic IDs refer to the sorted tuple of topic names
+    for the bag. Each bag also maintains the positions of the messages that
+    belong to each topic. Operations on a bag update these columns and
+    indices rather than rebuilding them, and timing operations over many
+    messages (e.g., shift, scale, jitter) are performed as a single vectorised
+    operation followed by one stable re-sort.
+
+    Bags are immutable. Since attrs cannot compare NumPy arrays, this class
+    is implemented by hand rather than via attrs.
+
+    Raises
+    ------
+    ValueError
+        if the timestamp of a message is not integral.
     """
-    _contents: Tuple[BagMessage, ...] = attr.ib(converter=tuple)
+    __slots__ = ('_messages', '_times', '_topic_ids', '_topic_names',
+                 '_topics', '_hash', '__weakref__')
+
+    def __init__(self, messages: Iterable[BagMessage] = ()) -> None:
+        if isinstance(messages, Bag):
+            self._init(messages._messages,
+                       messages._times,
+                       messages._topic_ids,
+                       messages._topic_names,
+                       messages._topics)
+            return
+
+        contents = list(messages)
+        names = tuple(sorted({m.topic for m in contents}))
+        topic_to_id = {name: i for i, name in enumerate(names)}
+        times = np.fromiter((time_to_nsecs(m.time) for m in contents),
+                            dtype=np.int64,
+                            count=len(contents))
+        ids = np.fromiter((topic_to_id[m.topic] for m in contents),
+                          dtype=np.int32,
+                          count=len(contents))
+        self._init(tuple(m.message for m in contents), times, ids, names)
+
+    def _init(self,
+              messages: Tuple[Message, ...],
+              times: np.ndarray,
+              topic_ids: np.ndarray,
+              topic_names: Tuple[str, ...],
+              topics: Optional[Dict[str, np.ndarray]] = None
+              ) -> None:
+        if topics is None:
+            topics = {name: _frozen(np.flatnonzero(topic_ids == i))
+                      for i, name in enumerate(topic_names)}
+        self._messages = messages
+        self._times = _frozen(times)
+        self._topic_ids = _frozen(topic_ids)
+        self._topic_names = topic_names
+        self._topics = topics
+        self._hash: Optional[int] = None
+
+    @classmethod
+    def _build(cls,
+               messages: Tuple[Message, ...],
+               times: np.ndarray,
+               topic_ids: np.ndarray,
+               topic_names: Tuple[str, ...],
+               topics: Optional[Dict[str, np.ndarray]] = None
+               ) -> 'Bag':
+        """Constructs a bag directly from its columns."""
+        bag = cls.__new__(cls)
+        bag._init(messages, times, topic_ids, topic_names, topics)
+        return bag
 
     @classmethod
     def load(cls,
@@ -63,18 +206,54 @@ class Bag(Sequence[BagMessage]):
         writer.write(self)
         writer.close()
 
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Bag):
+            return NotImplemented
+        return self._topic_names == other._topic_names \
+            and np.array_equal(self._times, other._times) \
+            and np.array_equal(self._topic_ids, other._topic_ids) \
+            and self._messages == other._messages
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self._messages,
+                               self._times.tobytes(),
+                               self._topic_ids.tobytes(),
+                               self._topic_names))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f'Bag({tuple(self)!r})'
+
     def __len__(self) -> int:
         """Returns the number of messages in the bag."""
-        return len(self._contents)
+        return len(self._messages)
 
-    def __getitem__(self, index: Any) -> BagMessage:
+    def __getitem__(self, index: Any) -> Any:
         """Retrieves the bag message located at a given index."""
         assert type(index) in [slice, int]
-        return self._contents[index]
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        topic = self._topic_names[self._topic_ids[index]]
+        time = nsecs_to_time(self._times[index])
+        message = self._messages[index]
+        return BagMessage(topic=topic, time=time, message=message)
 
     def __iter__(self) -> Iterator[BagMessage]:
         """Returns an iterator over the contents of the bag."""
-        yield from self._contents
+        names = self._topic_names
+        columns = zip(self._topic_ids.tolist(),
+                      self._times.tolist(),
+                      self._messages)
+        for topic_id, nsecs, message in columns:
+            yield BagMessage(topic=names[topic_id],
+                             time=nsecs_to_time(nsecs),
+                             message=message)
+
+    @property
+    def topics(self) -> FrozenSet[str]:
+        """The set of topics to which messages in this bag belong."""
+        return frozenset(self._topic_names)
 
     def delete(self, index: int) -> 'Bag':
         """
@@ -88,12 +267,54 @@ class Bag(Sequence[BagMessage]):
         """
         if index >= len(self):
             raise IndexError
-        return Bag(self[:index] + self[index+1:])
+        topic_id = int(self._topic_ids[index])
+        topic = self._topic_names[topic_id]
+        names = self._topic_names
+        messages = self._messages[:index] + self._messages[index + 1:]
+        times = np.delete(self._times, index)
+        ids = np.delete(self._topic_ids, index)
+
+        topics: Dict[str, np.ndarray] = {}
+        for name, positions in self._topics.items():
+            if name == topic:
+                positions = positions[positions != index]
+                if not len(positions):
+                    continue
+            topics[name] = _frozen(positions - (positions > index))
+
+        # remove the topic if no messages remain on it
+        if topic not in topics:
+            names = names[:topic_id] + names[topic_id + 1:]
+            ids = ids - (ids > topic_id).astype(ids.dtype)
+
+        return Bag._build(messages, times, ids, names, topics)
 
     def insert(self, message: BagMessage) -> 'Bag':
         """Returns a variant of this bag that contains a given message."""
-        i = bisect.bisect(self._contents, message)
-        return Bag(self[:i] + (message,) + self[i:])
+        nsecs = time_to_nsecs(message.time)
+        topic = message.topic
+        i = int(np.searchsorted(self._times, nsecs, side='right'))
+        names = self._topic_names
+        ids = self._topic_ids
+
+        topics: Dict[str, np.ndarray] = \
+            {name: positions + (positions >= i)
+             for name, positions in self._topics.items()}
+        topic_id = bisect.bisect_left(names, topic)
+        if topic not in topics:
+            names = names[:topic_id] + (topic,) + names[topic_id:]
+            ids = ids + (ids >= topic_id).astype(ids.dtype)
+            topics[topic] = np.empty(0, dtype=np.int64)
+        positions = topics[topic]
+        j = int(np.searchsorted(positions, i))
+        topics[topic] = np.insert(positions, j, i)
+        for positions in topics.values():
+            _frozen(positions)
+
+        messages = self._messages[:i] + (message.message,) + self._messages[i:]
+        times = np.insert(self._times, i, nsecs)
+        ids = np.insert(ids, i, topic_id)
+        return Bag._build(messages, times, ids, names, topics)
 
     def replace(self, index: int, replacement: BagMessage) -> 'Bag':
         """
@@ -108,14 +329,185 @@ class Bag(Sequence[BagMessage]):
         messages, given by their indices, are switched.
         """
         i, j = sorted((i, j))
-        mi = self[i]
-        mj = self[j]
-        mi, mj = (attr.evolve(mi, time=mj.time), attr.evolve(mj, time=mi.time))
-        return Bag(self[:i] + (mj,) + self[i + 1:j] + (mi,) + self[j + 1:])
+        m = self._messages
+        messages = m[:i] + (m[j],) + m[i + 1:j] + (m[i],) + m[j + 1:]
+        ids = self._topic_ids.copy()
+        ids[i], ids[j] = ids[j], ids[i]
+
+        topics = self._topics
+        if ids[i] != ids[j]:
+            topics = dict(topics)
+            topic_i = self._topic_names[ids[j]]
+            topic_j = self._topic_names[ids[i]]
+            for topic, old, new in ((topic_i, i, j), (topic_j, j, i)):
+                positions = topics[topic].copy()
+                positions[positions == old] = new
+                positions.sort()
+                topics[topic] = _frozen(positions)
+        return Bag._build(messages, self._times, ids, self._topic_names,
+                          topics)
+
+    def _select(self, positions: Optional[Sequence[int]]) -> np.ndarray:
+        if positions is None:
+            return np.arange(len(self))
+        return np.asarray(positions, dtype=np.int64)
+
+    def _retime(self, positions: np.ndarray, nsecs: np.ndarray) -> 'Bag':
+        """
+        Returns a variant of this bag where the messages at the given
+        positions are assigned new timestamps, given in nanoseconds.
+        """
+        times = self._times.copy()
+        times[positions] = np.maximum(nsecs, 0)
+        order = np.argsort(times, kind='stable')
+        messages = tuple(self._messages[i] for i in order.tolist())
+        return Bag._build(messages,
+                          times[order],
+                          self._topic_ids[order],
+                          self._topic_names)
+
+    def shift(self,
+              secs: float,
+              positions: Optional[Sequence[int]] = None
+              ) -> 'Bag':
+        """
+        Returns a variant of this bag where the messages at the given
+        positions (or all messages, if no positions are given) are shifted
+        by a given number of seconds. Timestamps are clamped at zero.
+        """
+        selected = self._select(positions)
+        nsecs = self._times[selected] + int(secs * NSECS_PER_SEC)
+        return self._retime(selected, nsecs)
+
+    def scale(self,
+              factor: float,
+              positions: Optional[Sequence[int]] = None
+              ) -> 'Bag':
+        """
+        Returns a variant of this bag where the times of the messages at the
+        given positions (or all messages, if no positions are given),
+        relative to the earliest of those messages, are multiplied by a given
+        factor. Factors below one produce bursts of messages, whereas factors
+        above one spread messages out.
+
+        Raises
+        ------
+        ValueError
+            if factor is negative.
+        """
+        if factor < 0:
+            raise ValueError('factor must not be negative.')
+        selected = self._select(positions)
+        if not len(selected):
+            return self
+        times = self._times[selected]
+        origin = times.min()
+        nsecs = origin + ((times - origin) * factor).astype(np.int64)
+        return self._retime(selected, nsecs)
+
+    def jitter(self,
+               secs: float,
+               positions: Optional[Sequence[int]] = None,
+               seed: Optional[int] = None
+               ) -> 'Bag':
+        """
+        Returns a variant of this bag where the messages at the given
+        positions (or all messages, if no positions are given) are each
+        shifted by a random offset, drawn uniformly from [-secs, secs].
+
+        Parameters
+        ----------
+        secs: float
+            The maximum offset, in seconds.
+        positions: Sequence[int], optional
+            The positions of the messages that should be jittered.
+        seed: int, optional
+            An optional seed for the random number generator.
+        """
+        selected = self._select(positions)
+        rng = np.random.RandomState(seed)
+        noise = rng.uniform(-secs, secs, len(selected)) * NSECS_PER_SEC
+        nsecs = self._times[selected] + noise.astype(np.int64)
+        return self._retime(selected, nsecs)
+
+    def view(self,
+             topic: Optional[str] = None,
+             start: Optional[Time] = None,
+             stop: Optional[Time] = None
+             ) -> BagView:
+        """
+        Returns a view of the messages in this bag that belong to an optional
+        topic and that were published within an optional time range, without
+        copying those messages.
+
+        Parameters
+        ----------
+        topic: str, optional
+            If given, only messages on this topic are included.
+        start: Time, optional
+            If given, only messages published at or after this time are
+            included.
+        stop: Time, optional
+            If given, only messages published before this time are included.
+        """
+        times = self._times
+        lo = 0 if start is None else \
+            int(np.searchsorted(times, time_to_nsecs(start)))
+        hi = len(self) if stop is None else \
+            int(np.searchsorted(times, time_to_nsecs(stop)))
+        positions: Positions
+        if topic is None:
+            positions = range(lo, max(lo, hi))
+        else:
+            in_topic = self._topics.get(topic, np.empty(0, dtype=np.int64))
+            positions = in_topic[np.searchsorted(in_topic, lo):
+                                 np.searchsorted(in_topic, hi)]
+        return BagView(self, positions)
 
     def restrict_to_topic(self, topic: str) -> 'Bag':
         """Returns a variant of this bag that only represents a given topic."""
-        return Bag(m for m in self if m.topic == topic)
+        return Bag(self.view(topic))
+
+    def compress_time(self,
+                      rate: float = 1.0,
+                      max_gap_secs: Optional[float] = None
+                      ) -> 'Bag':
+        """
+        Returns a variant of this bag where the time between messages is
+        compressed. The timestamp of the first message is left unchanged.
+
+        Parameters
+        ----------
+        rate: float
+            The factor by which the gap between each pair of consecutive
+            messages should be divided.
+        max_gap_secs: float, optional
+            If given, gaps between consecutive messages that are longer than
+            this number of seconds (before applying the rate) are shortened
+            to this length.
+
+        Raises
+        ------
+        ValueError
+            if rate or max_gap_secs is not positive.
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive.')
+        if max_gap_secs is not None and max_gap_secs <= 0:
+            raise ValueError('max gap must be positive.')
+        if not len(self):
+            return self
+
+        gaps = np.diff(self._times)
+        if max_gap_secs is not None:
+            gaps = np.minimum(gaps, int(max_gap_secs * NSECS_PER_SEC))
+        gaps = (gaps / rate).astype(np.int64)
+        times = np.empty_like(self._times)
+        times[0] = self._times[0]
+        np.cumsum(gaps, out=times[1:])
+        times[1:] += self._times[0]
+        return Bag._build(self._messages, times, self._topic_ids,
+                          self._topic_names, self._topics)
 
 
 class BagMutation(Mutation[Bag]):
@@ -131,6 +523,38 @@ class DropMessage(BagMutation):
         return bag.delete(self.index)
 
 
+def normalise_mutations(mutations: Tuple[Mutation[Bag], ...]
+                        ) -> Tuple[Mutation[Bag], ...]:
+    """
+    Transforms a sequence of bag mutations into a canonical form. Each run of
+    consecutive message drops is replaced by an equivalent run that drops
+    the same messages in descending order of their position, such that
+    different orderings of the same drops share a canonical form.
+    """
+    normalised: List[Mutation[Bag]] = []
+    dropped: List[int] = []
+
+    def flush() -> None:
+        normalised.extend(DropMessage(i) for i in reversed(dropped))
+        dropped.clear()
+
+    for mutation in mutations:
+        if not isinstance(mutation, DropMessage):
+            flush()
+            normalised.append(mutation)
+            continue
+        # find the position of the dropped message prior to the current run
+        index = mutation.index
+        for previous in dropped:
+            if previous <= index:
+                index += 1
+            else:
+                break
+        bisect.insort(dropped, index)
+    flush()
+    return tuple(normalised)
+
+
 class DropMessageMutator(Mutator[Bag]):
     """Applies drop message mutations to its inputs."""
     def __call__(self, inp: Input[Bag]) -> Input[Bag]:
@@ -143,13 +567,52 @@ class DropMessageMutator(Mutator[Bag]):
 class DelayMessage(BagMutation):
     """Delays a given message by a fixed period of time."""
     index: int = attr.ib()
-    secs: int = attr.ib()
+    secs: float = attr.ib()
 
     def __call__(self, bag: Bag) -> Bag:
-        msg = attr.evolve(bag[self.index], time=msg.time + self.secs)
+        msg = bag[self.index]
+        nsecs = time_to_nsecs(msg.time) + int(self.secs * NSECS_PER_SEC)
+        msg = attr.evolve(msg, time=nsecs_to_time(nsecs))
         return bag.replace(self.index, msg)
 
 
+@attr.s(frozen=True, slots=True)
+class ShiftMessages(BagMutation):
+    """Shifts a contiguous range of messages by a fixed period of time."""
+    start: int = attr.ib()
+    stop: int = attr.ib()
+    secs: float = attr.ib()
+
+    def __call__(self, bag: Bag) -> Bag:
+        return bag.shift(self.secs, range(self.start, self.stop))
+
+
+@attr.s(frozen=True, slots=True)
+class ScaleTime(BagMutation):
+    """
+    Stretches (or compresses into a burst) the timing of a contiguous range
+    of messages by a given factor.
+    """
+    start: int = attr.ib()
+    stop: int = attr.ib()
+    factor: float = attr.ib()
+
+    def __call__(self, bag: Bag) -> Bag:
+        return bag.scale(self.factor, range(self.start, self.stop))
+
+
+@attr.s(frozen=True, slots=True)
+class JitterTime(BagMutation):
+    """Randomly perturbs the timing of a contiguous range of messages."""
+    start: int = attr.ib()
+    stop: int = attr.ib()
+    secs: float = attr.ib()
+    seed: int = attr.ib()
+
+    def __call__(self, bag: Bag) -> Bag:
+        return bag.jitter(self.secs, range(self.start, self.stop), self.seed)
+
+
 @attr.s(frozen=True, slots=True)
 class SwapMessage(BagMutation):
     """Swaps the position of two messages in the bag."""
@@ -190,8 +653,190 @@ class ReplaceMessageData(BagMutation):
         return bag.replace(self.index, msg)
 
 
+@attr.s(frozen=True, slots=True)
+class _SingleOrderMutationSpace(Sequence[BagMutation]):
+    """Lazily enumerates the single-order mutations of a given bag."""
+    length: int = attr.ib()
+    delays: Tuple[float, ...] = attr.ib()
+
+    def __len__(self) -> int:
+        num_swaps = max(self.length - 1, 0)
+        return self.length + num_swaps + self.length * len(self.delays)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError
+        if index < self.length:
+            return DropMessage(index)
+        index -= self.length
+        if index < self.length - 1:
+            return SwapMessage(index, index + 1)
+        index -= max(self.length - 1, 0)
+        position, offset = divmod(index, len(self.delays))
+        return DelayMessage(position, self.delays[offset])
+
+
+@attr.s(frozen=True, slots=True)
+class SingleOrderMutations:
+    """
+    Enumerates, in a fixed order, the single-order mutations of a given bag:
+    every message drop, followed by every swap of adjacent messages, followed
+    by every message delay for each of a given set of offsets.
+
+    Attributes
+    ----------
+    delays: Tuple[float, ...]
+        The offsets, given in seconds, by which each message should be
+        delayed.
+    """
+    delays: Tuple[float, ...] = attr.ib(default=(0.1, 0.5, 1.0),
+                                        converter=tuple)
+
+    def __call__(self, bag: Bag) -> Sequence[BagMutation]:
+        return _SingleOrderMutationSpace(len(bag), self.delays)
+
+
+def _random_range(bag: Bag) -> Tuple[int, int]:
+    """Picks a random, non-empty range of positions within a bag."""
+    start = random.randrange(len(bag))
+    stop = random.randint(start + 1, len(bag))
+    return start, stop
+
+
+def _random_peer(bag: Bag, index: int) -> int:
+    """Picks a random message that shares the topic of a given message."""
+    positions = bag.view(bag[index].topic).positions
+    return int(positions[random.randrange(len(positions))])
+
+
+def _drop(bag: Bag) -> Optional[BagMutation]:
+    if not bag:
+        return None
+    return DropMessage(random.randrange(len(bag)))
+
+
+def _delay(bag: Bag) -> Optional[BagMutation]:
+    if not bag:
+        return None
+    secs = random.choice((0.01, 0.1, 0.5, 1.0, 5.0))
+    return DelayMessage(random.randrange(len(bag)), secs)
+
+
+def _shift(bag: Bag) -> Optional[BagMutation]:
+    if not bag:
+        return None
+    start, stop = _random_range(bag)
+    return ShiftMessages(start, stop, random.uniform(-1.0, 1.0))
+
+
+def _scale(bag: Bag) -> Optional[BagMutation]:
+    if len(bag) < 2:
+        return None
+    start, stop = _random_range(bag)
+    factor = random.choice((0.0, 0.1, 0.5, 2.0, 10.0))
+    return ScaleTime(start, stop, factor)
+
+
+def _jitter(bag: Bag) -> Optional[BagMutation]:
+    if not bag:
+        return None
+    start, stop = _random_range(bag)
+    secs = random.choice((0.001, 0.01, 0.1))
+    return JitterTime(start, stop, secs, random.randrange(2 ** 32))
+
+
+def _swap(bag: Bag) -> Optional[BagMutation]:
+    if len(bag) < 2:
+        return None
+    i, j = random.sample(range(len(bag)), 2)
+    return SwapMessage(i, j)
+
+
+def _replace(bag: Bag) -> Optional[BagMutation]:
+    """Replaces a message with a random message from the bag, at the time
+    of the replaced message."""
+    if not bag:
+        return None
+    i = random.randrange(len(bag))
+    j = random.randrange(len(bag))
+    replacement = attr.evolve(bag[j], time=bag[i].time)
+    return ReplaceMessage(i, replacement)
+
+
+def _insert(bag: Bag) -> Optional[BagMutation]:
+    """Inserts a copy of a random message at a random time within the
+    bag."""
+    if not bag:
+        return None
+    first, last = time_to_nsecs(bag[0].time), time_to_nsecs(bag[-1].time)
+    nsecs = random.randint(first, last)
+    message = bag[random.randrange(len(bag))]
+    return InsertMessage(attr.evolve(message, time=nsecs_to_time(nsecs)))
+
+
+def _splice(bag: Bag) -> Optional[BagMutation]:
+    """Replaces the data of a message with that of another message on the
+    same topic."""
+    if not bag:
+        return None
+    i = random.randrange(len(bag))
+    j = _random_peer(bag, i)
+    return ReplaceMessageData(i, bag[j].message)
+
+
+#: The mutation operators for bags, indexed by name, for use with
+#: :class:`roshammer.search.AdaptiveMutator`.
+BAG_OPERATORS: Dict[str, Callable[[Bag], Optional[BagMutation]]] = {
+    'drop': _drop,
+    'delay': _delay,
+    'shift': _shift,
+    'scale': _scale,
+    'jitter': _jitter,
+    'swap': _swap,
+    'replace': _replace,
+    'insert': _insert,
+    'splice': _splice
+}
+
+
+@attr.s(frozen=True, slots=True)
 class BagInjector(InputInjector[Bag]):
-    """Used to inject messages from a ROSBag onto a given ROS session."""
+    """Used to inject messages from a ROSBag onto a given ROS session.
+
+    Attributes
+    ----------
+    rate: float
+        The rate, relative to real time, at which bags should be replayed.
+    max_gap_secs: float, optional
+        If given, idle periods between consecutive messages that last longer
+        than this number of seconds are shortened to this length before
+        replaying the bag (i.e., time warping).
+
+    Raises
+    ------
+    ValueError
+        if rate or max_gap_secs is not positive.
+    """
+    rate: float = attr.ib(default=1.0)
+    max_gap_secs: Optional[float] = attr.ib(default=None)
+
+    @rate.validator
+    def rate_is_positive(self, attribute, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError('rate must be positive.')
+
+    @max_gap_secs.validator
+    def max_gap_is_positive(self,
+                            attribute,
+                            max_gap_secs: Optional[float]
+                            ) -> None:
+        if max_gap_secs is not None and max_gap_secs <= 0:
+            raise ValueError('max gap must be positive.')
+
     def __call__(self,
                  app_instance: AppInstance,
                  has_failed: threading.Event,
@@ -199,12 +844,159 @@ class BagInjector(InputInjector[Bag]):
                  ) -> None:
         ros = app_instance.ros
         bag = inp.value
-        _, fn_bag = tempfile.mkstemp()
+        if self.rate != 1.0 or self.max_gap_secs is not None:
+            bag = bag.compress_time(self.rate, self.max_gap_secs)
+        # bags are written to the directory that is shared with the
+        # container, and so they can be played back without copying them
+        # into the container. ROSWire mangles the container path of such
+        # files, and so we give it that path ourselves.
+        container = app_instance.container
+        fd, fn_bag = tempfile.mkstemp(suffix='.bag', dir=container.dir_shared)
+        os.close(fd)
         logger.debug("created temporary file for bag: %s", fn_bag)
         try:
             bag.save(fn_bag)
-            with ros.playback(fn_bag) as player:
+            fn_ctr = container.shared_path(fn_bag)
+            with ros.playback(fn_ctr, file_on_host=False) as player:
                 while not has_failed.is_set() and not player.finished():
                     time.sleep(0.1)
         finally:
             os.remove(fn_bag)
+
+
+class BagSerialiser(SeedSerialiser[Bag]):
+    """Serialises bags using the ROS bag file format."""
+    def dumps(self, seed: Bag) -> bytes:
+        _, fn_bag = tempfile.mkstemp(suffix='.bag')
+        try:
+            seed.save(fn_bag)
+            with open(fn_bag, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(fn_bag)
+
+    def loads(self, description: AppDescription, data: bytes) -> Bag:
+        _, fn_bag = tempfile.mkstemp(suffix='.bag')
+        try:
+            with open(fn_bag, 'wb') as f:
+                f.write(data)
+            return Bag.load(description.types, fn_bag)
+        finally:
+            os.remove(fn_bag)
+
+    def dumps_mutation(self, mutation: Mutation[Bag]) -> bytes:
+        # messages are generated dynamically by ROSWire and cannot be pickled
+        # by reference, so we store their type name and binary encoding
+        f = io.BytesIO()
+        pickler = pickle.Pickler(f)
+        pickler.persistent_id = _message_id  # type: ignore
+        pickler.dump(mutation)
+        return f.getvalue()
+
+    def loads_mutation(self,
+                       description: AppDescription,
+                       data: bytes
+                       ) -> Mutation[Bag]:
+        types = description.types
+
+        def load_message(pid: Tuple[str, bytes]) -> Message:
+            name, encoded = pid
+            return types[name].decode(encoded)
+
+        unpickler = pickle.Unpickler(io.BytesIO(data))
+        unpickler.persistent_load = load_message  # type: ignore
+        return unpickler.load()
+
+
+def _message_id(obj: Any) -> Optional[Tuple[str, bytes]]:
+    if isinstance(obj, Message):
+        return (obj.format.fullname, obj.encode())
+    return None
+
+
+def calibrate_playback(fuzzer: Fuzzer[Bag],
+                       seeds: Collection[Bag],
+                       rates: Sequence[float] = (2.0, 5.0, 10.0),
+                       max_gap_secs: Optional[float] = None,
+                       min_similarity: Optional[float] = None
+                       ) -> BagInjector:
+    """
+    Determines the fastest playback rate at which the application under test
+    behaves as it does during real-time playback of a given set of
+    (unmutated) seed bags.
+
+    Each seed is played back twice in real time to obtain a pair of reference
+    executions. Since the coverage of most applications is not entirely
+    deterministic, the similarity between those two executions is used as
+    the bar that accelerated playback must meet.
+
+    Parameters
+    ----------
+    fuzzer: Fuzzer[Bag]
+        The fuzzer that should be used to execute the seeds.
+    seeds: Collection[Bag]
+        The seed bags that should be used for calibration.
+    rates: Sequence[float]
+        The candidate playback rates, which are tried in ascending order.
+        Calibration stops at the first rate that changes behaviour.
+    max_gap_secs: float, optional
+        If given, candidate injectors also shorten idle periods in the bag
+        to this number of seconds.
+    min_similarity: float, optional
+        The minimum Jaccard similarity between the coverage obtained at an
+        accelerated rate and at real time for a rate to be considered safe.
+        If left unspecified, the similarity between the two real-time
+        executions of each seed is used instead.
+
+    Returns
+    -------
+    BagInjector
+        The fastest injector that preserves the behaviour of the application,
+        or a real-time injector if no accelerated injector does so.
+    """
+    def similarity(x: Optional[frozenset], y: Optional[frozenset]) -> float:
+        if not x and not y:
+            return 1.0
+        x = x or frozenset()
+        y = y or frozenset()
+        return len(x & y) / len(x | y)
+
+    def preserves_behaviour(injector: BagInjector) -> bool:
+        accelerated = attr.evolve(fuzzer, inject=injector)
+        try:
+            for inp, (first, second), bar in zip(inputs, expected, bars):
+                outcome = accelerated.execute(inp)
+                if outcome.failures not in (first.failures, second.failures):
+                    logger.info("playback changes failures: %s", injector)
+                    return False
+                sim = max(similarity(outcome.coverage, first.coverage),
+                          similarity(outcome.coverage, second.coverage))
+                if sim < bar:
+                    logger.info("playback changes coverage: %s", injector)
+                    return False
+        finally:
+            accelerated.close()
+        return True
+
+    inputs = [Input(seed) for seed in seeds]
+    real_time = attr.evolve(fuzzer, inject=BagInjector())
+    try:
+        expected = [(real_time.execute(inp), real_time.execute(inp))
+                    for inp in inputs]
+    finally:
+        real_time.close()
+    if min_similarity is not None:
+        bars = [min_similarity] * len(inputs)
+    else:
+        bars = [similarity(first.coverage, second.coverage)
+                for first, second in expected]
+    logger.debug("real-time coverage similarity: %s", bars)
+
+    best = BagInjector()
+    for rate in sorted(rates):
+        injector = BagInjector(rate=rate, max_gap_secs=max_gap_secs)
+        if not preserves_behaviour(injector):
+            break
+        logger.info("playback rate is safe: %s", injector)
+        best = injector
+    return best
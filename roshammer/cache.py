@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a cache of execution outcomes that allows the fuzzer to
+avoid re-executing inputs that it has already executed.
+"""
+__all__ = ('ExecutionCache',)
+
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+import logging
+import random
+import time
+
+import attr
+
+from .core import Execution, Input, Mutation
+
+T = TypeVar('T')
+
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+MutationNormaliser = Callable[[Tuple[Mutation[T], ...]],
+                              Tuple[Mutation[T], ...]]
+
+
+def _identity(mutations: Tuple[Mutation[T], ...]) -> Tuple[Mutation[T], ...]:
+    return mutations
+
+
+@attr.s
+class ExecutionCache(Generic[T]):
+    """Stores the outcomes of executed inputs, keyed by their identity.
+
+    Two inputs are considered identical if they share the same seed and
+    their normalised sequences of mutations are equal.
+
+    Attributes
+    ----------
+    normalise: Callable[[Tuple[Mutation[T], ...]], Tuple[Mutation[T], ...]]
+        Transforms a sequence of mutations into a canonical form, such that
+        sequences that produce the same value are (ideally) mapped to the
+        same canonical form. By default, mutations are left untouched.
+    ttl_secs: float, optional
+        If given, cached outcomes expire after this number of seconds.
+    revalidation_rate: float
+        The probability that a cache hit is instead treated as a miss,
+        causing the input to be executed again. Used to detect and
+        accommodate flaky applications.
+
+    Raises
+    ------
+    ValueError
+        if revalidation rate is not between zero and one.
+    ValueError
+        if ttl_secs is not positive.
+    """
+    normalise: MutationNormaliser = attr.ib(default=_identity)
+    ttl_secs: Optional[float] = attr.ib(default=None)
+    revalidation_rate: float = attr.ib(default=0.0)
+    num_hits: int = attr.ib(default=0, init=False)
+    num_misses: int = attr.ib(default=0, init=False)
+    num_inconsistent: int = attr.ib(default=0, init=False)
+    _entries: Dict[Input[T], Tuple[float, Execution]] = \
+        attr.ib(factory=dict, init=False, repr=False)
+
+    @ttl_secs.validator
+    def ttl_is_positive(self, attribute, ttl_secs: Optional[float]) -> None:
+        if ttl_secs is not None and ttl_secs <= 0:
+            raise ValueError('time-to-live must be positive.')
+
+    @revalidation_rate.validator
+    def rate_is_probability(self, attribute, rate: float) -> None:
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError('revalidation rate must be between 0 and 1.')
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, inp: object) -> bool:
+        """Determines whether an unexpired outcome is cached for an input."""
+        if not isinstance(inp, Input):
+            return False
+        return self._lookup(self.key(inp)) is not None
+
+    def key(self, inp: Input[T]) -> Input[T]:
+        """Computes the cache key for a given input."""
+        return Input(inp.seed, self.normalise(inp.mutations))
+
+    def _lookup(self, key: Input[T]) -> Optional[Execution]:
+        try:
+            stored_at, execution = self._entries[key]
+        except KeyError:
+            return None
+        if self.ttl_secs is not None:
+            if time.time() - stored_at > self.ttl_secs:
+                del self._entries[key]
+                return None
+        return execution
+
+    def get(self, inp: Input[T]) -> Optional[Execution]:
+        """Retrieves the cached outcome for a given input, if any.
+
+        Returns
+        -------
+        Optional[Execution]
+            The cached outcome of the input, or None if there is no cached
+            outcome or if the input has been selected for revalidation.
+        """
+        execution = self._lookup(self.key(inp))
+        if execution is not None and self.revalidation_rate > 0.0:
+            if random.random() < self.revalidation_rate:
+                logger.debug("revalidating cached outcome: %s", inp)
+                execution = None
+        if execution is None:
+            self.num_misses += 1
+        else:
+            self.num_hits += 1
+        return execution
+
+    def put(self, inp: Input[T], execution: Execution) -> None:
+        """Stores the outcome of a given input."""
+        key = self.key(inp)
+        previous = self._lookup(key)
+        if previous is not None:
+            if previous.failures != execution.failures \
+               or previous.coverage != execution.coverage:
+                logger.warning("inconsistent outcomes for input: %s", inp)
+                self.num_inconsistent += 1
+        self._entries[key] = (time.time(), execution)
+
+    def clear(self) -> None:
+        """Removes all cached outcomes."""
+        self._entries.clear()
@@ -2,7 +2,45 @@
 """
 This module provides a simple command-line interface to ROSHammer.
 """
+from typing import Any, Optional
+import contextlib
+import os
+import threading
+
+import attr
 import click
+import yaml
+
+
+class _StatusLine:
+    """Periodically rewrites a single line of the terminal to show the
+    progress of a fuzzing campaign."""
+    def __init__(self, stats, interval_secs: float) -> None:
+        self.__stats = stats
+        self.__interval_secs = interval_secs
+        self.__stopped = threading.Event()
+        self.__width = 0
+        self.__thread = threading.Thread(target=self.__refresh, daemon=True)
+
+    def __show(self) -> None:
+        line = str(self.__stats)
+        padding = ' ' * max(self.__width - len(line), 0)
+        self.__width = len(line)
+        click.echo(f'\r{line}{padding}', nl=False, err=True)
+
+    def __refresh(self) -> None:
+        while not self.__stopped.wait(self.__interval_secs):
+            self.__show()
+
+    def __enter__(self) -> '_StatusLine':
+        self.__thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.__stopped.set()
+        self.__thread.join()
+        self.__show()
+        click.echo('', err=True)
 
 
 @click.group()
@@ -11,10 +49,166 @@ def cli():
 
 
 @cli.command()
-@click.argument('image', type=str)
-def fuzz(image: str) -> None:
-    """Fuzzes a given Docker IMAGE."""
-    click.echo(f"fuzzing {image}")
+@click.argument('config', type=click.Path(exists=True, dir_okay=False))
+@click.option('--profile', 'fn_profile', type=click.Path(dir_okay=False),
+              default=None,
+              help=('Samples the host-side fuzzing loop and writes its '
+                    'collapsed call stacks to a given file.'))
+@click.option('--status-interval', type=float, default=1.0,
+              show_default=True,
+              help='The number of seconds between status updates.')
+def fuzz(config: str, fn_profile: Optional[str], status_interval: float
+         ) -> None:
+    """Fuzzes an application according to a given CONFIG file."""
+    from .config import CampaignConfig
+    from .profiler import SamplingProfiler
+    from .roshammer import ROSHammer
+    from .search import CorpusInputGenerator, RandomInputGenerator
+
+    try:
+        campaign = CampaignConfig.load(config)
+    except (ValueError, yaml.YAMLError) as err:
+        raise click.BadParameter(str(err), param_hint='CONFIG')
+
+    rsh = ROSHammer(tmpfs_workspace=campaign.tmpfs_workspace)
+    app = rsh.app(campaign.image,
+                  campaign.workspace,
+                  campaign.launch_filename,
+                  campaign.launch_prefix)
+    store = None
+    if campaign.memory_budget_mb is not None:
+        store = campaign.build_store(app.description)
+    else:
+        seeds = campaign.load_seeds(app.description)
+    with rsh.prepare(app, campaign.coverage, campaign.sanitisers) as prepared:
+        prepared = attr.evolve(prepared, limits=campaign.container_limits)
+        mutator = campaign.build_mutator()
+        inputs: Any
+        if store is not None:
+            inputs = CorpusInputGenerator(store, mutator)  # type: ignore
+        else:
+            inputs = RandomInputGenerator(seeds, mutator)  # type: ignore
+        detectors = campaign.build_detectors()
+        fuzzer: Any
+        if campaign.num_workers > 1:
+            from .bag import BagSerialiser
+            from .distributed import Coordinator
+            from .load import LoadGovernor
+            governor = None
+            if campaign.load_aware:
+                client_docker = rsh.roswire.client_docker
+                governor = LoadGovernor(campaign.num_workers,
+                                        client_docker=client_docker,
+                                        image=prepared.image)
+            fuzzer = Coordinator(app=prepared,
+                                 inject=campaign.build_injector(),
+                                 inputs=inputs,
+                                 detectors=detectors,  # type: ignore
+                                 serialiser=BagSerialiser(),
+                                 num_local_workers=campaign.num_workers,
+                                 governor=governor,
+                                 resource_limits=campaign.resource_limits,
+                                 snapshot=campaign.snapshot,
+                                 settle_secs=campaign.settle_secs,
+                                 tmpfs_workspace=campaign.tmpfs_workspace)
+        else:
+            from .core import Fuzzer
+            fuzzer = Fuzzer(rsw=rsh.roswire,
+                            app=prepared,
+                            inject=campaign.build_injector(),
+                            inputs=inputs,
+                            detectors=detectors,  # type: ignore
+                            resource_limits=campaign.resource_limits,
+                            snapshot=campaign.snapshot,
+                            settle_secs=campaign.settle_secs,
+                            corpus=store if store is not None else [])
+
+        profiler = SamplingProfiler()
+        with contextlib.ExitStack() as stack:
+            if fn_profile:
+                stack.enter_context(profiler)
+            stack.enter_context(_StatusLine(fuzzer.stats, status_interval))
+            fuzzer.fuzz()
+
+    if store is not None:
+        stats = store.stats
+        click.echo(f"corpus store: {store.num_decoded} decoded and "
+                   f"{store.num_spilled} spilled of {store.num_seeds} seeds; "
+                   f"{stats.num_reloads} reloads "
+                   f"(mean: {1000 * stats.mean_reload_secs:.1f} ms)")
+        store.close()
+
+    if fn_profile:
+        profiler.write(fn_profile)
+        click.echo(f"wrote profile to {fn_profile}. hotspots:")
+        for frame, fraction in profiler.hotspots():
+            click.echo(f"  {100 * fraction:5.1f}%  {frame}")
+
+
+@cli.command()
+@click.argument('config', type=click.Path(exists=True, dir_okay=False))
+@click.argument('output', type=click.Path(dir_okay=False))
+def distill(config: str, output: str) -> None:
+    """Reduces the seeds of a given CONFIG file to a subset that achieves the
+    same coverage, and writes the reduced configuration to OUTPUT."""
+    from .config import CampaignConfig
+    from .core import CoverageLevel, Fuzzer
+    from .distill import distill as distill_seeds
+    from .roshammer import ROSHammer
+
+    try:
+        campaign = CampaignConfig.load(config)
+    except (ValueError, yaml.YAMLError) as err:
+        raise click.BadParameter(str(err), param_hint='CONFIG')
+    if campaign.coverage == CoverageLevel.DISABLED:
+        raise click.BadParameter('coverage must be enabled.',
+                                 param_hint='CONFIG')
+
+    rsh = ROSHammer(tmpfs_workspace=campaign.tmpfs_workspace)
+    app = rsh.app(campaign.image,
+                  campaign.workspace,
+                  campaign.launch_filename,
+                  campaign.launch_prefix)
+    seeds = campaign.load_seeds(app.description)
+    with rsh.prepare(app, campaign.coverage, campaign.sanitisers) as prepared:
+        prepared = attr.evolve(prepared, limits=campaign.container_limits)
+        detectors = campaign.build_detectors()
+        fuzzer: Fuzzer = Fuzzer(rsw=rsh.roswire,
+                                app=prepared,
+                                inject=campaign.build_injector(),
+                                inputs=iter(()),  # type: ignore
+                                detectors=detectors,  # type: ignore
+                                settle_secs=campaign.settle_secs)
+        selected = distill_seeds(fuzzer, seeds, campaign.num_workers)
+
+    # seed filenames are made relative to the location of the output
+    with open(config, 'r') as f:
+        d = yaml.safe_load(f)
+    dir_output = os.path.dirname(os.path.abspath(output))
+    entries = []
+    for i in sorted(selected):
+        entry = dict(d['seeds'][i])
+        entry['filename'] = os.path.relpath(campaign.seeds[i].filename,
+                                            dir_output)
+        entries.append(entry)
+    d['seeds'] = entries
+    with open(output, 'w') as f:
+        yaml.safe_dump(d, f, default_flow_style=False, sort_keys=False)
+    click.echo(f"distilled {len(seeds)} seeds to {len(selected)} seeds: "
+               f"wrote configuration to {output}")
+
+
+@cli.command()
+@click.argument('address', type=str)
+@click.option('--authkey', type=str, required=True,
+              help='The authentication key for the coordinator.')
+@click.option('--workspace', type=click.Path(exists=True), default=None,
+              help='The ROSWire workspace that should be used.')
+def worker(address: str, authkey: str, workspace: str) -> None:
+    """Executes inputs on behalf of a coordinator at a given ADDRESS."""
+    from .distributed import run_worker
+    host, _, port = address.rpartition(':')
+    run_worker((host, int(port)), authkey.encode('utf-8'), workspace)
 
 
 def main():
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a description of a fuzzing campaign that can be loaded
+from a YAML configuration file, allowing campaigns to be run from the
+command line.
+
+Below is an example of a configuration file::
+
+    image: roswire/helloworld:buggy
+    workspace: /ros_ws
+    launch: /ros_ws/src/ros_tutorials/roscpp_tutorials/launch/listener.launch
+    coverage: function
+    sanitisers: [asan]
+    seeds:
+      - filename: bad.bag
+        topics: [/chatter]
+    mutator: drop
+    detectors:
+      - type: crash
+        nodes: [listener]
+      - type: hang
+        nodes: [listener]
+        window_secs: 5.0
+    num_workers: 1
+    tmpfs_workspace: true
+    memory_budget_mb: 512
+    container_limits:
+      cpus: 1.0
+      memory_mb: 2048
+      pids: 512
+    settle_secs: 15.0
+    playback:
+      rate: 1.0
+    resource_limits:
+      wall_clock_mins: 60
+      num_inputs: 1000
+"""
+__all__ = ('CampaignConfig', 'SeedConfig')
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import os
+
+import attr
+import yaml
+
+from .bag import (BAG_OPERATORS, Bag, BagInjector, BagSerialiser,
+                  DropMessageMutator)
+from .core import (AppDescription, ContainerLimits, CoverageLevel,
+                   FailureDetectorFactory, Mutator, ResourceLimits, Sanitiser)
+from .detect import NodeCrashDetector, NodeHangDetector
+from .search import AdaptiveMutator
+from .store import CorpusStore
+
+#: The mutators that may be named by a configuration file.
+MUTATORS: Dict[str, Callable[[], Mutator[Bag]]] = {
+    'drop': DropMessageMutator,
+    'adaptive': lambda: AdaptiveMutator(BAG_OPERATORS)
+}
+
+#: The failure detectors that may be named by a configuration file.
+DETECTORS: Dict[str, Callable[..., FailureDetectorFactory]] = {
+    'crash': NodeCrashDetector.factory,
+    'hang': NodeHangDetector.factory
+}
+
+
+@attr.s(frozen=True)
+class SeedConfig:
+    """Describes a seed bag.
+
+    Attributes
+    ----------
+    filename: str
+        The path to the bag file.
+    topics: Tuple[str, ...], optional
+        The topics to which the bag should be restricted, if any.
+    """
+    filename: str = attr.ib()
+    topics: Optional[Tuple[str, ...]] = attr.ib(default=None)
+
+    def load(self, description: AppDescription) -> Bag:
+        """Loads this seed bag."""
+        topics = list(self.topics) if self.topics is not None else None
+        return Bag.load(description.types, self.filename, topics)
+
+
+@attr.s(frozen=True)
+class CampaignConfig:
+    """Describes a fuzzing campaign.
+
+    Attributes
+    ----------
+    image: str
+        The Docker image for the application under test.
+    workspace: str
+        The absolute path to the catkin workspace for the application.
+    launch_filename: str
+        The absolute path of the launch file for the application.
+    launch_prefix: str, optional
+        The prefix that should be used when launching the application.
+    coverage: CoverageLevel
+        The level of coverage that should be collected.
+    sanitisers: Tuple[Sanitiser, ...]
+        The sanitisers that should be applied to the application.
+    seeds: Tuple[SeedConfig, ...]
+        The seed bags for the campaign.
+    mutator: str
+        The name of the mutator that should be used to mutate seeds: either
+        :code:`drop`, which drops a single message, or :code:`adaptive`,
+        which stacks a variety of bag mutations and learns which of them
+        pay off for the application under test.
+    detectors: Tuple[Tuple[str, Mapping[str, Any]], ...]
+        The name and options of each failure detector.
+    num_workers: int
+        The number of worker processes that should execute inputs.
+    tmpfs_workspace: bool
+        If true, the ROSWire workspace, and hence the directory that it
+        shares with each container, is placed on tmpfs (see
+        :class:`ROSHammer`).
+    memory_budget_mb: float, optional
+        If given, the seeds and corpus are kept within this many megabytes
+        of memory, and seeds that do not fit are compressed or spilled to
+        disk. Only supported by single-process campaigns.
+    container_limits: ContainerLimits
+        The resource caps for each container that hosts the application.
+    load_aware: bool
+        If true, the number of executions that run at once is adapted to
+        the load on the host, up to the number of workers.
+    resource_limits: ResourceLimits
+        The resource limits for the campaign.
+    settle_secs: float
+        The number of seconds to wait after injecting each input.
+    playback_rate: float
+        The rate at which seed bags should be played back.
+    max_gap_secs: float, optional
+        If given, idle periods within bags are shortened to this length.
+    snapshot: bool
+        If true, the application is restored from a checkpoint for each
+        execution.
+    """
+    image: str = attr.ib()
+    workspace: str = attr.ib()
+    launch_filename: str = attr.ib()
+    launch_prefix: Optional[str] = attr.ib(default=None)
+    coverage: CoverageLevel = attr.ib(default=CoverageLevel.DISABLED)
+    sanitisers: Tuple[Sanitiser, ...] = attr.ib(default=())
+    seeds: Tuple[SeedConfig, ...] = attr.ib(default=())
+    mutator: str = attr.ib(default='drop')
+    detectors: Tuple[Tuple[str, Mapping[str, Any]], ...] = \
+        attr.ib(default=())
+    num_workers: int = attr.ib(default=1)
+    tmpfs_workspace: bool = attr.ib(default=False)
+    memory_budget_mb: Optional[float] = attr.ib(default=None)
+    container_limits: ContainerLimits = attr.ib(default=ContainerLimits())
+    load_aware: bool = attr.ib(default=False)
+    resource_limits: ResourceLimits = attr.ib(default=ResourceLimits())
+    settle_secs: float = attr.ib(default=15.0)
+    playback_rate: float = attr.ib(default=1.0)
+    max_gap_secs: Optional[float] = attr.ib(default=None)
+    snapshot: bool = attr.ib(default=False)
+
+    @seeds.validator
+    def has_seeds(self, attribute, seeds: Tuple[SeedConfig, ...]) -> None:
+        if not seeds:
+            raise ValueError('at least one seed must be provided.')
+
+    @mutator.validator
+    def is_known_mutator(self, attribute, mutator: str) -> None:
+        if mutator not in MUTATORS:
+            raise ValueError(f'unknown mutator: {mutator}')
+
+    @detectors.validator
+    def has_known_detectors(self, attribute, detectors) -> None:
+        if not detectors:
+            raise ValueError('at least one failure detector must be used.')
+        for name, options in detectors:
+            if name not in DETECTORS:
+                raise ValueError(f'unknown failure detector: {name}')
+            try:
+                DETECTORS[name](**options)
+            except TypeError as err:
+                m = f'bad options for failure detector [{name}]: {err}'
+                raise ValueError(m) from err
+
+    @num_workers.validator
+    def has_workers(self, attribute, num_workers: int) -> None:
+        if num_workers < 1:
+            raise ValueError('number of workers must be at least one.')
+
+    @memory_budget_mb.validator
+    def has_valid_budget(self, attribute, budget: Optional[float]) -> None:
+        if budget is None:
+            return
+        if budget <= 0:
+            raise ValueError('memory budget must be positive.')
+        if self.num_workers > 1:
+            raise ValueError('memory budget requires a single worker.')
+
+    @classmethod
+    def from_dict(cls,
+                  d: Mapping[str, Any],
+                  base_dir: str = '.'
+                  ) -> 'CampaignConfig':
+        """Builds a campaign description from its dictionary form.
+
+        Parameters
+        ----------
+        d: Mapping[str, Any]
+            The dictionary form of the description.
+        base_dir: str
+            The directory against which relative seed filenames are resolved.
+
+        Raises
+        ------
+        ValueError
+            if the description is invalid.
+        """
+        d = dict(d)
+        try:
+            image = d.pop('image')
+            workspace = d.pop('workspace')
+            launch_filename = d.pop('launch')
+        except KeyError as err:
+            raise ValueError(f'missing required property: {err}') from err
+
+        seeds: List[SeedConfig] = []
+        for s in d.pop('seeds', []):
+            if not isinstance(s, dict) or 'filename' not in s:
+                raise ValueError(f'seed must have a filename: {s}')
+            seeds.append(SeedConfig(os.path.join(base_dir, s['filename']),
+                                    tuple(s['topics']) if 'topics' in s
+                                    else None))
+        detectors: List[Tuple[str, Mapping[str, Any]]] = []
+        for options in d.pop('detectors', []):
+            options = dict(options)
+            detectors.append((options.pop('type', None), options))
+        playback = d.pop('playback', {})
+        try:
+            limits = ResourceLimits(**d.pop('resource_limits', {}))
+        except TypeError as err:
+            raise ValueError(f'bad resource limits: {err}') from err
+        try:
+            container_limits = \
+                ContainerLimits(**d.pop('container_limits', {}))
+        except TypeError as err:
+            raise ValueError(f'bad container limits: {err}') from err
+        config = CampaignConfig(
+            image=image,
+            workspace=workspace,
+            launch_filename=launch_filename,
+            launch_prefix=d.pop('launch_prefix', None),
+            coverage=CoverageLevel(d.pop('coverage', 'disabled')),
+            sanitisers=tuple(Sanitiser(s) for s in d.pop('sanitisers', [])),
+            seeds=tuple(seeds),
+            mutator=d.pop('mutator', 'drop'),
+            detectors=tuple(detectors),
+            num_workers=d.pop('num_workers', 1),
+            tmpfs_workspace=d.pop('tmpfs_workspace', False),
+            memory_budget_mb=d.pop('memory_budget_mb', None),
+            container_limits=container_limits,
+            load_aware=d.pop('load_aware', False),
+            resource_limits=limits,
+            settle_secs=d.pop('settle_secs', 15.0),
+            playback_rate=playback.get('rate', 1.0),
+            max_gap_secs=playback.get('max_gap_secs'),
+            snapshot=d.pop('snapshot', False))
+        if d:
+            raise ValueError(f'unknown properties: {", ".join(sorted(d))}')
+        return config
+
+    @classmethod
+    def load(cls, filename: str) -> 'CampaignConfig':
+        """Loads a campaign description from a given YAML file.
+
+        Raises
+        ------
+        ValueError
+            if the description is invalid.
+        """
+        with open(filename, 'r') as f:
+            d = yaml.safe_load(f)
+        if not isinstance(d, dict):
+            raise ValueError('configuration file must describe a mapping.')
+        base_dir = os.path.dirname(os.path.abspath(filename))
+        return cls.from_dict(d, base_dir)
+
+    def build_mutator(self) -> Mutator[Bag]:
+        """Constructs the mutator for this campaign."""
+        return MUTATORS[self.mutator]()
+
+    def build_detectors(self) -> List[FailureDetectorFactory]:
+        """Constructs the failure detector factories for this campaign."""
+        return [DETECTORS[name](**options) for name, options in self.detectors]
+
+    def build_injector(self) -> BagInjector:
+        """Constructs the input injector for this campaign."""
+        return BagInjector(rate=self.playback_rate,
+                           max_gap_secs=self.max_gap_secs)
+
+    def load_seeds(self, description: AppDescription) -> List[Bag]:
+        """Loads the seed bags for this campaign."""
+        return [seed.load(description) for seed in self.seeds]
+
+    def build_store(self, description: AppDescription) -> CorpusStore[Bag]:
+        """Constructs a corpus store that holds the seed bags for this
+        campaign within its memory budget. Seeds are loaded one at a time,
+        so that they need not all fit in memory at once.
+
+        Raises
+        ------
+        ValueError
+            if the campaign has no memory budget.
+        """
+        if self.memory_budget_mb is None:
+            raise ValueError('campaign has no memory budget.')
+        budget_bytes = int(self.memory_budget_mb * 1024 * 1024)
+        store = CorpusStore(BagSerialiser(), description, budget_bytes)
+        for seed in self.seeds:
+            store.add_seed(seed.load(description))
+        return store
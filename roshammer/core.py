@@ -5,20 +5,25 @@ interfaces.
 """
 __all__ = ('App',
            'AppContainer',
+           'CampaignStats',
+           'ContainerLimits',
+           'ContainerOOM',
            'CoverageLevel',
            'Execution',
            'FuzzSeed',
            'Input',
+           'PackedInputs',
            'Fuzzer',
            'Failure',
            'FailureDetector',
            'InputInjector',
            'Sanitiser',
+           'SeedSerialiser',
            'InputGenerator')
 
 from typing import (Union, Tuple, Sequence, Iterator, Any, Generic, TypeVar,
                     Generator, Collection, FrozenSet, ContextManager,
-                    Callable, List, Optional)
+                    Callable, Dict, List, Optional, Set, TYPE_CHECKING)
 from abc import ABC, abstractmethod
 from enum import Enum
 from functools import reduce
@@ -26,20 +31,43 @@ import threading
 import contextlib
 import collections.abc
 import logging
+import pickle
 import time
 import os
 
 import attr
+from docker import APIClient as DockerAPIClient
+from docker.errors import APIError as DockerAPIError
 from roswire import ROSWire
 from roswire import System as ROSWireSystem
 from roswire import SystemDescription as AppDescription
 from roswire.proxy import ROSProxy as ROSWireROSProxy
 from roswire.proxy import ShellProxy as ROSWireShellProxy
 from roswire.proxy import FileProxy as ROSWireFileProxy
+from roswire.proxy import ContainerProxy as ROSWireContainerProxy
 from roswire.util import Stopwatch
 
+from . import hitcount
+
+if TYPE_CHECKING:
+    from .cache import ExecutionCache
+    from .store import CorpusStore
+
 T = TypeVar('T')
 
+SNAPSHOT_NAME = 'roshammer'
+
+# the location at which ROSWire mounts its shared directory in each container
+_DIR_SHARED_CONTAINER = '/.roswire'
+
+# the length of the CFS scheduling period, in microseconds
+_CPU_PERIOD = 100000
+
+# the cgroup files that count the OOM kills within a container under cgroup
+# v2 and v1, respectively
+_OOM_FILENAMES = ('/sys/fs/cgroup/memory.events',
+                  '/sys/fs/cgroup/memory/memory.oom_control')
+
 logger: logging.Logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
@@ -51,9 +79,14 @@ def validate_is_abs(obj, attr, value) -> None:
 
 
 class CoverageLevel(Enum):
-    """Specifies a level of coverage."""
+    """Specifies a level of coverage.
+
+    :code:`EDGE_HITS` counts how often each edge is taken, rather than
+    recording which edges were taken (see :mod:`roshammer.hitcount`).
+    """
     DISABLED = 'disabled'
     EDGE = 'edge'
+    EDGE_HITS = 'edge-hits'
     LINE = 'line'
     BLOCK = 'block'
     FUNCTION = 'function'
@@ -63,6 +96,54 @@ class Coverage(FrozenSet[int], collections.abc.Set, ABC):
     """Provdes a concise coverage report for an execution."""
 
 
+@attr.s(frozen=True, slots=True)
+class ContainerLimits:
+    """Describes the resource caps that are placed on each container that
+    hosts the application, so that a single input cannot starve the other
+    executions on the same host.
+
+    Attributes
+    ----------
+    cpus: float, optional
+        The maximum number of CPUs that the container may use.
+    memory_mb: int, optional
+        The maximum amount of memory, in megabytes, that the container may
+        use. Swap is disabled for the container, so that nodes that exceed
+        the limit are killed promptly rather than thrashing.
+    pids: int, optional
+        The maximum number of processes and threads within the container.
+
+    Raises
+    ------
+    ValueError
+        if any limit is not positive.
+    """
+    cpus: Optional[float] = attr.ib(default=None)
+    memory_mb: Optional[int] = attr.ib(default=None)
+    pids: Optional[int] = attr.ib(default=None)
+
+    @cpus.validator
+    @memory_mb.validator
+    @pids.validator
+    def is_positive(self, attribute, value) -> None:
+        if value is not None and value <= 0:
+            raise ValueError(f'{attribute.name} limit must be positive.')
+
+    def to_docker(self) -> Dict[str, int]:
+        """Returns the form of these limits that is used by Docker's
+        container update API. Unspecified limits are omitted."""
+        limits: Dict[str, int] = {}
+        if self.cpus is not None:
+            limits['CpuPeriod'] = _CPU_PERIOD
+            limits['CpuQuota'] = int(self.cpus * _CPU_PERIOD)
+        if self.memory_mb is not None:
+            limits['Memory'] = self.memory_mb * 1024 * 1024
+            limits['MemorySwap'] = limits['Memory']
+        if self.pids is not None:
+            limits['PidsLimit'] = self.pids
+        return limits
+
+
 @attr.s(frozen=True, slots=True)
 class App:
     """Provides a description of a ROS application under test.
@@ -80,6 +161,10 @@ class App:
         The prefix that should be used when launching the application, if any.
     description: AppDescription
         A description of the application, produced by ROSWire.
+    coverage: CoverageLevel
+        The level of coverage for which the application is instrumented.
+    limits: ContainerLimits
+        The resource caps for each container that hosts the application.
 
     Raises
     ------
@@ -93,12 +178,108 @@ class App:
     launch_filename: str = attr.ib(validator=validate_is_abs)
     launch_prefix: Optional[str] = attr.ib()
     description: AppDescription = attr.ib()
+    coverage: CoverageLevel = attr.ib(default=CoverageLevel.DISABLED)
+    limits: ContainerLimits = attr.ib(default=ContainerLimits())
 
     @contextlib.contextmanager
     def provision(self, rsw: ROSWire) -> Iterator['AppContainer']:
         """Provisions a container for this application."""
         with rsw.launch(self.image, self.description) as sut:
-            yield AppContainer(self, sut)
+            container = AppContainer(self, sut, rsw)
+            limits = self.limits.to_docker()
+            if limits:
+                _update_container(rsw.client_docker.api,
+                                  container.name,
+                                  limits)
+            if self.coverage == CoverageLevel.EDGE_HITS:
+                container.clear_coverage()
+            yield container
+
+
+def _create_checkpoint(api: DockerAPIClient, container: str, name: str
+                       ) -> bool:
+    """Saves a checkpoint of a running container without stopping it.
+
+    Checkpoints are only supported by Docker daemons with experimental
+    features enabled and CRIU installed, and the endpoint is not exposed by
+    docker-py's high-level API.
+
+    Returns
+    -------
+    bool
+        True if the checkpoint was saved, or False if not.
+    """
+    url = api._url('/containers/{0}/checkpoints', container)
+    try:
+        response = api._post_json(url,
+                                  data={'CheckpointID': name, 'Exit': False})
+        api._raise_for_status(response)
+    except DockerAPIError as err:
+        logger.warning("failed to checkpoint container [%s]: %s",
+                       container, err)
+        return False
+    return True
+
+
+def _start_from_checkpoint(api: DockerAPIClient, container: str, name: str
+                           ) -> bool:
+    """Restarts a given container from one of its checkpoints.
+
+    Returns
+    -------
+    bool
+        True if the container was restored, or False if not.
+    """
+    try:
+        api.stop(container, timeout=0)
+        url = api._url('/containers/{0}/start', container)
+        response = api._post(url, params={'checkpoint': name})
+        api._raise_for_status(response)
+    except DockerAPIError as err:
+        logger.warning("failed to restore container [%s]: %s",
+                       container, err)
+        return False
+    return True
+
+
+def _update_container(api: DockerAPIClient,
+                      container: str,
+                      limits: Dict[str, int]
+                      ) -> bool:
+    """Updates the resource limits of a running container.
+
+    docker-py's :code:`update_container` does not support PID limits, and so
+    the endpoint is called directly.
+
+    Returns
+    -------
+    bool
+        True if the limits were applied, or False if not.
+    """
+    url = api._url('/containers/{0}/update', container)
+    try:
+        response = api._post_json(url, data=limits)
+        api._raise_for_status(response)
+    except DockerAPIError as err:
+        logger.warning("failed to limit resources of container [%s]: %s",
+                       container, err)
+        return False
+    return True
+
+
+def _parse_oom_kills(text: str) -> int:
+    """Extracts the number of OOM kills from the contents of a cgroup's
+    memory events (v2) or OOM control (v1) file."""
+    for line in text.splitlines():
+        key, _, value = line.partition(' ')
+        if key == 'oom_kill':
+            return int(value)
+    return 0
+
+
+def _wait_for_nodes(ros: ROSWireROSProxy) -> None:
+    """Blocks until the nodes of a freshly launched application are ready."""
+    time.sleep(5)  # FIXME wait until nodes are launched
 
 
 @attr.s(frozen=True, slots=True)
@@ -106,6 +287,12 @@ class AppContainer:
     """Provides access to a Docker container that hosts a ROS application."""
     app: App = attr.ib()
     _system: ROSWireSystem = attr.ib()
+    _rsw: ROSWire = attr.ib()
+
+    @property
+    def name(self) -> str:
+        """The name of the Docker container."""
+        return str(self._system.uuid)
 
     @contextlib.contextmanager
     def launch(self) -> Iterator['AppInstance']:
@@ -120,12 +307,75 @@ class AppContainer:
         prefix = self.app.launch_prefix
         with self._system.roscore() as ros:
             ros.launch(filename, prefix=prefix)
-            time.sleep(5)  # FIXME wait until nodes are launched
+            _wait_for_nodes(ros)
             yield AppInstance(self, ros)
             for node in ros.nodes:
                 ros.nodes[node].shutdown()
             time.sleep(1)  # wait for nodes to die
 
+    def checkpoint(self, name: str) -> bool:
+        """Launches the application and, once its nodes are ready, saves a
+        checkpoint of the container via CRIU.
+
+        Note that checkpointing requires a Docker daemon with experimental
+        features enabled and CRIU installed on the Docker host.
+
+        Returns
+        -------
+        bool
+            True if the checkpoint was saved, or False if checkpointing is not
+            supported by the Docker host.
+        """
+        filename = self.app.launch_filename
+        prefix = self.app.launch_prefix
+        with self._system.roscore() as ros:
+            ros.launch(filename, prefix=prefix)
+            _wait_for_nodes(ros)
+            api = self._rsw.client_docker.api
+            return _create_checkpoint(api, self.name, name)
+
+    @contextlib.contextmanager
+    def restore(self, checkpoint: str) -> Iterator['AppInstance']:
+        """Restores the application from a given checkpoint.
+
+        Yields
+        ------
+        AppInstance
+            An instance of the application under test.
+
+        Raises
+        ------
+        RuntimeError
+            if the container could not be restored.
+        """
+        rsw = self._rsw
+        if not _start_from_checkpoint(rsw.client_docker.api,
+                                      self.name,
+                                      checkpoint):
+            raise RuntimeError(f'failed to restore container: {self.name}')
+
+        # the host PID of the container changes after it is restored, and so
+        # we must rebuild the ROSWire proxies for the container
+        description = self.app.description
+        container_docker = rsw.client_docker.containers.get(self.name)
+        proxy = ROSWireContainerProxy(rsw.containers.api_docker,
+                                      container_docker,
+                                      self._system.uuid,
+                                      self._system.ws_host)
+        container = AppContainer(self.app,
+                                 ROSWireSystem(proxy, description),
+                                 rsw)
+        container.clear_coverage()
+        ros = ROSWireROSProxy(description=description,
+                              shell=proxy.shell,
+                              files=proxy.files,
+                              ws_host=proxy.ws_host,
+                              ip_address=proxy.ip_address)
+        yield AppInstance(container, ros)
+        for node in ros.nodes:
+            ros.nodes[node].shutdown()
+        time.sleep(1)  # wait for nodes to die
+
     @property
     def files(self) -> ROSWireFileProxy:
         """Provides access to the file system for this container."""
@@ -136,7 +386,28 @@ class AppContainer:
         """Provides access to a shell for this container."""
         return self._system.shell
 
+    @property
+    def dir_shared(self) -> str:
+        """The directory on the host that is shared with this container.
+        Files that are written to this directory are visible to the
+        container, under :code:`/.roswire`, without being copied."""
+        return self._system.ws_host
+
+    def shared_path(self, filename: str) -> str:
+        """Returns the location, inside the container, of a given file within
+        the directory that is shared with this container."""
+        relative = os.path.relpath(filename, self.dir_shared)
+        return os.path.join(_DIR_SHARED_CONTAINER, relative)
+
+    @property
+    def _fn_hits(self) -> str:
+        """The location of the hit-count map on the host."""
+        return os.path.join(self.dir_shared, hitcount.HITS_MAP_FILENAME)
+
     def read_coverage(self) -> Optional[Coverage]:
+        if self.app.coverage == CoverageLevel.EDGE_HITS:
+            return Coverage(hitcount.read_hits(self._fn_hits).tolist())
+
         filenames = self.files.find('/tmp/cov', '*.sancov')
         logger.info("found coverage files: %s", filenames)
 
@@ -146,6 +417,24 @@ class AppContainer:
         components = frozenset(int(c.strip(), 16) for c in out.split('\n'))
         return Coverage(components)
 
+    def num_oom_kills(self) -> int:
+        """Returns the number of processes within this container that have
+        been killed for exceeding its memory limit."""
+        cmd = ' || '.join(f'cat {fn} 2>/dev/null' for fn in _OOM_FILENAMES)
+        retcode, out, _ = self.shell.execute(cmd)
+        if retcode != 0:
+            logger.warning("failed to read OOM kills for container [%s]",
+                           self.name)
+            return 0
+        return _parse_oom_kills(out)
+
+    def clear_coverage(self) -> None:
+        """Removes any coverage files from this container."""
+        if self.app.coverage == CoverageLevel.EDGE_HITS:
+            hitcount.clear_hits(self._fn_hits)
+            return
+        self.shell.execute('rm -f /tmp/cov/*.sancov')
+
 
 @attr.s(frozen=True, slots=True)
 class AppInstance:
@@ -173,12 +462,63 @@ class Mutation(Generic[T]):
         raise NotImplementedError
 
 
-# NOTE cannot use slots=True (https://github.com/python-attrs/attrs/issues/313)
-@attr.s(frozen=True)
 class Input(Generic[T]):
-    """Represents a (generated) fuzzing input."""
-    seed: T = attr.ib()
-    mutations: Tuple[Mutation[T], ...] = attr.ib(default=tuple())
+    """Represents a (generated) fuzzing input.
+
+    Inputs are stored as immutable chains of nodes, where each node holds a
+    single mutation and a pointer to the input that it mutates. Inputs that
+    are derived from a common ancestor share the nodes for that ancestor,
+    and mutating an input takes constant time and space.
+
+    Note that attrs cannot be used to implement this class since it does
+    not support slots for generic classes
+    (https://github.com/python-attrs/attrs/issues/313).
+    """
+    __slots__ = ('_seed', '_parent', '_mutation', '_depth', '_hash')
+
+    def __init__(self,
+                 seed: T,
+                 mutations: Sequence[Mutation[T]] = ()
+                 ) -> None:
+        self._seed = seed
+        self._parent: Optional[Input[T]] = None
+        self._mutation: Optional[Mutation[T]] = None
+        self._depth = 0
+        self._hash: Optional[int] = None
+        if mutations:
+            # build the chain from a separate root so that this node becomes
+            # its last link rather than its own ancestor
+            parent: Input[T] = Input(seed)
+            for mutation in mutations[:-1]:
+                parent = parent.mutate(mutation)
+            self._parent = parent
+            self._mutation = mutations[-1]
+            self._depth = parent._depth + 1
+
+    @property
+    def seed(self) -> T:
+        """The seed from which this input was derived."""
+        return self._seed
+
+    @property
+    def parent(self) -> Optional['Input[T]']:
+        """The input to which the last mutation was applied, if any."""
+        return self._parent
+
+    @property
+    def depth(self) -> int:
+        """The number of mutations that were applied to the seed."""
+        return self._depth
+
+    @property
+    def mutations(self) -> Tuple[Mutation[T], ...]:
+        """The sequence of mutations that were applied to the seed."""
+        mutations: List[Mutation[T]] = []
+        node: Optional[Input[T]] = self
+        while node is not None and node._mutation is not None:
+            mutations.append(node._mutation)
+            node = node._parent
+        return tuple(reversed(mutations))
 
     @property
     def value(self) -> T:
@@ -187,7 +527,116 @@ class Input(Generic[T]):
 
     def mutate(self, mutation: Mutation[T]) -> 'Input[T]':
         """Applies a given mutation to this input to produce a new input."""
-        return attr.evolve(self, mutations=self.mutations + (mutation,))
+        child: Input[T] = Input.__new__(Input)
+        child._seed = self._seed
+        child._parent = self
+        child._mutation = mutation
+        child._depth = self._depth + 1
+        child._hash = None
+        return child
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            # compute the hashes of any unhashed ancestors without recursion
+            unhashed: List[Input[T]] = []
+            node: Optional[Input[T]] = self
+            while node is not None and node._hash is None:
+                unhashed.append(node)
+                node = node._parent
+            for node in reversed(unhashed):
+                if node._parent is None:
+                    node._hash = hash((node._seed,))
+                else:
+                    node._hash = hash((node._parent._hash, node._mutation))
+        assert self._hash is not None
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Input):
+            return NotImplemented
+        if self._depth != other._depth or hash(self) != hash(other):
+            return False
+        x: Input[T] = self
+        y: Input[T] = other
+        while x is not y:
+            if x._parent is None or y._parent is None:
+                return x._seed == y._seed
+            if x._mutation != y._mutation:
+                return False
+            x, y = x._parent, y._parent
+        return True
+
+    def __repr__(self) -> str:
+        return f'Input(seed={self._seed!r}, mutations={self.mutations!r})'
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # individual inputs are pickled in a flat form to avoid deep recursion
+        # during pickling; use PackedInputs to preserve shared prefixes
+        return (Input, (self._seed, self.mutations))
+
+
+@attr.s(frozen=True)
+class PackedInputs(Generic[T]):
+    """Provides a compact, flat representation of a collection of inputs
+    that can be stored or sent to other processes without duplicating the
+    prefixes that are shared by those inputs.
+
+    Attributes
+    ----------
+    seeds: Tuple[T, ...]
+        The distinct seeds from which the inputs were derived.
+    nodes: Tuple[Tuple[int, Mutation[T]], ...]
+        The distinct mutation nodes used by the inputs, in topological order.
+        Each node is described by the index of its parent and its mutation.
+        Non-negative indices refer to other nodes, whereas a negative index,
+        -(i + 1), refers to the i-th seed.
+    heads: Tuple[int, ...]
+        The index of the last node of each input, using the same scheme.
+    """
+    seeds: Tuple[T, ...] = attr.ib()
+    nodes: Tuple[Tuple[int, Mutation[T]], ...] = attr.ib()
+    heads: Tuple[int, ...] = attr.ib()
+
+    @staticmethod
+    def pack(inputs: Sequence[Input[T]]) -> 'PackedInputs[T]':
+        """Packs a sequence of inputs."""
+        seeds: List[T] = []
+        nodes: List[Tuple[int, Mutation[T]]] = []
+        index: Dict[int, int] = {}
+        keep: List[Input[T]] = []  # prevents node IDs from being reused
+        heads: List[int] = []
+        for inp in inputs:
+            unpacked: List[Input[T]] = []
+            node: Optional[Input[T]] = inp
+            while node is not None and id(node) not in index:
+                unpacked.append(node)
+                node = node._parent
+            for node in reversed(unpacked):
+                keep.append(node)
+                if node._parent is None:
+                    seeds.append(node._seed)
+                    index[id(node)] = -len(seeds)
+                else:
+                    assert node._mutation is not None
+                    nodes.append((index[id(node._parent)], node._mutation))
+                    index[id(node)] = len(nodes) - 1
+            heads.append(index[id(inp)])
+        return PackedInputs(tuple(seeds), tuple(nodes), tuple(heads))
+
+    def unpack(self) -> List[Input[T]]:
+        """Reconstructs the packed inputs, sharing common prefixes."""
+        roots = [Input(seed) for seed in self.seeds]
+        nodes: List[Input[T]] = []
+
+        def lookup(i: int) -> Input[T]:
+            return nodes[i] if i >= 0 else roots[-i - 1]
+
+        for parent, mutation in self.nodes:
+            nodes.append(lookup(parent).mutate(mutation))
+        return [lookup(i) for i in self.heads]
+
+    def __len__(self) -> int:
+        return len(self.heads)
 
 
 class Mutator(Generic[T]):
@@ -195,6 +644,26 @@ class Mutator(Generic[T]):
     def __call__(self, inp: Input[T]) -> Input[T]:
         raise NotImplementedError
 
+    def observe(self,
+                inp: Input[T],
+                execution: 'Execution',
+                num_novel: int
+                ) -> None:
+        """Informs the mutator of the outcome of an input that it produced,
+        allowing adaptive mutators to learn which mutations pay off. Does
+        nothing by default.
+
+        Parameters
+        ----------
+        inp: Input[T]
+            The executed input.
+        execution: Execution
+            A summary of the execution.
+        num_novel: int
+            The number of components that were covered by the input but not
+            by any previously executed input.
+        """
+
 
 class InputInjector(Generic[T]):
     """Injects a given input into the application under test."""
@@ -208,6 +677,55 @@ class InputInjector(Generic[T]):
 
 class InputGenerator(Iterator[Input[T]]):
     """Produces fuzzing inputs according to a given strategy."""
+    def observe(self,
+                inp: Input[T],
+                execution: 'Execution',
+                num_novel: int
+                ) -> None:
+        """Informs the generator of the outcome of an input that it
+        produced. Does nothing by default. See :meth:`Mutator.observe`."""
+
+
+class SeedSerialiser(Generic[T]):
+    """Converts seed inputs to and from a portable binary representation.
+
+    Seeds are typically built from types that are generated dynamically by
+    ROSWire and so cannot be pickled. Serialisers are used whenever a seed
+    must leave the process that created it (e.g., when distributing seeds to
+    remote workers).
+    """
+    def dumps(self, seed: T) -> bytes:
+        """Produces a binary representation of a given seed."""
+        raise NotImplementedError
+
+    def loads(self, description: AppDescription, data: bytes) -> T:
+        """Reconstructs a seed from its binary representation.
+
+        Parameters
+        ----------
+        description: AppDescription
+            A description of the application under test, used to resolve
+            the types that appear in the seed.
+        data: bytes
+            The binary representation of the seed.
+        """
+        raise NotImplementedError
+
+    def dumps_mutation(self, mutation: Mutation[T]) -> bytes:
+        """Produces a binary representation of a given mutation.
+
+        By default, mutations are pickled. Serialisers for seeds whose
+        mutations may hold types that are generated by ROSWire should
+        override this method and :meth:`loads_mutation`.
+        """
+        return pickle.dumps(mutation)
+
+    def loads_mutation(self,
+                       description: AppDescription,
+                       data: bytes
+                       ) -> Mutation[T]:
+        """Reconstructs a mutation from its binary representation."""
+        return pickle.loads(data)
 
 
 FailureDetectorFactory = Callable[[AppInstance, threading.Event],
@@ -218,6 +736,19 @@ class Failure:
     """Base class used to describe a failure of the application."""
 
 
+@attr.s(frozen=True)
+class ContainerOOM(Failure):
+    """Reported when a process within the container was killed for
+    exceeding the memory limit of the container.
+
+    Attributes
+    ----------
+    memory_mb: int
+        The memory limit of the container, in megabytes.
+    """
+    memory_mb: int = attr.ib()
+
+
 class FailureDetector(contextlib.AbstractContextManager):
     """Abstract base class used by all failure detectors."""
     def __init__(self,
@@ -283,10 +814,15 @@ class Execution:
         The failures that were detected during the execution.
     coverage: Optional[Coverage]
         An optional coverage report for the execution.
+    phase_secs: Dict[str, float]
+        The number of seconds spent in each phase of the execution (e.g.,
+        launching the application, injecting the input). Phase timings are
+        not considered when comparing executions.
     """
     duration_secs: float = attr.ib()
     failures: FrozenSet[Failure] = attr.ib(converter=frozenset)
     coverage: Optional[Coverage] = attr.ib()
+    phase_secs: Dict[str, float] = attr.ib(factory=dict, cmp=False)
 
     @property
     def failed(self) -> bool:
@@ -318,9 +854,18 @@ class ResourceLimits:
         be allowed to run, given in minutes.
     num_inputs: int, optional
         The maximum number of inputs that may be evaluated.
+    count_cached_inputs: bool
+        If true, inputs whose outcomes are obtained from the execution cache
+        count towards the maximum number of inputs.
+    max_consecutive_cached_inputs: int, optional
+        The maximum number of consecutive inputs whose outcomes may be
+        obtained from the execution cache before the input space is deemed
+        to be exhausted.
     """
     wall_clock_mins = attr.ib(type=Optional[float], default=None)
     num_inputs = attr.ib(type=Optional[int], default=None)
+    count_cached_inputs = attr.ib(type=bool, default=False)
+    max_consecutive_cached_inputs = attr.ib(type=Optional[int], default=1000)
 
 
 @attr.s(frozen=True)
@@ -338,6 +883,88 @@ class ResourceUsage:
     num_inputs = attr.ib(type=int, default=0)
 
 
+@attr.s
+class CampaignStats:
+    """Summarises the progress of a fuzzing campaign as it runs.
+
+    Attributes
+    ----------
+    num_executions: int
+        The number of inputs that have been executed.
+    num_cached: int
+        The number of inputs whose outcomes were obtained from a cache.
+    corpus_size: int
+        The number of inputs that have covered new components.
+    coverage_size: int
+        The number of components that have been covered.
+    failures: Set[Failure]
+        The unique failures that have been found.
+    """
+    num_executions: int = attr.ib(default=0)
+    num_cached: int = attr.ib(default=0)
+    corpus_size: int = attr.ib(default=0)
+    coverage_size: int = attr.ib(default=0)
+    failures: Set['Failure'] = attr.ib(factory=set)
+    _phase_secs: Dict[str, float] = attr.ib(factory=dict, repr=False)
+    _started_at: Optional[float] = attr.ib(default=None, repr=False)
+
+    def start(self) -> None:
+        """Marks the start of the campaign."""
+        self._started_at = time.time()
+
+    @property
+    def duration_secs(self) -> float:
+        """The number of seconds that have passed since the campaign began."""
+        if self._started_at is None:
+            return 0.0
+        return time.time() - self._started_at
+
+    @property
+    def executions_per_sec(self) -> float:
+        """The mean number of inputs executed per second."""
+        duration = self.duration_secs
+        return self.num_executions / duration if duration > 0 else 0.0
+
+    @property
+    def mean_phase_secs(self) -> Dict[str, float]:
+        """The mean number of seconds spent in each phase of an execution."""
+        if not self.num_executions:
+            return {}
+        return {phase: secs / self.num_executions
+                for phase, secs in self._phase_secs.items()}
+
+    def record(self, execution: 'Execution') -> None:
+        """Records the outcome of an executed input."""
+        self.num_executions += 1
+        self.failures.update(execution.failures)
+        for phase, secs in execution.phase_secs.items():
+            self._phase_secs[phase] = self._phase_secs.get(phase, 0.0) + secs
+
+    def __str__(self) -> str:
+        phases = ' '.join(f'{phase}={secs:.2f}s'
+                          for phase, secs in self.mean_phase_secs.items())
+        return (f'execs: {self.num_executions} '
+                f'({self.executions_per_sec:.2f}/s, '
+                f'{self.num_cached} cached) | '
+                f'corpus: {self.corpus_size} | '
+                f'coverage: {self.coverage_size} | '
+                f'crashes: {len(self.failures)} | '
+                f'{phases}').rstrip(' |')
+
+
+class _PhaseTimer:
+    """Measures the time spent in each consecutive phase of an execution."""
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self.__last = time.time()
+
+    def lap(self, phase: str) -> None:
+        """Marks the end of a given phase."""
+        now = time.time()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.__last
+        self.__last = now
+
+
 @attr.s
 class Fuzzer(Generic[T]):
     """Fuzzes a specified ROS application using a given strategy.
@@ -357,6 +984,30 @@ class Fuzzer(Generic[T]):
         fuzzing.
     resource_limits: ResourceLimits
         A description of the resource limits placed on the fuzzer.
+    cache: ExecutionCache[T], optional
+        If given, the outcomes of previously executed inputs are obtained
+        from this cache rather than by executing those inputs again.
+    snapshot: bool
+        If true, a single container is provisioned for the application and
+        checkpointed once the application has been launched. Each execution
+        then restores the application from that checkpoint rather than
+        launching it from scratch. If the Docker host does not support
+        checkpoints, the fuzzer falls back to launching the application for
+        each execution.
+    settle_secs: float
+        The number of seconds to wait, after the input has been injected,
+        for its effects on the application to become apparent. The wait is
+        cut short as soon as a failure is detected (e.g., by a
+        :class:`roshammer.detect.NodeHangDetector`).
+    corpus: Union[List[Input[T]], CorpusStore[T]]
+        The executed inputs that covered new components. A
+        :class:`roshammer.store.CorpusStore` may be given to keep the corpus
+        within a memory budget.
+
+    stats: CampaignStats
+        A live summary of the progress of the campaign.
+    failures: List[Tuple[Input[T], Execution]]
+        The executed inputs that caused a failure, along with their outcomes.
 
     Raises
     ------
@@ -369,8 +1020,21 @@ class Fuzzer(Generic[T]):
     detectors: List[FailureDetectorFactory] = attr.ib(converter=list)
     num_workers: int = attr.ib(default=1)
     resource_limits: ResourceLimits = attr.ib(default=ResourceLimits())
+    cache: Optional['ExecutionCache[T]'] = attr.ib(default=None)
+    snapshot: bool = attr.ib(default=False)
+    settle_secs: float = attr.ib(default=15.0)
+    corpus: 'Union[List[Input[T]], CorpusStore[T]]' = \
+        attr.ib(factory=list, repr=False)
     _stopwatch: Stopwatch = attr.ib(default=Stopwatch())
     _num_executed_inputs: int = attr.ib(default=0)
+    _snapshot_container: Optional[AppContainer] = \
+        attr.ib(default=None, init=False, repr=False)
+    _resources: contextlib.ExitStack = \
+        attr.ib(factory=contextlib.ExitStack, init=False, repr=False)
+    stats: CampaignStats = attr.ib(factory=CampaignStats, init=False)
+    failures: List[Tuple[Input[T], Execution]] = \
+        attr.ib(factory=list, init=False, repr=False)
+    _coverage: Set[int] = attr.ib(factory=set, init=False, repr=False)
 
     @property
     def resource_usage(self) -> ResourceUsage:
@@ -407,6 +1071,66 @@ class Fuzzer(Generic[T]):
             with container.launch() as inst:
                 yield inst
 
+    def _prepare_snapshot(self) -> Optional[AppContainer]:
+        """Provides the checkpointed container for the application, if any,
+        taking a checkpoint if one has not already been taken."""
+        if not self.snapshot:
+            return None
+        if self._snapshot_container is None:
+            provision = self.app.provision(self.rsw)
+            container = self._resources.enter_context(provision)
+            if container.checkpoint(SNAPSHOT_NAME):
+                logger.info("checkpointed application: %s", container.name)
+                self._snapshot_container = container
+            else:
+                logger.warning("failed to checkpoint application: "
+                               "falling back to launching on each execution")
+                self._resources.close()
+                self.snapshot = False
+        return self._snapshot_container
+
+    @contextlib.contextmanager
+    def _provision(self) -> Iterator[AppContainer]:
+        container = self._prepare_snapshot()
+        if container is not None:
+            yield container
+        else:
+            with self.app.provision(self.rsw) as container:
+                yield container
+
+    def _launch(self, container: AppContainer) -> ContextManager[AppInstance]:
+        if container is self._snapshot_container:
+            return container.restore(SNAPSHOT_NAME)
+        return container.launch()
+
+    def close(self) -> None:
+        """Destroys any containers that are held by this fuzzer."""
+        self._resources.close()
+        self._snapshot_container = None
+
+    @property
+    def coverage(self) -> Coverage:
+        """The global coverage achieved by the campaign."""
+        return Coverage(self._coverage)
+
+    def _record(self, inp: Input[T], execution: Execution) -> None:
+        """Updates the corpus to reflect the outcome of an execution."""
+        if execution.failures:
+            self.failures.append((inp, execution))
+        num_novel = 0
+        if execution.coverage:
+            novel = execution.coverage - self._coverage
+            num_novel = len(novel)
+            if novel:
+                self._coverage |= novel
+                self.corpus.append(inp)
+        if isinstance(self.inputs, InputGenerator):
+            self.inputs.observe(inp, execution, num_novel)
+        stats = self.stats
+        stats.record(execution)
+        stats.corpus_size = len(self.corpus)
+        stats.coverage_size = len(self._coverage)
+
     def execute(self, inp: Input[T]) -> Execution:
         """Spawns an instance of the app and fuzzes it with a given input.
 
@@ -421,8 +1145,14 @@ class Fuzzer(Generic[T]):
             A summary of the execution.
         """
         # logger.info("fuzzing with input: %s", inp)
-        with self.app.provision(self.rsw) as container:
-            with container.launch() as app:
+        timer = _PhaseTimer()
+        memory_mb = self.app.limits.memory_mb
+        with self._provision() as container:
+            if memory_mb is not None:
+                num_oom_kills = container.num_oom_kills()
+            timer.lap('provision')
+            with self._launch(container) as app:
+                timer.lap('launch')
                 with contextlib.ExitStack() as stack:
                     has_failed = threading.Event()
                     detectors = []
@@ -436,33 +1166,70 @@ class Fuzzer(Generic[T]):
                     # for failure.
                     stopwatch = Stopwatch()
                     stopwatch.start()
+                    timer.lap('detect')
                     self.inject(app, has_failed, inp)
-                    time.sleep(15)  # TODO customise
+                    timer.lap('inject')
+                    has_failed.wait(self.settle_secs)
+                    timer.lap('settle')
                     stopwatch.stop()
 
                     # return a summary of the execution.
                     duration = stopwatch.duration
                     failures = [d.failure for d in detectors if d.failure]
+            timer.lap('shutdown')
 
-            # collect coverage
-            coverage = container.read_coverage()
+            # memory exhaustion shows up as OOM kills rather than as a hang
+            if memory_mb is not None:
+                if container.num_oom_kills() > num_oom_kills:
+                    failures.append(ContainerOOM(memory_mb))
+                timer.lap('oom')
 
-        out = Execution(duration, failures, coverage)  # type: ignore
+            # collect coverage
+            coverage = app.container.read_coverage()
+            timer.lap('coverage')
+        timer.lap('release')
+
+        out = Execution(duration,
+                        failures,  # type: ignore
+                        coverage,
+                        timer.phases)
         logger.info("fuzzing outcome for input: %s", out)
         return out
 
     def fuzz(self) -> None:
         """Launches a fuzzing campaign using this fuzzing configuration."""
         logger.info("started fuzzing campaign")
+        limits = self.resource_limits
+        num_consecutive_hits = 0
+        self.stats.start()
         self._stopwatch.start()
-        for inp in self.inputs:
-            logger.info("fuzzing input #%d (running time: %.2f mins)",
-                        self._num_executed_inputs,
-                        self._stopwatch.duration / 60)
-            if self.has_reached_resource_limits:
-                logger.info("reached resource limits")
-                break
-            outcome = self.execute(inp)
-            self._num_executed_inputs += 1
-        self._stopwatch.stop()
+        try:
+            for inp in self.inputs:
+                logger.info("fuzzing input #%d (running time: %.2f mins)",
+                            self._num_executed_inputs,
+                            self._stopwatch.duration / 60)
+                if self.has_reached_resource_limits:
+                    logger.info("reached resource limits")
+                    break
+                outcome = self.cache.get(inp) if self.cache else None
+                if outcome is not None:
+                    logger.debug("using cached outcome for input")
+                    self.stats.num_cached += 1
+                    if limits.count_cached_inputs:
+                        self._num_executed_inputs += 1
+                    num_consecutive_hits += 1
+                    max_hits = limits.max_consecutive_cached_inputs
+                    if max_hits and num_consecutive_hits >= max_hits:
+                        logger.info("input space appears to be exhausted")
+                        break
+                    continue
+                num_consecutive_hits = 0
+                outcome = self.execute(inp)
+                if self.cache is not None:
+                    self.cache.put(inp, outcome)
+                self._num_executed_inputs += 1
+                self._record(inp, outcome)
+        finally:
+            self._stopwatch.stop()
+            self.close()
         logger.info("finished fuzzing campaign")
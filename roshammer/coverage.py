@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a global coverage map that is shared between the
+processes of a fuzzing campaign.
+
+Rather than sending every coverage report back to a single process to
+determine whether an input covered anything new, each worker merges its
+coverage into a fixed-size map held in shared memory and determines the
+novelty of its inputs locally, in the style of AFL's coverage bitmap.
+"""
+__all__ = ('CoverageMap',)
+
+from typing import Iterable, List
+import multiprocessing
+
+import numpy as np
+
+from .core import Coverage
+
+# Knuth's multiplicative hashing constant for 64-bit keys
+_FIBONACCI = np.uint64(0x9E3779B97F4A7C15)
+
+
+class CoverageMap:
+    """A fixed-size map of covered components that lives in shared memory.
+
+    Each component (e.g., an edge or PC identifier produced by the
+    instrumentation for a given :class:`CoverageLevel`) is hashed to a
+    single byte-sized slot within the map. Since the map has a fixed size,
+    distinct components may occasionally share a slot; with the default size
+    of 2^20 slots, collisions are rare for applications with tens of
+    thousands of instrumented components.
+
+    Updates are guarded by a set of locks, each of which covers a contiguous
+    stripe of the map, so that concurrent workers only contend when their
+    coverage falls within the same stripes. Reads are lock-free.
+
+    The map must be passed to worker processes when they are created (e.g.,
+    as an argument to :class:`multiprocessing.Process`).
+    """
+    def __init__(self, size_bits: int = 20, num_stripes: int = 64) -> None:
+        """
+        Parameters
+        ----------
+        size_bits: int
+            The base-2 logarithm of the number of slots in the map.
+        num_stripes: int
+            The number of locks that guard the map. Must be a power of two
+            that does not exceed the number of slots.
+
+        Raises
+        ------
+        ValueError
+            if the size or number of stripes is illegal.
+        """
+        if not 0 < size_bits <= 32:
+            raise ValueError('size must be between 1 and 32 bits.')
+        if num_stripes < 1 or num_stripes & (num_stripes - 1):
+            raise ValueError('number of stripes must be a power of two.')
+        if num_stripes > 2 ** size_bits:
+            raise ValueError('number of stripes cannot exceed map size.')
+        self.__size_bits = size_bits
+        self.__stripe_bits = size_bits - (num_stripes.bit_length() - 1)
+        self.__slots = multiprocessing.RawArray('B', 2 ** size_bits)
+        self.__locks: List = [multiprocessing.Lock()
+                              for _ in range(num_stripes)]
+
+    def __getstate__(self):
+        return (self.__size_bits, self.__stripe_bits, self.__slots,
+                self.__locks)
+
+    def __setstate__(self, state) -> None:
+        (self.__size_bits, self.__stripe_bits, self.__slots,
+         self.__locks) = state
+
+    @property
+    def _array(self) -> np.ndarray:
+        return np.frombuffer(self.__slots, dtype=np.uint8)
+
+    def _slots(self, components: Iterable[int]) -> np.ndarray:
+        """Computes the slots for a given set of components."""
+        keys = np.fromiter(components, dtype=np.uint64)
+        shift = np.uint64(64 - self.__size_bits)
+        return (keys * _FIBONACCI) >> shift
+
+    def __len__(self) -> int:
+        """The number of slots in the map."""
+        return len(self.__slots)
+
+    @property
+    def num_covered(self) -> int:
+        """The number of slots that have been covered."""
+        return int(np.count_nonzero(self._array))
+
+    def __contains__(self, component: object) -> bool:
+        if not isinstance(component, int):
+            return False
+        slot = int(self._slots((component,))[0])
+        return self.__slots[slot] != 0
+
+    def is_novel(self, coverage: Iterable[int]) -> bool:
+        """Determines, without updating the map, whether a given coverage
+        report covers any component that has not been covered before."""
+        slots = self._slots(coverage)
+        return bool(slots.size) and not self._array[slots].all()
+
+    def update(self, coverage: Iterable[int]) -> Coverage:
+        """Merges a given coverage report into the map.
+
+        Returns
+        -------
+        Coverage
+            The components within the report that had not been covered
+            before. If two processes concurrently cover the same new
+            component, only one of them is told that it is new.
+        """
+        components = np.fromiter(coverage, dtype=np.uint64)
+        if not components.size:
+            return Coverage()
+        slots = self._slots(components)
+        stripes = slots >> np.uint64(self.__stripe_bits)
+        array = self._array
+        novel: List[int] = []
+        for stripe in np.unique(stripes[array[slots] == 0]):
+            in_stripe = stripes == stripe
+            with self.__locks[int(stripe)]:
+                unset = in_stripe & (array[slots] == 0)
+                array[slots[unset]] = 1
+            # a component is novel only if it was the first to claim its slot
+            _, first = np.unique(slots[unset], return_index=True)
+            novel.extend(int(c) for c in components[unset][first])
+        return Coverage(novel)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides an on-disk cache of application descriptions that is
+faster to load than the YAML descriptions stored by ROSWire.
+
+Descriptions are keyed by the digest of their Docker image and are stored as
+pickled dictionaries of their package and format databases. Type databases
+are generated dynamically by ROSWire and cannot be pickled, and so they are
+rebuilt from the format database whenever a description is loaded.
+Descriptions are also kept in memory, so that repeated calls for the same
+image within a process are free.
+"""
+__all__ = ('DescriptionCache',)
+
+from typing import Dict, Optional
+import logging
+import os
+import pickle
+import tempfile
+
+from roswire import ROSWire
+from roswire.definitions import FormatDatabase, PackageDatabase, TypeDatabase
+
+from .core import AppDescription
+
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# bumped whenever the layout of cached descriptions changes
+_CACHE_VERSION = 1
+
+
+class DescriptionCache:
+    """Loads and stores application descriptions keyed by image digest."""
+    def __init__(self, rsw: ROSWire, dir_cache: Optional[str] = None) -> None:
+        """
+        Parameters
+        ----------
+        rsw: ROSWire
+            The ROSWire session used to resolve image digests and to build
+            descriptions that are not cached.
+        dir_cache: str, optional
+            The directory in which descriptions are stored. Defaults to a
+            directory within the ROSWire workspace, which is shared by all
+            sessions (and hence workers) on the same host.
+        """
+        if dir_cache is None:
+            dir_cache = os.path.join(rsw.workspace, 'roshammer',
+                                     'descriptions')
+        os.makedirs(dir_cache, exist_ok=True)
+        self.__rsw = rsw
+        self.__dir_cache = dir_cache
+        self.__in_memory: Dict[str, AppDescription] = {}
+
+    @property
+    def dir(self) -> str:
+        """The directory in which descriptions are stored."""
+        return self.__dir_cache
+
+    def _filename(self, sha256: str) -> str:
+        return os.path.join(self.__dir_cache, f'{sha256}.pickle')
+
+    def _load(self, sha256: str) -> Optional[AppDescription]:
+        try:
+            with open(self._filename(sha256), 'rb') as f:
+                d = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.exception("failed to load cached description: %s", sha256)
+            return None
+        if d.get('version') != _CACHE_VERSION:
+            logger.debug("ignoring stale cached description: %s", sha256)
+            return None
+        packages = PackageDatabase.from_dict(d['packages'])
+        formats = FormatDatabase.from_dict(d['formats'])
+        types = TypeDatabase.build(formats)
+        return AppDescription(sha256=sha256,
+                              types=types,
+                              formats=formats,
+                              packages=packages)
+
+    def _save(self, description: AppDescription) -> None:
+        d = {'version': _CACHE_VERSION,
+             'packages': description.packages.to_dict(),
+             'formats': description.formats.to_dict()}
+        # write atomically, since many workers may share the same cache
+        fd, fn_temp = tempfile.mkstemp(dir=self.__dir_cache)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(d, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(fn_temp, self._filename(description.sha256))
+        except Exception:
+            os.remove(fn_temp)
+            raise
+
+    def load_or_build(self, image: str) -> AppDescription:
+        """Obtains the description for a given Docker image, building it
+        via ROSWire if it has not been cached."""
+        sha256 = self.__rsw.containers.image_sha256(image)
+        description = self.__in_memory.get(sha256)
+        if description is None:
+            description = self._load(sha256)
+        if description is None:
+            logger.debug("no cached description for image: %s", image)
+            description = self.__rsw.descriptions.load_or_build(image)
+            self._save(description)
+        self.__in_memory[sha256] = description
+        return description
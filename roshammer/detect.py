@@ -3,9 +3,11 @@
 This module implements various failure detection monitors that are used to
 dynasmically identify instances of failure within the application under test.
 """
-__all__ = ('NodeCrashed', 'NodeCrashDetector')
+__all__ = ('NodeCrashed', 'NodeCrashDetector', 'NodeHung', 'NodeHangDetector')
 
-from typing import Tuple, Iterator, FrozenSet, Collection, Callable
+from typing import (Tuple, Iterator, FrozenSet, Collection, Callable, Dict,
+                    Deque, List, Mapping, Optional)
+import collections
 import time
 import functools
 import contextlib
@@ -13,6 +15,7 @@ import threading
 import logging
 
 import attr
+import psutil
 from roswire.proxy import ShellProxy, ROSProxy
 
 from .core import (AppInstance, Failure, FailureDetector,
@@ -21,6 +24,8 @@ from .core import (AppInstance, Failure, FailureDetector,
 logger: logging.Logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+_CALLER_ID = '/roshammer'
+
 
 @attr.s(frozen=True)
 class NodeCrashed(Failure):
@@ -54,3 +59,205 @@ class NodeCrashDetector(FailureDetector):
                     self._report_failure(failure)
                     return
             time.sleep(0.1)
+
+
+@attr.s(frozen=True)
+class NodeHung(Failure):
+    """Thrown when a monitored node has stopped making progress.
+
+    Attributes
+    ----------
+    node: str
+        The name of the node that hung.
+    reason: str
+        A short description of the symptom that was observed (e.g., an
+        output topic that stopped publishing, or a node that was spinning).
+    """
+    node: str = attr.ib()
+    reason: str = attr.ib()
+
+
+class NodeHangDetector(FailureDetector):
+    """Detects nodes that deadlock, stall, or spin.
+
+    A node is considered to have hung if, for the entirety of a sliding
+    window, any of the following holds:
+
+    * one of the watched output topics was published at a rate below its
+      given minimum rate.
+    * one of the watched nodes used at least :code:`spin_cpu_percent` of a
+      CPU (i.e., it is stuck in a busy loop).
+    * one of the watched nodes used no more than :code:`idle_cpu_percent` of
+      a CPU (i.e., it is blocked), if an idle threshold is given.
+
+    Checks are only performed once the detector has been running for at
+    least one window, giving the application a chance to respond to its
+    input.
+
+    Topic rates are measured using the bus statistics of the nodes that
+    publish to each topic, and so only messages that are delivered to at
+    least one subscriber are counted.
+    """
+    @classmethod
+    def factory(cls,
+                topics: Optional[Mapping[str, float]] = None,
+                nodes: Collection[str] = (),
+                window_secs: float = 5.0,
+                spin_cpu_percent: Optional[float] = 95.0,
+                idle_cpu_percent: Optional[float] = None
+                ) -> FailureDetectorFactory:
+        """Produces a factory for this detector.
+
+        Parameters
+        ----------
+        topics: Mapping[str, float], optional
+            The minimum rate, in Hz, for each watched output topic.
+        nodes: Collection[str]
+            The names of the nodes whose CPU usage should be watched.
+        window_secs: float
+            The length of the window, in seconds, within which hangs are
+            reported.
+        spin_cpu_percent: float, optional
+            The CPU usage, given as a percentage of a single CPU, at or above
+            which a node is considered to be spinning.
+        idle_cpu_percent: float, optional
+            The CPU usage at or below which a node is considered to be
+            idle. Idle detection is disabled by default since many nodes
+            legitimately wait for input.
+
+        Raises
+        ------
+        ValueError
+            if the window is not positive.
+        """
+        if window_secs <= 0:
+            raise ValueError('window must be positive.')
+        return functools.partial(cls,
+                                 topics=dict(topics or {}),
+                                 nodes=nodes,
+                                 window_secs=window_secs,
+                                 spin_cpu_percent=spin_cpu_percent,
+                                 idle_cpu_percent=idle_cpu_percent)
+
+    def __init__(self,
+                 app_instance: AppInstance,
+                 has_failed: threading.Event,
+                 topics: Mapping[str, float],
+                 nodes: Collection[str],
+                 window_secs: float,
+                 spin_cpu_percent: Optional[float],
+                 idle_cpu_percent: Optional[float],
+                 interval_secs: float = 0.5
+                 ) -> None:
+        self.__topics = dict(topics)
+        self.__nodes = frozenset(nodes)
+        self.__window_secs = window_secs
+        self.__spin_cpu_percent = spin_cpu_percent
+        self.__idle_cpu_percent = idle_cpu_percent
+        self.__interval_secs = interval_secs
+        self.__publishers: Dict[str, List[str]] = {}
+        self.__processes: Dict[str, psutil.Process] = {}
+        super().__init__(app_instance, has_failed)
+
+    def _find_publishers(self) -> Dict[str, List[str]]:
+        """Determines the nodes that publish to each watched topic."""
+        master = self._app_instance.ros.connection
+        code, msg, state = master.getSystemState(_CALLER_ID)
+        if code != 1:
+            logger.warning("failed to obtain system state: %s", msg)
+            return {}
+        publishers = {topic: sorted(nodes) for topic, nodes in state[0]}
+        return {topic: publishers.get(topic, [])
+                for topic in self.__topics}
+
+    def _count_messages(self) -> Dict[str, int]:
+        """Reports the number of messages that have been delivered on each
+        watched topic since its publishers were launched."""
+        # topics may not be advertised until their publishers are ready
+        if not self.__publishers or not all(self.__publishers.values()):
+            self.__publishers = self._find_publishers()
+        nodes = self._app_instance.ros.nodes
+        counts = {topic: 0 for topic in self.__topics}
+        publishers = set(n for ns in self.__publishers.values() for n in ns)
+        for name in publishers:
+            try:
+                code, msg, stats = \
+                    nodes[name].api.getBusStats(_CALLER_ID)
+            except Exception:
+                logger.exception("failed to obtain bus stats: %s", name)
+                continue
+            if code != 1:
+                continue
+            # publishStats: [topic, bytesSent, [[id, bytes, numSent, ok]]]
+            for topic, _, connections in stats[0]:
+                if topic in counts:
+                    counts[topic] += sum(c[2] for c in connections)
+        return counts
+
+    def _measure_cpu(self) -> Dict[str, float]:
+        """Reports the CPU usage of each watched node since it was last
+        measured, given as a percentage of a single CPU."""
+        usage: Dict[str, float] = {}
+        nodes = self._app_instance.ros.nodes
+        for name in self.__nodes:
+            try:
+                if name not in self.__processes:
+                    process = psutil.Process(nodes[name].pid_host)
+                    process.cpu_percent(None)
+                    self.__processes[name] = process
+                    continue
+                usage[name] = self.__processes[name].cpu_percent(None)
+            except Exception:
+                # crashes are the responsibility of NodeCrashDetector
+                logger.debug("failed to measure CPU usage: %s", name)
+        return usage
+
+    def listen(self) -> None:
+        logger.debug("listening for failures [%s]", self)
+        window = self.__window_secs
+        spin = self.__spin_cpu_percent
+        idle = self.__idle_cpu_percent
+        history: Dict[str, Deque[Tuple[float, int]]] = \
+            {topic: collections.deque() for topic in self.__topics}
+        spinning_since: Dict[str, float] = {}
+        idle_since: Dict[str, float] = {}
+        started_at = time.time()
+
+        while self.running:
+            now = time.time()
+            for topic, count in self._count_messages().items():
+                samples = history[topic]
+                samples.append((now, count))
+                # keep the latest sample that precedes the window
+                while len(samples) > 1 and samples[1][0] <= now - window:
+                    samples.popleft()
+                if now - started_at < window:
+                    continue
+                first_time, first_count = samples[0]
+                elapsed = max(now - first_time, self.__interval_secs)
+                rate = (count - first_count) / elapsed
+                if rate < self.__topics[topic]:
+                    publishers = self.__publishers.get(topic) or [topic]
+                    reason = f'rate of {topic} dropped to {rate:.2f} Hz'
+                    self._report_failure(NodeHung(publishers[0], reason))
+                    return
+
+            for node, cpu in self._measure_cpu().items():
+                if spin is not None and cpu >= spin:
+                    spinning_since.setdefault(node, now)
+                else:
+                    spinning_since.pop(node, None)
+                if idle is not None and cpu <= idle:
+                    idle_since.setdefault(node, now)
+                else:
+                    idle_since.pop(node, None)
+                if now - spinning_since.get(node, now) >= window:
+                    reason = f'spinning at {cpu:.0f}% CPU'
+                    self._report_failure(NodeHung(node, reason))
+                    return
+                if now - idle_since.get(node, now) >= window:
+                    reason = f'idle at {cpu:.0f}% CPU'
+                    self._report_failure(NodeHung(node, reason))
+                    return
+
+            time.sleep(self.__interval_secs)
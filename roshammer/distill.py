@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides corpus distillation (in the style of afl-cmin), which
+reduces a set of seeds to a small subset that achieves the same coverage.
+
+Each candidate seed is executed once, and a subset of the seeds that covers
+every component covered by the candidates is then selected via greedy
+weighted set cover. Seeds that cover more new components per second of
+execution are selected first, and ties are broken in favour of smaller
+seeds.
+"""
+__all__ = ('distill', 'select_covering_subset')
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+import logging
+import queue
+import threading
+
+import attr
+import numpy as np
+
+from .core import Coverage, Execution, Fuzzer, Input
+
+T = TypeVar('T')
+
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+def _bitsets(coverages: Sequence[Optional[Coverage]]) -> List[int]:
+    """Encodes each coverage report as a bitset over all covered
+    components."""
+    index: Dict[int, int] = {}
+    for coverage in coverages:
+        for component in coverage or ():
+            index.setdefault(component, len(index))
+    bitsets: List[int] = []
+    for coverage in coverages:
+        bits = np.zeros(len(index), dtype=bool)
+        bits[[index[c] for c in coverage or ()]] = True
+        bitsets.append(int.from_bytes(np.packbits(bits).tobytes(), 'big'))
+    return bitsets
+
+
+def select_covering_subset(coverages: Sequence[Optional[Coverage]],
+                           costs: Sequence[float],
+                           sizes: Sequence[float]
+                           ) -> List[int]:
+    """Selects a small subset of coverage reports that covers every component
+    covered by a given sequence of reports.
+
+    Parameters
+    ----------
+    coverages: Sequence[Optional[Coverage]]
+        The coverage reports for each candidate. Candidates without a
+        coverage report are never selected.
+    costs: Sequence[float]
+        The cost (e.g., execution time) of each candidate.
+    sizes: Sequence[float]
+        The size of each candidate, used to break ties between candidates
+        that cover the same number of components per unit cost.
+
+    Returns
+    -------
+    List[int]
+        The indices of the selected candidates, in the order in which they
+        were selected.
+    """
+    bitsets = _bitsets(coverages)
+    uncovered = 0
+    for bits in bitsets:
+        uncovered |= bits
+    remaining = set(i for i, bits in enumerate(bitsets) if bits)
+    selected: List[int] = []
+
+    def score(i: int) -> Any:
+        gain = _popcount(bitsets[i] & uncovered)
+        return (gain / max(costs[i], 1e-9), -sizes[i], -i)
+
+    while uncovered:
+        best = max(remaining, key=score)
+        remaining.remove(best)
+        selected.append(best)
+        uncovered &= ~bitsets[best]
+
+    # drop any candidates that were made redundant by later selections
+    for i in reversed(selected[:]):
+        others = 0
+        for j in selected:
+            if j != i:
+                others |= bitsets[j]
+        if not bitsets[i] & ~others:
+            selected.remove(i)
+    return selected
+
+
+def _execute_all(fuzzer: Fuzzer[T],
+                 seeds: Sequence[T],
+                 num_workers: int
+                 ) -> List[Optional[Execution]]:
+    """Executes each seed once, using a given number of threads.
+
+    Each thread uses its own copy of the fuzzer, and hence its own
+    containers. Seeds that cannot be executed are given no outcome.
+    """
+    outcomes: List[Optional[Execution]] = [None] * len(seeds)
+    todo: 'queue.Queue[int]' = queue.Queue()
+    for i in range(len(seeds)):
+        todo.put(i)
+
+    def work() -> None:
+        worker = attr.evolve(fuzzer)
+        try:
+            while True:
+                try:
+                    i = todo.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    outcomes[i] = worker.execute(Input(seeds[i]))
+                except Exception:
+                    logger.exception("failed to execute seed #%d", i)
+        finally:
+            worker.close()
+
+    threads = [threading.Thread(target=work) for _ in range(num_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def distill(fuzzer: Fuzzer[T],
+            seeds: Sequence[T],
+            num_workers: int = 1,
+            size: Callable[[T], float] = len  # type: ignore
+            ) -> List[int]:
+    """Reduces a set of seeds to a subset that achieves the same coverage.
+
+    Parameters
+    ----------
+    fuzzer: Fuzzer[T]
+        The fuzzer that should be used to execute the seeds. Its application
+        must be instrumented for coverage.
+    seeds: Sequence[T]
+        The candidate seeds.
+    num_workers: int
+        The number of seeds that should be executed in parallel.
+    size: Callable[[T], float]
+        Computes the size of a seed. Defaults to its length (e.g., the number
+        of messages in a bag).
+
+    Returns
+    -------
+    List[int]
+        The indices of the seeds within the distilled corpus. Seeds that
+        cannot be executed or that cause a failure are never selected.
+
+    Raises
+    ------
+    ValueError
+        if the number of workers is less than one, or if the application
+        does not produce coverage reports.
+    """
+    if num_workers < 1:
+        raise ValueError('at least one worker must be used.')
+    outcomes = _execute_all(fuzzer, seeds, num_workers)
+    coverages: List[Optional[Coverage]] = []
+    costs: List[float] = []
+    for i, outcome in enumerate(outcomes):
+        if outcome is None:
+            coverages.append(None)
+            costs.append(0.0)
+            continue
+        if outcome.coverage is None:
+            raise ValueError('application does not produce coverage reports.')
+        if outcome.failures:
+            logger.warning("ignoring seed #%d since it causes failures: %s",
+                           i, outcome.failures)
+            coverages.append(None)
+        else:
+            coverages.append(outcome.coverage)
+        costs.append(outcome.duration_secs)
+    sizes = [size(seed) for seed in seeds]
+    selected = select_covering_subset(coverages, costs, sizes)
+    logger.info("distilled %d seeds to %d seeds", len(seeds), len(selected))
+    return selected
@@ -0,0 +1,643 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a coordinator/worker mode for fuzzing campaigns that are
+spread across multiple processes and Docker hosts.
+
+The coordinator owns the input generator, the global corpus, and the
+resource limits for the campaign. It hands out compact input descriptors
+(i.e., a seed fingerprint and a sequence of serialised mutations) to its
+workers via a
+:code:`multiprocessing` manager that may be reached over TCP. Each worker
+owns its own ROSWire session (and hence its own Docker daemon), executes the
+inputs that it receives, and reports back a summary of each execution where
+the coverage report is reduced to those components that the worker has not
+previously reported. Workers on the same machine as the coordinator instead
+share a global coverage map (see :class:`CoverageMap`) and report only those
+components that are new to the campaign as a whole.
+"""
+__all__ = ('Coordinator', 'InputDescriptor', 'WorkerConfig', 'WorkerResult',
+           'run_worker')
+
+from typing import (Any, Dict, Generic, List, Optional, Set, Tuple, TypeVar,
+                    Union)
+from multiprocessing.managers import BaseManager, DictProxy
+from multiprocessing.managers import EventProxy  # type: ignore
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import attr
+from roswire import ROSWire
+from roswire.util import Stopwatch
+
+from .core import (App, AppDescription, CampaignStats, ContainerLimits,
+                   Coverage, CoverageLevel, Execution,
+                   FailureDetectorFactory, Fuzzer, Input, InputGenerator,
+                   InputInjector, ResourceLimits, ResourceUsage,
+                   SeedSerialiser)
+from .coverage import CoverageMap
+from .load import LoadGovernor
+
+T = TypeVar('T')
+
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+Address = Tuple[str, int]
+
+
+@attr.s(frozen=True, slots=True)
+class InputDescriptor:
+    """Provides a compact, picklable description of a fuzzing input.
+
+    Attributes
+    ----------
+    seed: str
+        The fingerprint of the seed for the input.
+    mutations: Tuple[bytes, ...]
+        The sequence of mutations that should be applied to the seed, given
+        in the binary form produced by the seed serialiser.
+    """
+    seed: str = attr.ib()
+    mutations: Tuple[bytes, ...] = attr.ib()
+
+
+@attr.s(frozen=True, slots=True)
+class WorkerConfig:
+    """Describes everything that a worker needs to execute inputs.
+
+    Descriptions of the application are not shared with workers since they
+    cannot be pickled. Instead, each worker loads the description for the
+    application image via its own ROSWire session.
+    """
+    image: str = attr.ib()
+    workspace: str = attr.ib()
+    launch_filename: str = attr.ib()
+    launch_prefix: Optional[str] = attr.ib()
+    inject: InputInjector = attr.ib()
+    detectors: Tuple[FailureDetectorFactory, ...] = attr.ib()
+    serialiser: SeedSerialiser = attr.ib()
+    snapshot: bool = attr.ib(default=False)
+    settle_secs: float = attr.ib(default=15.0)
+    coverage: CoverageLevel = attr.ib(default=CoverageLevel.DISABLED)
+    tmpfs_workspace: bool = attr.ib(default=False)
+    limits: ContainerLimits = attr.ib(default=ContainerLimits())
+
+
+@attr.s(frozen=True, slots=True)
+class WorkerResult:
+    """Describes the outcome of a task that was executed by a worker.
+
+    Attributes
+    ----------
+    task: int
+        The ID of the task.
+    worker: str
+        The name of the worker that executed the task.
+    execution: Execution, optional
+        A summary of the execution, or None if the task could not be
+        executed. Its coverage report, if any, contains only the components
+        that had not previously been reported by the worker or, if the
+        worker shares a coverage map with the coordinator, by any worker.
+    error: str, optional
+        A description of the error that prevented the task from being
+        executed, if any.
+    """
+    task: int = attr.ib()
+    worker: str = attr.ib()
+    execution: Optional[Execution] = attr.ib()
+    error: Optional[str] = attr.ib(default=None)
+
+
+@attr.s(frozen=True, slots=True)
+class _TaskClaim:
+    """Informs the coordinator that a worker has begun to execute a task."""
+    task: int = attr.ib()
+    worker: str = attr.ib()
+
+
+class _Box:
+    """Holds a single, shared value."""
+    def __init__(self) -> None:
+        self.__value: Any = None
+
+    def set(self, value: Any) -> None:
+        self.__value = value
+
+    def get(self) -> Any:
+        return self.__value
+
+
+# these objects are only ever accessed within the manager's server process
+_TASKS: 'queue.Queue[Tuple[int, InputDescriptor]]' = queue.Queue()
+_RESULTS: 'queue.Queue[Union[WorkerResult, _TaskClaim]]' = queue.Queue()
+_SEEDS: Dict[str, bytes] = {}
+_CONFIG = _Box()
+_STOPPED = threading.Event()
+
+
+def _tasks() -> 'queue.Queue[Tuple[int, InputDescriptor]]':
+    return _TASKS
+
+
+def _results() -> 'queue.Queue[Union[WorkerResult, _TaskClaim]]':
+    return _RESULTS
+
+
+def _seeds() -> Dict[str, bytes]:
+    return _SEEDS
+
+
+def _worker_config_box() -> _Box:
+    return _CONFIG
+
+
+def _stopped() -> threading.Event:
+    return _STOPPED
+
+
+class _CoordinatorManager(BaseManager):
+    """Shares the task and result queues of a coordinator with its workers."""
+
+
+_CoordinatorManager.register('tasks', callable=_tasks)
+_CoordinatorManager.register('results', callable=_results)
+_CoordinatorManager.register('seeds', callable=_seeds, proxytype=DictProxy)
+_CoordinatorManager.register('config', callable=_worker_config_box)
+_CoordinatorManager.register('stopped', callable=_stopped,
+                             proxytype=EventProxy)
+
+
+class _TaskInputGenerator(InputGenerator[T]):
+    """Pulls inputs from a coordinator on behalf of a worker."""
+    def __init__(self,
+                 manager: _CoordinatorManager,
+                 name: str,
+                 serialiser: SeedSerialiser[T],
+                 description: AppDescription
+                 ) -> None:
+        self.__tasks = manager.tasks()  # type: ignore
+        self.__results = manager.results()  # type: ignore
+        self.__seeds = manager.seeds()  # type: ignore
+        self.__stopped = manager.stopped()  # type: ignore
+        self.__name = name
+        self.__serialiser = serialiser
+        self.__description = description
+        self.__cache: Dict[str, T] = {}
+        self.task: Optional[int] = None
+
+    def _seed(self, fingerprint: str) -> T:
+        if fingerprint not in self.__cache:
+            logger.debug("fetching seed from coordinator: %s", fingerprint)
+            data = self.__seeds[fingerprint]
+            seed = self.__serialiser.loads(self.__description, data)
+            self.__cache[fingerprint] = seed
+        return self.__cache[fingerprint]
+
+    def _decode(self, desc: InputDescriptor) -> Input[T]:
+        inp: Input[T] = Input(self._seed(desc.seed))
+        for data in desc.mutations:
+            mutation = self.__serialiser.loads_mutation(self.__description,
+                                                        data)
+            inp = inp.mutate(mutation)
+        return inp
+
+    def report(self,
+               execution: Optional[Execution],
+               error: Optional[str] = None
+               ) -> None:
+        """Reports the outcome of the current task to the coordinator."""
+        assert self.task is not None
+        result = WorkerResult(self.task, self.__name, execution, error)
+        self.__results.put(result)
+
+    def __next__(self) -> Input[T]:
+        while not self.__stopped.is_set():
+            try:
+                task, desc = self.__tasks.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            self.task = task
+            self.__results.put(_TaskClaim(task, self.__name))
+            try:
+                return self._decode(desc)
+            except Exception as err:
+                logger.exception("failed to decode task: %d", task)
+                self.report(None, f'failed to decode task: {err!r}')
+        raise StopIteration
+
+
+def run_worker(address: Address,
+               authkey: bytes,
+               dir_workspace: Optional[str] = None,
+               coverage_map: Optional[CoverageMap] = None
+               ) -> None:
+    """Connects to a coordinator and executes inputs until told to stop.
+
+    Parameters
+    ----------
+    address: Tuple[str, int]
+        The address of the coordinator.
+    authkey: bytes
+        The authentication key for the coordinator.
+    dir_workspace: str, optional
+        The ROSWire workspace that should be used by this worker. If left
+        unspecified, the default workspace is used, unless the coordinator
+        asks for a workspace on tmpfs.
+    coverage_map: CoverageMap, optional
+        The global coverage map for the campaign, if the worker is running
+        on the same machine as the coordinator.
+    """
+    from .roshammer import ROSHammer, make_tmpfs_workspace
+
+    name = _worker_name(os.getpid())
+    manager = _CoordinatorManager(address=address, authkey=authkey)
+    manager.connect()
+    config: WorkerConfig = manager.config().get()  # type: ignore
+    logger.info("worker [%s] connected to coordinator: %s", name, address)
+
+    if dir_workspace is None and config.tmpfs_workspace:
+        dir_workspace = make_tmpfs_workspace()
+    rsw = ROSWire(dir_workspace)
+    app = ROSHammer(rsw).app(config.image,
+                             config.workspace,
+                             config.launch_filename,
+                             config.launch_prefix)
+    app = attr.evolve(app, coverage=config.coverage, limits=config.limits)
+    inputs: _TaskInputGenerator = _TaskInputGenerator(manager,
+                                                      name,
+                                                      config.serialiser,
+                                                      app.description)
+    fuzzer: Fuzzer = Fuzzer(rsw=rsw,
+                            app=app,
+                            inject=config.inject,
+                            inputs=inputs,
+                            detectors=config.detectors,  # type: ignore
+                            snapshot=config.snapshot,
+                            settle_secs=config.settle_secs)
+
+    reported: Set[int] = set()
+    try:
+        for inp in inputs:
+            try:
+                outcome = fuzzer.execute(inp)
+            except Exception as err:
+                logger.exception("worker [%s] failed to execute input: %s",
+                                 name, inp)
+                inputs.report(None, f'failed to execute input: {err!r}')
+                continue
+            coverage = outcome.coverage
+            if coverage is not None:
+                if coverage_map is not None:
+                    delta = coverage_map.update(coverage)
+                else:
+                    delta = Coverage(coverage - reported)
+                    reported |= coverage
+                outcome = attr.evolve(outcome, coverage=delta)
+            inputs.report(outcome)
+    finally:
+        fuzzer.close()
+    logger.info("worker [%s] finished", name)
+
+
+def _worker_name(pid: int) -> str:
+    return f'{os.uname().nodename}:{pid}'
+
+
+@attr.s
+class Coordinator(Generic[T]):
+    """Distributes a fuzzing campaign across a number of workers.
+
+    Workers may either be spawned locally by the coordinator, or started on
+    other Docker hosts via :code:`run_worker` (or :code:`roshammer worker`).
+    Remote workers must be able to access the application image via their
+    own Docker daemon.
+
+    Attributes
+    ----------
+    app: App
+        An instrumented form of the application under test.
+    inject: InputInjector[T]
+        Used to inject fuzzing inputs into the application under test.
+    inputs: InputGenerator[T]
+        Produces a stream of fuzzing inputs.
+    detectors: List[FailureDetectorFactory]
+        Used to detect failures during each execution.
+    serialiser: SeedSerialiser[T]
+        Used to share seed inputs with workers.
+    address: Tuple[str, int]
+        The address at which workers may reach the coordinator. By default,
+        the coordinator is only reachable from the local machine.
+    authkey: bytes, optional
+        The key that workers must use to authenticate with the coordinator.
+        If left unspecified, the authentication key of the current process
+        is used.
+    num_local_workers: int
+        The number of worker processes that should be spawned on the local
+        machine.
+    prefetch: int, optional
+        The maximum number of inputs that may be queued or under execution
+        at any moment. Defaults to twice the number of local workers.
+    governor: LoadGovernor, optional
+        If given, the number of inputs that may be queued or under
+        execution is further limited by the concurrency that the governor
+        deems appropriate for the load on the local host.
+    resource_limits: ResourceLimits
+        A description of the resource limits placed on the campaign.
+    snapshot: bool
+        If true, workers restore the application from a checkpoint for each
+        execution rather than launching it from scratch.
+    task_timeout_secs: float, optional
+        The maximum number of seconds that a worker may spend on a single
+        task before the task is abandoned. Used to recover from workers that
+        hang or that terminate without reporting back. If left unspecified,
+        only those tasks held by terminated local workers are abandoned.
+        Should the result of an abandoned task arrive later, its coverage and
+        failures are still merged into the campaign, since the worker will
+        not report that coverage again.
+    settle_secs: float
+        The number of seconds that workers wait, after injecting an input,
+        for its effects to become apparent.
+    tmpfs_workspace: bool
+        If true, workers that are not given a ROSWire workspace use a
+        workspace on tmpfs (see :class:`ROSHammer`).
+    coverage_map_bits: int, optional
+        The base-2 logarithm of the number of slots in the coverage map that
+        is shared with local workers. If left unspecified, local workers
+        report their coverage to the coordinator in the same way as remote
+        workers.
+    stats: CampaignStats
+        A live summary of the progress of the campaign.
+    errors: List[Tuple[Input[T], str]]
+        The inputs that could not be executed, together with a description
+        of the error that prevented their execution.
+
+    Raises
+    ------
+        ValueError: if number of local workers is less than zero.
+    """
+    app: App = attr.ib()
+    inject: InputInjector[T] = attr.ib()
+    inputs: InputGenerator[T] = attr.ib()
+    detectors: List[FailureDetectorFactory] = attr.ib(converter=list)
+    serialiser: SeedSerialiser[T] = attr.ib()
+    address: Address = attr.ib(default=('127.0.0.1', 0))
+    authkey: Optional[bytes] = attr.ib(default=None)
+    num_local_workers: int = attr.ib(default=1)
+    prefetch: Optional[int] = attr.ib(default=None)
+    governor: Optional[LoadGovernor] = attr.ib(default=None)
+    resource_limits: ResourceLimits = attr.ib(default=ResourceLimits())
+    snapshot: bool = attr.ib(default=False)
+    task_timeout_secs: Optional[float] = attr.ib(default=600.0)
+    settle_secs: float = attr.ib(default=15.0)
+    tmpfs_workspace: bool = attr.ib(default=False)
+    coverage_map_bits: Optional[int] = attr.ib(default=20)
+    stats: CampaignStats = attr.ib(factory=CampaignStats, init=False)
+    corpus: List[Input[T]] = attr.ib(factory=list, init=False)
+    failures: List[Tuple[Input[T], Execution]] = \
+        attr.ib(factory=list, init=False)
+    errors: List[Tuple[Input[T], str]] = attr.ib(factory=list, init=False)
+    _coverage: Set[int] = attr.ib(factory=set, init=False)
+    _coverage_map: Optional[CoverageMap] = attr.ib(default=None, init=False)
+    _fingerprints: Dict[int, Tuple[T, str]] = \
+        attr.ib(factory=dict, init=False)
+    _abandoned: Dict[int, Input[T]] = attr.ib(factory=dict, init=False)
+    _stopwatch: Stopwatch = attr.ib(factory=Stopwatch, init=False)
+    _num_executed_inputs: int = attr.ib(default=0, init=False)
+
+    @num_local_workers.validator
+    def has_no_negative_workers(self, attribute, num_workers) -> None:
+        if num_workers < 0:
+            raise ValueError('number of local workers cannot be negative.')
+
+    @property
+    def coverage(self) -> Coverage:
+        """The global coverage achieved by the campaign."""
+        return Coverage(self._coverage)
+
+    @property
+    def resource_usage(self) -> ResourceUsage:
+        """A summary of the resources used by this coordinator."""
+        return ResourceUsage(wall_clock_mins=self._stopwatch.duration / 60,
+                             num_inputs=self._num_executed_inputs)
+
+    def _has_reached_resource_limits(self, num_pending: int = 0) -> bool:
+        limits = self.resource_limits
+        usage = self.resource_usage
+        if limits.wall_clock_mins is not None:
+            if usage.wall_clock_mins >= limits.wall_clock_mins:
+                return True
+        if limits.num_inputs is not None:
+            if usage.num_inputs + num_pending >= limits.num_inputs:
+                return True
+        return False
+
+    def _describe(self,
+                  inp: Input[T],
+                  seeds: Dict[str, bytes]
+                  ) -> InputDescriptor:
+        """Produces a descriptor for a given input, publishing its seed."""
+        seed = inp.seed
+        try:
+            _, fingerprint = self._fingerprints[id(seed)]
+        except KeyError:
+            data = self.serialiser.dumps(seed)
+            fingerprint = hashlib.sha1(data).hexdigest()
+            self._fingerprints[id(seed)] = (seed, fingerprint)
+            seeds[fingerprint] = data
+        dumps = self.serialiser.dumps_mutation
+        mutations = tuple(dumps(m) for m in inp.mutations)
+        return InputDescriptor(fingerprint, mutations)
+
+    def _record(self,
+                inp: Input[T],
+                result: WorkerResult,
+                late: bool = False
+                ) -> None:
+        """Updates the global corpus to reflect the outcome of a task. Late
+        results, for tasks that were already abandoned (and so counted), only
+        contribute their coverage and failures."""
+        if not late:
+            self._num_executed_inputs += 1
+        execution = result.execution
+        if execution is None:
+            if late:
+                return
+            error = result.error or 'unknown error'
+            logger.error("worker [%s] failed to execute task %d: %s",
+                         result.worker, result.task, error)
+            self.errors.append((inp, error))
+            return
+        if execution.failures:
+            logger.info("worker [%s] found failure: %s",
+                        result.worker, execution.failures)
+            self.failures.append((inp, execution))
+        num_novel = 0
+        if execution.coverage:
+            novel = execution.coverage - self._coverage
+            num_novel = len(novel)
+            if novel:
+                logger.debug("input covered %d new components", len(novel))
+                self._coverage |= novel
+                self.corpus.append(inp)
+                # share coverage found by remote workers with local workers
+                if self._coverage_map is not None:
+                    self._coverage_map.update(novel)
+        if isinstance(self.inputs, InputGenerator):
+            self.inputs.observe(inp, execution, num_novel)
+        stats = self.stats
+        stats.record(execution)
+        stats.corpus_size = len(self.corpus)
+        stats.coverage_size = len(self._coverage)
+
+    def _merge_late(self,
+                    message: Union[WorkerResult, _TaskClaim]
+                    ) -> bool:
+        """Merges the result of an abandoned task, if the given message is
+        such a result.
+
+        Returns
+        -------
+        bool
+            True if the message was merged, or False if not.
+        """
+        if not isinstance(message, WorkerResult):
+            return False
+        if message.task not in self._abandoned:
+            return False
+        logger.info("merging late result for task %d", message.task)
+        inp = self._abandoned.pop(message.task)
+        self._record(inp, message, late=True)
+        return True
+
+    def _worker_config(self) -> WorkerConfig:
+        app = self.app
+        return WorkerConfig(image=app.image,
+                            workspace=app.workspace,
+                            launch_filename=app.launch_filename,
+                            launch_prefix=app.launch_prefix,
+                            inject=self.inject,
+                            detectors=tuple(self.detectors),
+                            serialiser=self.serialiser,
+                            snapshot=self.snapshot,
+                            settle_secs=self.settle_secs,
+                            coverage=app.coverage,
+                            tmpfs_workspace=self.tmpfs_workspace,
+                            limits=app.limits)
+
+    def _abandon(self,
+                 pending: Dict[int, Input[T]],
+                 claims: Dict[int, Tuple[str, float]],
+                 workers: List[multiprocessing.Process]
+                 ) -> None:
+        """Abandons any tasks that are held by terminated local workers or
+        that have exceeded their time limit."""
+        dead = set(_worker_name(w.pid) for w in workers
+                   if w.pid is not None and not w.is_alive())
+        timeout = self.task_timeout_secs
+        now = time.time()
+        for task, (worker, claimed_at) in list(claims.items()):
+            if worker in dead:
+                error = 'worker terminated during execution'
+            elif timeout is not None and now - claimed_at > timeout:
+                error = 'execution timed out'
+            else:
+                continue
+            del claims[task]
+            inp = pending.pop(task)
+            self._abandoned[task] = inp
+            self._record(inp, WorkerResult(task, worker, None, error))
+
+    def fuzz(self) -> None:
+        """Launches a distributed fuzzing campaign."""
+        prefetch = self.prefetch or max(2 * self.num_local_workers, 1)
+        authkey = self.authkey or multiprocessing.current_process().authkey
+        manager = _CoordinatorManager(address=self.address, authkey=authkey)
+        manager.start()
+        logger.info("started coordinator: %s", manager.address)
+        workers: List[multiprocessing.Process] = []
+        stopped = manager.stopped()  # type: ignore
+        try:
+            tasks = manager.tasks()  # type: ignore
+            results = manager.results()  # type: ignore
+            seeds = manager.seeds()  # type: ignore
+            manager.config().set(self._worker_config())  # type: ignore
+
+            if self.coverage_map_bits is not None:
+                self._coverage_map = CoverageMap(self.coverage_map_bits)
+            for _ in range(self.num_local_workers):
+                worker = multiprocessing.Process(target=run_worker,
+                                                 args=(manager.address,
+                                                       authkey,
+                                                       None,
+                                                       self._coverage_map))
+                worker.start()
+                workers.append(worker)
+
+            self.stats.start()
+            self._stopwatch.start()
+            pending: Dict[int, Input[T]] = {}
+            claims: Dict[int, Tuple[str, float]] = {}
+            num_tasks = 0
+            exhausted = False
+            while True:
+                max_pending = prefetch
+                if self.governor is not None:
+                    max_pending = min(prefetch, self.governor.update())
+                while not exhausted and len(pending) < max_pending:
+                    if self._has_reached_resource_limits(len(pending)):
+                        break
+                    try:
+                        inp = next(self.inputs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[num_tasks] = inp
+                    tasks.put((num_tasks, self._describe(inp, seeds)))
+                    num_tasks += 1
+
+                if not pending:
+                    break
+                if self._has_reached_resource_limits():
+                    logger.info("reached resource limits")
+                    break
+                if workers and not any(w.is_alive() for w in workers):
+                    logger.error("all local workers have terminated")
+                    break
+
+                self._abandon(pending, claims, workers)
+                try:
+                    message = results.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                if message.task not in pending:
+                    if not self._merge_late(message):
+                        logger.debug("ignoring message for abandoned task: "
+                                     "%s", message)
+                    continue
+                if isinstance(message, _TaskClaim):
+                    claims[message.task] = (message.worker, time.time())
+                    continue
+                claims.pop(message.task, None)
+                self._record(pending.pop(message.task), message)
+                logger.info("executed input #%d (running time: %.2f mins)",
+                            self._num_executed_inputs,
+                            self._stopwatch.duration / 60)
+
+            # merge any late results that have already arrived
+            while self._abandoned:
+                try:
+                    self._merge_late(results.get_nowait())
+                except queue.Empty:
+                    break
+        finally:
+            self._stopwatch.stop()
+            stopped.set()
+            for worker in workers:
+                worker.join()
+            manager.shutdown()
+        logger.info("finished distributed fuzzing campaign")
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides an AFL-style hit-count coverage mode, in which the
+instrumented nodes of the application count how often each edge is taken.
+
+A small runtime, which implements the callbacks used by Clang's
+:code:`trace-pc-guard` instrumentation, is linked into every node. Each node
+maps a shared file of 8-bit edge counters into its memory and increments the
+counter for each edge, identified by its source and destination blocks, as
+it is taken. The file lives within the directory that ROSWire shares between
+the host and each container, and so the host reads the counters directly
+via a NumPy view of the file rather than dumping and printing sancov files
+inside the container.
+
+Counters are grouped into AFL's buckets (1, 2, 3, 4-7, 8-15, 16-31, 32-127,
+128+), and each (edge, bucket) pair is reported as a distinct coverage
+component, so that changes in loop counts are treated as new coverage.
+"""
+__all__ = ('HITS_MAP_ENV', 'HITS_MAP_FILENAME', 'HITS_MAP_SIZE',
+           'clear_hits', 'install_runtime', 'launch_prefix', 'read_hits')
+
+import os
+
+import numpy as np
+from roswire.proxy import FileProxy, ShellProxy
+
+#: The name of the environment variable that gives nodes the location of the
+#: hit-count map.
+HITS_MAP_ENV = 'ROSHAMMER_HITS_MAP'
+
+#: The name of the hit-count map within the shared directory.
+HITS_MAP_FILENAME = 'hits.map'
+
+#: The number of counters in the hit-count map.
+HITS_MAP_SIZE = 1 << 16
+
+_DIR_RUNTIME = '/opt/roshammer'
+
+# the location at which ROSWire mounts its shared directory in each container
+_DIR_SHARED = '/.roswire'
+
+_RUNTIME_SOURCE = r"""
+#define _GNU_SOURCE
+#include <dlfcn.h>
+#include <fcntl.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <sys/mman.h>
+#include <unistd.h>
+
+#define MAP_SIZE %(map_size)d
+
+static uint8_t fallback[MAP_SIZE];
+static uint8_t *hits = fallback;
+static int opened = 0;
+static __thread uint32_t prev = 0;
+
+static void open_map(void) {
+  const char *fn;
+  int fd;
+  void *mem;
+  if (opened)
+    return;
+  opened = 1;
+  fn = getenv("%(env)s");
+  if (!fn || (fd = open(fn, O_RDWR)) < 0)
+    return;
+  mem = mmap(NULL, MAP_SIZE, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+  close(fd);
+  if (mem != MAP_FAILED)
+    hits = (uint8_t *) mem;
+}
+
+/* guards are given pseudo-random locations that are seeded by the path of
+ * their module, so that locations are stable across executions */
+void __sanitizer_cov_trace_pc_guard_init(uint32_t *start, uint32_t *stop) {
+  Dl_info info;
+  const char *c;
+  uint32_t x = 2166136261u;
+  if (start == stop || *start)
+    return;
+  open_map();
+  if (dladdr(start, &info) && info.dli_fname)
+    for (c = info.dli_fname; *c; c++)
+      x = (x ^ (uint8_t) *c) * 16777619u;
+  for (; start < stop; start++) {
+    x ^= x << 13;
+    x ^= x >> 17;
+    x ^= x << 5;
+    *start = x %% (MAP_SIZE - 1) + 1;
+  }
+}
+
+void __sanitizer_cov_trace_pc_guard(uint32_t *guard) {
+  uint32_t loc = *guard;
+  uint8_t *counter;
+  if (!loc)
+    return;
+  counter = &hits[(loc ^ prev) %% MAP_SIZE];
+  if (*counter != 255)
+    (*counter)++;
+  prev = loc >> 1;
+}
+""" % {'map_size': HITS_MAP_SIZE, 'env': HITS_MAP_ENV}
+
+# maps each counter value to the index of its bucket
+_BUCKETS = np.zeros(256, dtype=np.int64)
+_BUCKETS[2] = 1
+_BUCKETS[3] = 2
+_BUCKETS[4:8] = 3
+_BUCKETS[8:16] = 4
+_BUCKETS[16:32] = 5
+_BUCKETS[32:128] = 6
+_BUCKETS[128:] = 7
+
+
+def install_runtime(files: FileProxy, shell: ShellProxy) -> str:
+    """Compiles the hit-count runtime inside a given container.
+
+    Returns
+    -------
+    str
+        The linker flags that should be used to link the runtime into the
+        nodes of the application.
+
+    Raises
+    ------
+    RuntimeError
+        if the runtime could not be compiled.
+    """
+    fn_source = os.path.join(_DIR_RUNTIME, 'hitcount.c')
+    fn_object = os.path.join(_DIR_RUNTIME, 'hitcount.o')
+    files.makedirs(_DIR_RUNTIME, exist_ok=True)
+    files.write(fn_source, _RUNTIME_SOURCE)
+    cmd = f'clang -O2 -fPIC -c {fn_source} -o {fn_object}'
+    retcode, out, _ = shell.execute(cmd)
+    if retcode != 0:
+        raise RuntimeError(f'failed to compile hit-count runtime:\n{out}')
+    return f'{fn_object} -ldl'
+
+
+def launch_prefix() -> str:
+    """Returns the prefix that tells launched nodes where to find the
+    hit-count map."""
+    return f'{HITS_MAP_ENV}={_DIR_SHARED}/{HITS_MAP_FILENAME}'
+
+
+def clear_hits(filename: str) -> None:
+    """Creates or resets the hit-count map at a given location.
+
+    Existing maps are zeroed in place rather than truncated, since they may
+    be mapped by running nodes (e.g., nodes restored from a checkpoint).
+    """
+    if os.path.exists(filename) and \
+            os.path.getsize(filename) == HITS_MAP_SIZE:
+        hits = np.memmap(filename, dtype=np.uint8, mode='r+',
+                         shape=(HITS_MAP_SIZE,))
+        hits[:] = 0
+        hits.flush()
+    else:
+        with open(filename, 'wb') as f:
+            f.truncate(HITS_MAP_SIZE)
+
+
+def read_hits(filename: str) -> np.ndarray:
+    """Reads the coverage components from the hit-count map at a given
+    location.
+
+    Returns
+    -------
+    np.ndarray
+        The identifiers of the covered (edge, bucket) pairs, where the edge
+        occupies the upper bits of each identifier and the bucket occupies
+        its three lowest bits.
+    """
+    hits = np.memmap(filename, dtype=np.uint8, mode='r',
+                     shape=(HITS_MAP_SIZE,))
+    edges = np.flatnonzero(hits)
+    return (edges << 3) | _BUCKETS[hits[edges]]
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+This module decides how many executions should run at once on a given host,
+based on the load on that host.
+
+Running too few executions at once leaves the host idle, whereas running
+too many causes the containers to contend for CPUs and, worse, to thrash or
+be killed once the memory of the host is exhausted. The governor follows an
+additive-increase, multiplicative-decrease policy: it admits one more
+execution whenever the host has spare CPU and enough free memory for another
+container, as measured via the Docker stats of the running containers, and
+halves the number of executions whenever the host is overloaded.
+"""
+__all__ = ('HostLoad', 'LoadGovernor')
+
+from typing import Any, Callable, Optional
+import logging
+import time
+
+import attr
+import psutil
+from docker.errors import DockerException
+from requests.exceptions import RequestException
+
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# each request for the stats of a container blocks until Docker has taken
+# two samples (about two seconds), and so only a few containers are sampled
+_MAX_STATS_SAMPLES = 3
+
+
+@attr.s(frozen=True, slots=True)
+class HostLoad:
+    """Describes the load on a host at a given moment.
+
+    Attributes
+    ----------
+    cpu_percent: float
+        The utilisation of the CPUs of the host, as a percentage of all
+        CPUs.
+    memory_percent: float
+        The fraction of the memory of the host that is in use, given as a
+        percentage.
+    available_bytes: int
+        The number of bytes of memory that are available to new processes.
+    container_bytes: float, optional
+        The mean number of bytes of memory used by each of the running
+        containers for the application, if known.
+    """
+    cpu_percent: float = attr.ib()
+    memory_percent: float = attr.ib()
+    available_bytes: int = attr.ib()
+    container_bytes: Optional[float] = attr.ib(default=None)
+
+
+def _container_bytes(client_docker: Any, image: str) -> Optional[float]:
+    """Computes the mean memory usage of the running containers for a given
+    image via the Docker stats API."""
+    try:
+        containers = client_docker.containers.list(
+            filters={'ancestor': image})
+        usages = [c.stats(stream=False)['memory_stats']['usage']
+                  for c in containers[:_MAX_STATS_SAMPLES]]
+    except (DockerException, RequestException, KeyError) as err:
+        logger.warning("failed to obtain Docker stats for image [%s]: %s",
+                       image, err)
+        return None
+    if not usages:
+        return None
+    return sum(usages) / len(usages)
+
+
+@attr.s
+class LoadGovernor:
+    """Adapts the number of concurrent executions to the load on the host.
+
+    Attributes
+    ----------
+    max_concurrency: int
+        The largest number of executions that may run at once (e.g., the
+        number of local workers).
+    min_concurrency: int
+        The smallest number of executions that may run at once.
+    max_cpu_percent: float
+        The CPU utilisation above which the host is considered to be
+        overloaded.
+    max_memory_percent: float
+        The memory usage above which the host is considered to be
+        overloaded.
+    interval_secs: float
+        The minimum number of seconds between measurements of the load.
+    client_docker: docker.DockerClient, optional
+        If given, the Docker stats of the running containers for the image
+        are used to ensure that another container would fit in memory
+        before admitting another execution.
+    image: str, optional
+        The image of the application under test. Must be given together with
+        a Docker client.
+    concurrency: int
+        The number of executions that may currently run at once.
+
+    Raises
+    ------
+    ValueError
+        if min_concurrency is less than one or exceeds max_concurrency.
+    ValueError
+        if a Docker client is given without an image.
+    """
+    max_concurrency: int = attr.ib()
+    min_concurrency: int = attr.ib(default=1)
+    max_cpu_percent: float = attr.ib(default=90.0)
+    max_memory_percent: float = attr.ib(default=85.0)
+    interval_secs: float = attr.ib(default=5.0)
+    client_docker: Any = attr.ib(default=None, repr=False)
+    image: Optional[str] = attr.ib(default=None)
+    concurrency: int = attr.ib(init=False)
+    _measured_at: Optional[float] = \
+        attr.ib(default=None, init=False, repr=False)
+    _clock: Callable[[], float] = \
+        attr.ib(default=time.monotonic, init=False, repr=False)
+
+    @min_concurrency.validator
+    def has_valid_bounds(self, attribute, min_concurrency: int) -> None:
+        if min_concurrency < 1:
+            raise ValueError('min_concurrency must be at least one.')
+        if min_concurrency > self.max_concurrency:
+            raise ValueError('min_concurrency cannot exceed max_concurrency.')
+
+    @image.validator
+    def has_image(self, attribute, image: Optional[str]) -> None:
+        if self.client_docker is not None and image is None:
+            raise ValueError('an image must be given with a Docker client.')
+
+    def __attrs_post_init__(self) -> None:
+        # start cautiously and let the load decide how far to ramp up
+        self.concurrency = self.min_concurrency
+        # the first reading of the CPU utilisation is always zero, since it
+        # measures the utilisation since the previous reading
+        psutil.cpu_percent(None)
+
+    def measure(self) -> HostLoad:
+        """Measures the current load on the host."""
+        memory = psutil.virtual_memory()
+        container_bytes: Optional[float] = None
+        if self.client_docker is not None:
+            assert self.image is not None
+            container_bytes = _container_bytes(self.client_docker,
+                                               self.image)
+        return HostLoad(cpu_percent=psutil.cpu_percent(None),
+                        memory_percent=memory.percent,
+                        available_bytes=memory.available,
+                        container_bytes=container_bytes)
+
+    def adjust(self, load: HostLoad) -> int:
+        """Adjusts the concurrency in light of a given load on the host, and
+        returns the new concurrency."""
+        overloaded = load.cpu_percent > self.max_cpu_percent \
+            or load.memory_percent > self.max_memory_percent
+        if overloaded:
+            concurrency = max(self.concurrency // 2, self.min_concurrency)
+        else:
+            concurrency = self.concurrency
+            fits = load.container_bytes is None \
+                or load.container_bytes < load.available_bytes
+            if fits:
+                concurrency = min(concurrency + 1, self.max_concurrency)
+        if concurrency != self.concurrency:
+            logger.info("adjusted concurrency from %d to %d (load: %s)",
+                        self.concurrency, concurrency, load)
+        self.concurrency = concurrency
+        return concurrency
+
+    def update(self) -> int:
+        """Returns the number of executions that may currently run at once,
+        measuring the load on the host if it has not been measured
+        recently."""
+        now = self._clock()
+        due = self._measured_at is None \
+            or now - self._measured_at >= self.interval_secs
+        if due:
+            self._measured_at = now
+            self.adjust(self.measure())
+        return self.concurrency
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a lightweight sampling profiler that is used to find
+bottlenecks in the host-side fuzzing loop (e.g., input generation, bag
+serialisation, coverage processing) without instrumenting it.
+"""
+__all__ = ('SamplingProfiler',)
+
+from typing import Counter, List, Optional, Tuple
+from types import FrameType
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def _describe_frame(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """Periodically samples the call stack of a given thread.
+
+    Samples are written in the collapsed-stack format that is used by
+    flamegraph.pl and speedscope, where each line lists the frames of a
+    stack, from outermost to innermost, separated by semicolons, followed by
+    the number of times that stack was sampled.
+    """
+    def __init__(self,
+                 interval_secs: float = 0.005,
+                 thread_id: Optional[int] = None
+                 ) -> None:
+        """
+        Parameters
+        ----------
+        interval_secs: float
+            The number of seconds between samples.
+        thread_id: int, optional
+            The identifier of the thread that should be sampled. Defaults to
+            the thread that constructs the profiler.
+        """
+        self.__interval_secs = interval_secs
+        self.__thread_id = thread_id or threading.get_ident()
+        self.__samples: Counter[Tuple[str, ...]] = collections.Counter()
+        self.__running = False
+        self.__sampler = threading.Thread(target=self.__sample, daemon=True)
+
+    @property
+    def num_samples(self) -> int:
+        """The number of samples that have been taken."""
+        return sum(self.__samples.values())
+
+    def __sample(self) -> None:
+        while self.__running:
+            frame = sys._current_frames().get(self.__thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_describe_frame(frame))
+                frame = frame.f_back
+            if stack:
+                self.__samples[tuple(reversed(stack))] += 1
+            time.sleep(self.__interval_secs)
+
+    def start(self) -> None:
+        """Starts sampling."""
+        logger.debug("starting sampling profiler")
+        self.__running = True
+        self.__sampler.start()
+
+    def stop(self) -> None:
+        """Stops sampling."""
+        self.__running = False
+        self.__sampler.join()
+        logger.debug("stopped sampling profiler (%d samples)",
+                     self.num_samples)
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def hotspots(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """Returns the frames in which the most time was spent, excluding
+        time spent in their callees, together with the fraction of samples
+        in which each frame was at the top of the stack."""
+        total = self.num_samples
+        if not total:
+            return []
+        leaves: Counter[str] = collections.Counter()
+        for stack, count in self.__samples.items():
+            leaves[stack[-1]] += count
+        return [(frame, count / total)
+                for frame, count in leaves.most_common(limit)]
+
+    def write(self, filename: str) -> None:
+        """Writes the collected samples to a given file."""
+        with open(filename, 'w') as f:
+            for stack, count in sorted(self.__samples.items()):
+                f.write(f"{';'.join(stack)} {count}\n")
@@ -4,22 +4,55 @@ __all__ = ('ROSHammer',)
 from typing import Optional, Iterator, Collection, List
 import contextlib
 import logging
+import os
 
 import attr
 from docker.models.images import Image as DockerImage
 from roswire import ROSWire
 
+from . import hitcount
 from .core import App, Sanitiser, CoverageLevel
+from .description import DescriptionCache
 
 logger: logging.Logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+#: The ROSWire workspace that is used when the workspace should be kept in
+#: memory.
+TMPFS_WORKSPACE = '/dev/shm/roshammer'
+
+
+def make_tmpfs_workspace() -> str:
+    """Ensures that the tmpfs ROSWire workspace exists and returns its
+    location."""
+    os.makedirs(TMPFS_WORKSPACE, exist_ok=True)
+    return TMPFS_WORKSPACE
+
 
 class ROSHammer:
-    def __init__(self, roswire: Optional[ROSWire] = None):
+    def __init__(self,
+                 roswire: Optional[ROSWire] = None,
+                 tmpfs_workspace: bool = False
+                 ) -> None:
+        """
+        Parameters
+        ----------
+        roswire: ROSWire, optional
+            The ROSWire session that should be used.
+        tmpfs_workspace: bool
+            If true and no ROSWire session is given, the entire ROSWire
+            workspace (including its cache of application descriptions) is
+            placed on tmpfs, at :code:`TMPFS_WORKSPACE`. The directory that
+            ROSWire shares with each container lives within the workspace,
+            and so the files that are passed to the application (e.g.,
+            injected bags) never touch the disk. No additional mounts are
+            added to containers, and seeds are not staged in advance.
+        """
         if not roswire:
-            roswire = ROSWire()
+            workspace = make_tmpfs_workspace() if tmpfs_workspace else None
+            roswire = ROSWire(workspace)
         self.__roswire: ROSWire = roswire
+        self.__descriptions = DescriptionCache(roswire)
 
     @property
     def roswire(self) -> ROSWire:
@@ -45,7 +78,7 @@ class ROSHammer:
         launch_prefix: str, optional
             An optional prefix to add before the roslaunch command.
         """
-        desc = self.roswire.descriptions.load_or_build(image)
+        desc = self.__descriptions.load_or_build(image)
         return App(image, workspace, launch_filename, launch_prefix, desc)
 
     @contextlib.contextmanager
@@ -69,6 +102,8 @@ class ROSHammer:
         cov_opts = 'coverage=1:coverage_direct=1:coverage_dir=/tmp/cov'
         if coverage == CoverageLevel.DISABLED:
             prefix = ''
+        elif coverage == CoverageLevel.EDGE_HITS:
+            prefix = hitcount.launch_prefix()
         elif Sanitiser.ASAN in sanitisers:
             prefix = f'ASAN_OPTIONS={cov_opts}'
         else:
@@ -97,7 +132,7 @@ class ROSHammer:
             # add coverage options
             if coverage == CoverageLevel.FUNCTION:
                 cxx_flags += ['-fsanitize-coverage=func,trace-pc-guard']
-            if coverage == CoverageLevel.EDGE:
+            if coverage in (CoverageLevel.EDGE, CoverageLevel.EDGE_HITS):
                 cxx_flags += ['-fsanitize-coverage=edge,trace-pc-guard']
             if coverage in (CoverageLevel.LINE, CoverageLevel.BLOCK):
                 cxx_flags += ['-fsanitize-coverage=bb,trace-pc-guard']
@@ -105,6 +140,12 @@ class ROSHammer:
             if cxx_flags:
                 cmake_args += [f'-DCMAKE_CXX_FLAGS="{" ".join(cxx_flags)}"']
 
+            # link the hit-count runtime into every node
+            if coverage == CoverageLevel.EDGE_HITS:
+                ld_flags = hitcount.install_runtime(sut.files, sut.shell)
+                cmake_args += [f'-DCMAKE_EXE_LINKER_FLAGS="{ld_flags}"',
+                               f'-DCMAKE_SHARED_LINKER_FLAGS="{ld_flags}"']
+
             catkin = sut.catkin(app.workspace)
             catkin.clean()
             catkin.build(cmake_args=cmake_args)
@@ -114,7 +155,10 @@ class ROSHammer:
 
             image: DockerImage = sut.container.persist()
         try:
-            prepared = attr.evolve(app, image=image.id, launch_prefix=prefix)
+            prepared = attr.evolve(app,
+                                   image=image.id,
+                                   launch_prefix=prefix,
+                                   coverage=coverage)
             logger.debug("prepared application: %s -> %s", app, prepared)
             yield prepared
         finally:
@@ -2,12 +2,23 @@
 """
 This module implements a number of search-based fuzzing strategies.
 """
-from typing import TypeVar, FrozenSet
+from typing import (TypeVar, FrozenSet, Tuple, Sequence, Callable, Container,
+                    Optional, List, Mapping, Dict, TYPE_CHECKING)
+import bisect
+import collections
+import itertools
+import logging
 import random
 
 import attr
 
-from .core import Input, InputGenerator, Mutator
+from .core import Execution, Input, InputGenerator, Mutator, Mutation
+
+if TYPE_CHECKING:
+    from .store import CorpusStore
+
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
 
 T = TypeVar('T')
 
@@ -27,6 +38,320 @@ class RandomInputGenerator(InputGenerator[T]):
             raise ValueError("at least one seed must be provided.")
 
     def __next__(self) -> Input[T]:
-        seed: T = random.sample(self.seeds, 1)[0]
+        seed: T = random.choice(tuple(self.seeds))
         inp: Input[T] = Input(seed)
         return self.mutator(inp)
+
+    def observe(self,
+                inp: Input[T],
+                execution: Execution,
+                num_novel: int
+                ) -> None:
+        self.mutator.observe(inp, execution, num_novel)
+
+
+@attr.s
+class CorpusInputGenerator(InputGenerator[T]):
+    """
+    Generates a stream of random inputs by mutating the entries of a
+    memory-budgeted corpus store, which is shared with the fuzzer.
+
+    Entries are chosen with a probability that is proportional to their
+    priority. Whenever a mutant of an entry covers new components or causes
+    a failure, the priority of that entry is increased, which also makes
+    its seed less likely to be evicted from memory by the store.
+
+    Attributes
+    ----------
+    store: CorpusStore[T]
+        The store that holds the seeds and corpus.
+    mutator: Mutator[T]
+        Used to mutate the chosen entries.
+    reward: float
+        The amount by which the priority of an entry is increased for each
+        of its productive mutants.
+    max_pending: int
+        The maximum number of produced inputs whose outcomes are awaited.
+
+    Raises
+    ------
+    ValueError
+        if the store is empty.
+    """
+    store: 'CorpusStore[T]' = attr.ib()
+    mutator: Mutator[T] = attr.ib()
+    reward: float = attr.ib(default=1.0)
+    max_pending: int = attr.ib(default=10000)
+    _pending: 'collections.OrderedDict[Input[T], int]' = \
+        attr.ib(factory=collections.OrderedDict, init=False, repr=False)
+
+    @store.validator
+    def check(self, attr, store: 'CorpusStore[T]') -> None:
+        if not len(store):
+            raise ValueError("at least one seed must be provided.")
+
+    def __next__(self) -> Input[T]:
+        store = self.store
+        key, = random.choices(range(len(store)), store.priorities)
+        inp = self.mutator(store.get(key))
+        pending = self._pending
+        pending[inp] = key
+        if len(pending) > self.max_pending:
+            pending.popitem(last=False)
+        return inp
+
+    def observe(self,
+                inp: Input[T],
+                execution: Execution,
+                num_novel: int
+                ) -> None:
+        self.mutator.observe(inp, execution, num_novel)
+        key = self._pending.pop(inp, None)
+        if key is not None and (num_novel or execution.failures):
+            priority = self.store.priorities[key] + self.reward
+            self.store.set_priority(key, priority)
+
+
+#: Produces a random mutation of a given value, or None if the operator is
+#: not applicable to that value (e.g., dropping a message from an empty bag).
+MutationOperator = Callable[[T], Optional[Mutation[T]]]
+
+
+@attr.s(slots=True)
+class OperatorStats:
+    """Summarises the yield of a mutation operator.
+
+    Attributes
+    ----------
+    num_uses: int
+        The number of executed inputs to which the operator contributed.
+    num_novel: int
+        The number of those inputs that covered new components.
+    num_failures: int
+        The number of those inputs that caused a failure.
+    """
+    num_uses: int = attr.ib(default=0)
+    num_novel: int = attr.ib(default=0)
+    num_failures: int = attr.ib(default=0)
+
+    @property
+    def num_finds(self) -> int:
+        """The number of inputs that covered new components or failed."""
+        return self.num_novel + self.num_failures
+
+    @property
+    def yield_rate(self) -> float:
+        """The fraction of inputs that covered new components or failed."""
+        return self.num_finds / self.num_uses if self.num_uses else 0.0
+
+
+@attr.s
+class AdaptiveMutator(Mutator[T]):
+    """
+    Mutates inputs by applying stacks of randomly chosen operators, in the
+    style of AFL's havoc stage, where the probability of choosing each
+    operator is adapted online to favour those operators whose inputs cover
+    new components or cause failures for the application under test.
+
+    Operators are treated as the arms of a multi-armed bandit: each operator
+    is chosen with a probability that is proportional to its (smoothed)
+    yield rate, except for a fixed share of choices that are made uniformly
+    at random so that unproductive operators are still occasionally tried.
+
+    Attributes
+    ----------
+    operators: Mapping[str, MutationOperator[T]]
+        The mutation operators, indexed by name.
+    max_stack: int
+        The maximum number of mutations that are applied to each input. The
+        number of mutations is drawn uniformly from the powers of two that
+        do not exceed this number.
+    exploration: float
+        The share of operator choices that are made uniformly at random.
+    max_pending: int
+        The maximum number of produced inputs whose outcomes are awaited.
+        Inputs that are never executed (e.g., because their outcome was
+        cached) are eventually forgotten.
+
+    Raises
+    ------
+    ValueError
+        if no operators are provided.
+    ValueError
+        if max_stack is less than one.
+    ValueError
+        if exploration is not in the range [0, 1].
+    """
+    operators: Mapping[str, MutationOperator[T]] = attr.ib()
+    max_stack: int = attr.ib(default=8)
+    exploration: float = attr.ib(default=0.1)
+    max_pending: int = attr.ib(default=10000)
+    _stats: Dict[str, OperatorStats] = attr.ib(init=False, repr=False)
+    _names: Tuple[str, ...] = attr.ib(init=False, repr=False)
+    _weights: List[float] = attr.ib(init=False, repr=False)
+    _pending: 'collections.OrderedDict[Input[T], FrozenSet[str]]' = \
+        attr.ib(factory=collections.OrderedDict, init=False, repr=False)
+
+    @operators.validator
+    def has_operators(self, attribute, operators) -> None:
+        if not operators:
+            raise ValueError('at least one operator must be provided.')
+
+    @max_stack.validator
+    def max_stack_is_positive(self, attribute, max_stack: int) -> None:
+        if max_stack < 1:
+            raise ValueError('max_stack must be at least one.')
+
+    @exploration.validator
+    def exploration_is_probability(self, attribute, exploration) -> None:
+        if not 0.0 <= exploration <= 1.0:
+            raise ValueError('exploration must be in the range [0, 1].')
+
+    def __attrs_post_init__(self) -> None:
+        self._names = tuple(self.operators)
+        self._stats = {name: OperatorStats() for name in self._names}
+        self._update_weights()
+
+    @property
+    def stats(self) -> Mapping[str, OperatorStats]:
+        """The yield statistics for each operator."""
+        return self._stats
+
+    @property
+    def probabilities(self) -> Mapping[str, float]:
+        """The probability with which each operator is currently chosen."""
+        return dict(zip(self._names, self._weights))
+
+    def _update_weights(self) -> None:
+        scores = [(s.num_finds + 1) / (s.num_uses + 2)
+                  for s in (self._stats[name] for name in self._names)]
+        total = sum(scores)
+        uniform = self.exploration / len(scores)
+        self._weights = [uniform + (1.0 - self.exploration) * score / total
+                         for score in scores]
+
+    def __call__(self, inp: Input[T]) -> Input[T]:
+        value = inp.value
+        used = set()
+        num_mutations = 1 << random.randint(0, self.max_stack.bit_length() - 1)
+        # give up if no operator can be applied after a number of attempts
+        num_attempts = 4 * num_mutations
+        while num_mutations and num_attempts:
+            num_attempts -= 1
+            name, = random.choices(self._names, self._weights)
+            mutation = self.operators[name](value)
+            if mutation is None:
+                continue
+            value = mutation(value)
+            inp = inp.mutate(mutation)
+            used.add(name)
+            num_mutations -= 1
+
+        if used:
+            pending = self._pending
+            pending[inp] = frozenset(used)
+            if len(pending) > self.max_pending:
+                pending.popitem(last=False)
+        return inp
+
+    def observe(self,
+                inp: Input[T],
+                execution: Execution,
+                num_novel: int
+                ) -> None:
+        try:
+            used = self._pending.pop(inp)
+        except KeyError:
+            return
+        for name in used:
+            stats = self._stats[name]
+            stats.num_uses += 1
+            if num_novel:
+                stats.num_novel += 1
+            if execution.failures:
+                stats.num_failures += 1
+        self._update_weights()
+
+
+@attr.s
+class ExhaustiveInputGenerator(InputGenerator[T]):
+    """
+    Deterministically generates every single-order mutant of each seed, in
+    order. The position of the generator within the (concatenated) mutation
+    spaces of its seeds is given by its cursor, which may be used to resume
+    generation.
+
+    The mutation space may be split across several generators (e.g., one per
+    worker) by giving each generator a distinct shard number. A generator
+    only produces the inputs at positions that are equal to its shard number,
+    modulo the number of shards.
+
+    Attributes
+    ----------
+    seeds: Tuple[T, ...]
+        The seed inputs, in the order in which they should be mutated.
+    mutations: Callable[[T], Sequence[Mutation[T]]]
+        Enumerates the single-order mutations of a given seed.
+    cursor: int
+        The position of the next input that should be considered.
+    shard: int
+        The shard of the mutation space that should be generated.
+    num_shards: int
+        The number of shards into which the mutation space is split.
+    executed: Container[Input[T]], optional
+        If given, inputs that belong to this container (e.g., an
+        :code:`ExecutionCache`) are skipped.
+
+    Raises
+    ------
+    ValueError
+        if no seeds are provided.
+    ValueError
+        if shard is not in the range [0, num_shards).
+    """
+    seeds: Tuple[T, ...] = attr.ib(converter=tuple)
+    mutations: Callable[[T], Sequence[Mutation[T]]] = attr.ib()
+    cursor: int = attr.ib(default=0)
+    shard: int = attr.ib(default=0)
+    num_shards: int = attr.ib(default=1)
+    executed: Optional[Container[Input[T]]] = attr.ib(default=None)
+    _spaces: List[Sequence[Mutation[T]]] = \
+        attr.ib(init=False, repr=False)
+    _offsets: List[int] = attr.ib(init=False, repr=False)
+
+    @seeds.validator
+    def check(self, attr, seeds: Tuple[T, ...]) -> None:
+        if not seeds:
+            raise ValueError("at least one seed must be provided.")
+
+    @shard.validator
+    def check_shard(self, attr, shard: int) -> None:
+        if not 0 <= shard < self.num_shards:
+            raise ValueError("shard must be in the range [0, num_shards).")
+
+    def __attrs_post_init__(self) -> None:
+        self._spaces = [self.mutations(seed) for seed in self.seeds]
+        lengths = [len(space) for space in self._spaces]
+        self._offsets = [0] + list(itertools.accumulate(lengths))
+
+    def __len__(self) -> int:
+        """The size of the (unsharded) mutation space."""
+        return self._offsets[-1]
+
+    def __next__(self) -> Input[T]:
+        while True:
+            # advance the cursor to the next position within this shard
+            position = self.cursor
+            position += (self.shard - position) % self.num_shards
+            if position >= len(self):
+                self.cursor = position
+                raise StopIteration
+            self.cursor = position + 1
+
+            index = bisect.bisect_right(self._offsets, position) - 1
+            offset = position - self._offsets[index]
+            mutation = self._spaces[index][offset]
+            inp: Input[T] = Input(self.seeds[index]).mutate(mutation)
+            if self.executed is not None and inp in self.executed:
+                continue
+            return inp
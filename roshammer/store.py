@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+"""
+This module provides a corpus store that keeps seeds and corpus entries
+within a fixed memory budget.
+
+Seeds (e.g., large sensor bags) dominate the memory used by a campaign, and
+so each seed is held in one of three tiers:
+
+* decoded: the seed object itself, ready to be mutated.
+* compressed: the seed in its serialised, compressed form.
+* spilled: the compressed seed, stored within an on-disk segment file.
+
+Whenever the store exceeds its budget, it demotes decoded seeds to their
+compressed form and, if that does not suffice, spills compressed seeds to
+disk. Seeds that are least valuable per byte are demoted first, where the
+value of a seed is the total scheduling priority of the corpus entries that
+are derived from it. Demoted seeds are reloaded on demand.
+
+Corpus entries are stored as a reference to their seed together with their
+serialised mutations, which are small, and so entries are never spilled.
+
+Note that the store can only release its own references to a seed. A demoted
+seed that is still referenced elsewhere (e.g., by an input within
+:code:`Fuzzer.failures`, an :code:`ExecutionCache`, or the pending inputs of
+a mutator) stays in memory until those references are dropped. For seeds
+that support weak references, the store tracks such seeds: their estimated
+size is reported by :code:`pinned_bytes`, and reloading them reuses the live
+object rather than decoding a second copy.
+"""
+__all__ = ('CorpusStore', 'StoreStats')
+
+from typing import (IO, Any, Dict, Generic, Iterator, List, Optional, Sequence,
+                    Tuple, TypeVar)
+import hashlib
+import logging
+import tempfile
+import time
+import weakref
+import zlib
+
+import attr
+
+from .core import AppDescription, Input, SeedSerialiser
+
+T = TypeVar('T')
+
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+@attr.s(slots=True)
+class StoreStats:
+    """Summarises the residency of a corpus store.
+
+    Attributes
+    ----------
+    num_hits: int
+        The number of lookups that were served by a decoded seed.
+    num_reloads: int
+        The number of lookups that required a seed to be decoded.
+    num_disk_reads: int
+        The number of those reloads that read a seed from disk.
+    num_demotions: int
+        The number of times that a decoded seed was dropped from memory.
+    num_spills: int
+        The number of compressed seeds that were spilled to disk.
+    num_revivals: int
+        The number of lookups that were served by a demoted seed that was
+        still held in memory elsewhere, and so did not need to be decoded.
+    reload_secs: float
+        The total number of seconds spent reloading seeds.
+    """
+    num_hits: int = attr.ib(default=0)
+    num_reloads: int = attr.ib(default=0)
+    num_disk_reads: int = attr.ib(default=0)
+    num_demotions: int = attr.ib(default=0)
+    num_spills: int = attr.ib(default=0)
+    num_revivals: int = attr.ib(default=0)
+    reload_secs: float = attr.ib(default=0.0)
+
+    @property
+    def mean_reload_secs(self) -> float:
+        """The mean number of seconds taken to reload a seed."""
+        if not self.num_reloads:
+            return 0.0
+        return self.reload_secs / self.num_reloads
+
+
+class _Seed(Generic[T]):
+    """Holds a seed in one or more of its tiers."""
+    __slots__ = ('value', 'ref', 'data', 'offset', 'length', 'decoded_size',
+                 'digest', 'weight', 'last_used')
+
+    def __init__(self,
+                 value: T,
+                 data: bytes,
+                 decoded_size: int,
+                 digest: str
+                 ) -> None:
+        self.value: Optional[T] = value
+        self.ref: Optional['weakref.ref[Any]'] = None
+        self.data: Optional[bytes] = data
+        self.offset = 0
+        self.length = len(data)
+        self.decoded_size = decoded_size
+        self.digest = digest
+        self.weight = 0.0
+        self.last_used = time.monotonic()
+
+    def peek(self) -> Optional[T]:
+        """Returns the decoded form of this seed if it is in memory, either
+        because it is held by the store or because it is held elsewhere."""
+        if self.value is not None:
+            return self.value
+        if self.ref is not None:
+            return self.ref()
+        return None
+
+
+class CorpusStore(Generic[T]):
+    """Stores seeds and corpus entries within a given memory budget.
+
+    Each entry within the store is identified by its index, in order of
+    insertion. Seeds are themselves entries (i.e., inputs without any
+    mutations).
+    """
+    def __init__(self,
+                 serialiser: SeedSerialiser[T],
+                 description: AppDescription,
+                 budget_bytes: int,
+                 dir_spill: Optional[str] = None,
+                 decoded_overhead: float = 4.0,
+                 compression_level: int = 1
+                 ) -> None:
+        """
+        Parameters
+        ----------
+        serialiser: SeedSerialiser[T]
+            Used to convert seeds to and from their compressed forms.
+        description: AppDescription
+            A description of the application, used to decode seeds.
+        budget_bytes: int
+            The number of bytes of memory that the store may use.
+        dir_spill: str, optional
+            The directory in which the segment file for spilled seeds is
+            created. Defaults to the system's temporary directory.
+        decoded_overhead: float
+            The estimated ratio between the memory used by a decoded seed
+            and the size of its serialised form.
+        compression_level: int
+            The zlib compression level for seeds held in memory.
+
+        Raises
+        ------
+        ValueError
+            if the budget is not positive.
+        """
+        if budget_bytes <= 0:
+            raise ValueError('memory budget must be positive.')
+        self.__serialiser = serialiser
+        self.__description = description
+        self.__budget_bytes = budget_bytes
+        self.__dir_spill = dir_spill
+        self.__decoded_overhead = decoded_overhead
+        self.__compression_level = compression_level
+        self.__segment: Optional[IO[bytes]] = None
+        self.__segment_size = 0
+        self.__seeds: List[_Seed[T]] = []
+        self.__entries: List[Tuple[int, Tuple[bytes, ...]]] = []
+        self.__priorities: List[float] = []
+        self.__keys_by_id: Dict[int, int] = {}
+        self.__keys_by_digest: Dict[str, int] = {}
+        self.__resident_bytes = 0
+        self.stats = StoreStats()
+
+    @property
+    def budget_bytes(self) -> int:
+        """The number of bytes of memory that the store may use."""
+        return self.__budget_bytes
+
+    @property
+    def resident_bytes(self) -> int:
+        """The (estimated) number of bytes of memory used by the store."""
+        return self.__resident_bytes
+
+    @property
+    def num_decoded(self) -> int:
+        """The number of seeds that are held in their decoded form."""
+        return sum(1 for s in self.__seeds if s.value is not None)
+
+    @property
+    def pinned_bytes(self) -> int:
+        """The (estimated) number of bytes used by demoted seeds that are
+        still held in memory by references outside of the store, and so are
+        not included in :code:`resident_bytes`."""
+        return sum(s.decoded_size for s in self.__seeds
+                   if s.value is None and s.peek() is not None)
+
+    @property
+    def num_spilled(self) -> int:
+        """The number of seeds that are held on disk."""
+        return sum(1 for s in self.__seeds if s.data is None)
+
+    @property
+    def num_seeds(self) -> int:
+        """The number of distinct seeds within the store."""
+        return len(self.__seeds)
+
+    @property
+    def priorities(self) -> Sequence[float]:
+        """The scheduling priority of each entry."""
+        return self.__priorities
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __iter__(self) -> Iterator[Input[T]]:
+        for key in range(len(self)):
+            yield self.get(key)
+
+    def __enter__(self) -> 'CorpusStore[T]':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Removes the segment file for spilled seeds, if any. Spilled seeds
+        cannot be reloaded once the store is closed."""
+        if self.__segment is not None:
+            self.__segment.close()
+            self.__segment = None
+
+    def _add_seed(self, seed: T) -> int:
+        """Adds a seed to the store, if it is not already present, and
+        returns its index."""
+        raw = self.__serialiser.dumps(seed)
+        digest = hashlib.sha1(raw).hexdigest()
+        if digest in self.__keys_by_digest:
+            return self.__keys_by_digest[digest]
+        data = zlib.compress(raw, self.__compression_level)
+        decoded_size = int(len(raw) * self.__decoded_overhead)
+        index = len(self.__seeds)
+        self.__seeds.append(_Seed(seed, data, decoded_size, digest))
+        self.__keys_by_digest[digest] = index
+        self.__keys_by_id[id(seed)] = index
+        self.__resident_bytes += decoded_size + len(data)
+        return index
+
+    def _seed_index(self, seed: T) -> int:
+        index = self.__keys_by_id.get(id(seed))
+        if index is not None and self.__seeds[index].peek() is seed:
+            return index
+        return self._add_seed(seed)
+
+    def append(self, inp: Input[T], priority: float = 1.0) -> int:
+        """Adds an input to the store and returns its key. The seed of the
+        input is added to the store if it is not already present."""
+        index = self._seed_index(inp.seed)
+        dumps = self.__serialiser.dumps_mutation
+        mutations = tuple(dumps(m) for m in inp.mutations)
+        self.__entries.append((index, mutations))
+        self.__priorities.append(priority)
+        self.__resident_bytes += sum(len(m) for m in mutations)
+        self.__seeds[index].weight += priority
+        self._enforce_budget(keep=index)
+        return len(self.__entries) - 1
+
+    def add_seed(self, seed: T, priority: float = 1.0) -> int:
+        """Adds a seed to the store and returns its key."""
+        return self.append(Input(seed), priority)
+
+    def set_priority(self, key: int, priority: float) -> None:
+        """Updates the scheduling priority of a given entry."""
+        index, _ = self.__entries[key]
+        self.__seeds[index].weight += priority - self.__priorities[key]
+        self.__priorities[key] = priority
+
+    def _read_spilled(self, seed: _Seed[T]) -> bytes:
+        assert self.__segment is not None
+        self.__segment.seek(seed.offset)
+        self.stats.num_disk_reads += 1
+        return self.__segment.read(seed.length)
+
+    def _load(self, index: int) -> T:
+        """Obtains the decoded form of a given seed, reloading it if
+        necessary."""
+        seed = self.__seeds[index]
+        seed.last_used = time.monotonic()
+        if seed.value is not None:
+            self.stats.num_hits += 1
+            return seed.value
+
+        # reuse the seed if it is still held in memory elsewhere
+        value = seed.peek()
+        if value is not None:
+            self.stats.num_revivals += 1
+            seed.value = value
+            seed.ref = None
+            self.__resident_bytes += seed.decoded_size
+            self._enforce_budget(keep=index)
+            return value
+
+        started_at = time.monotonic()
+        data = seed.data
+        if data is None:
+            data = self._read_spilled(seed)
+        raw = zlib.decompress(data)
+        value = self.__serialiser.loads(self.__description, raw)
+        self.stats.num_reloads += 1
+        self.stats.reload_secs += time.monotonic() - started_at
+
+        seed.value = value
+        seed.ref = None
+        self.__keys_by_id[id(value)] = index
+        self.__resident_bytes += seed.decoded_size
+        self._enforce_budget(keep=index)
+        return value
+
+    def get(self, key: int) -> Input[T]:
+        """Retrieves the input for a given entry."""
+        index, mutations = self.__entries[key]
+        inp: Input[T] = Input(self._load(index))
+        loads = self.__serialiser.loads_mutation
+        for data in mutations:
+            inp = inp.mutate(loads(self.__description, data))
+        return inp
+
+    def _demote(self, seed: _Seed[T]) -> None:
+        """Drops the decoded form of a seed."""
+        value = seed.value
+        key = id(value)
+        index = self.__keys_by_digest[seed.digest]
+        keys_by_id = self.__keys_by_id
+
+        # the seed may still be held elsewhere, in which case it remains
+        # indexed by its identity until it is collected
+        def forget(ref: 'weakref.ref[Any]') -> None:
+            if keys_by_id.get(key) == index and seed.value is None:
+                del keys_by_id[key]
+
+        try:
+            seed.ref = weakref.ref(value, forget)
+        except TypeError:
+            seed.ref = None
+            keys_by_id.pop(key, None)
+        seed.value = None
+        self.__resident_bytes -= seed.decoded_size
+        self.stats.num_demotions += 1
+
+    def _spill(self, seed: _Seed[T]) -> None:
+        """Moves the compressed form of a seed to the segment file."""
+        assert seed.data is not None
+        if self.__segment is None:
+            self.__segment = tempfile.TemporaryFile(dir=self.__dir_spill)
+        self.__segment.seek(self.__segment_size)
+        self.__segment.write(seed.data)
+        seed.offset = self.__segment_size
+        self.__segment_size += seed.length
+        self.__resident_bytes -= seed.length
+        seed.data = None
+        self.stats.num_spills += 1
+
+    def _enforce_budget(self, keep: Optional[int] = None) -> None:
+        """Demotes and spills seeds until the store fits within its budget.
+        The seed with a given index, if any, is left in its decoded form."""
+        if self.__resident_bytes <= self.__budget_bytes:
+            return
+
+        def value(seed: _Seed[T], size: int) -> Tuple[float, float]:
+            return (seed.weight / max(size, 1), seed.last_used)
+
+        candidates = [s for i, s in enumerate(self.__seeds)
+                      if i != keep and s.value is not None]
+        candidates.sort(key=lambda s: value(s, s.decoded_size))
+        for seed in candidates:
+            if self.__resident_bytes <= self.__budget_bytes:
+                return
+            self._demote(seed)
+
+        # the compressed form of the kept seed may be spilled, since its
+        # decoded form remains in memory
+        candidates = [s for s in self.__seeds if s.data is not None]
+        candidates.sort(key=lambda s: value(s, s.length))
+        for seed in candidates:
+            if self.__resident_bytes <= self.__budget_bytes:
+                return
+            self._spill(seed)
+
+        if self.__resident_bytes > self.__budget_bytes:
+            logger.warning("corpus store exceeds its memory budget: "
+                           "%d bytes used (budget: %d bytes)",
+                           self.__resident_bytes, self.__budget_bytes)
@@ -20,6 +20,9 @@ setup(
         'attrs~=19.1.0',
         'fluffycow>=0.0.5',
         'click~=7.0',
+        'numpy>=1.16',
+        'psutil>=5.6',
+        'pyyaml>=5.1',
         'roswire~=0.0.3'
     ],
     packages=['roshammer'],
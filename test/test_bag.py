@@ -1,11 +1,22 @@
+import itertools
 import os
+import random
+import threading
+import types
 
 import pytest
 
 from roswire.definitions import Message, Time
 from roswire.bag.core import BagMessage
 
-from roshammer.bag import Bag
+from roshammer.core import (App, AppContainer, Coverage, Execution, Fuzzer,
+                            Input)
+from roshammer.bag import (BAG_OPERATORS, Bag, BagInjector, BagSerialiser,
+                           DropMessage, InsertMessage, ReplaceMessageData,
+                           SwapMessage, DelayMessage, SingleOrderMutations,
+                           NSECS_PER_SEC,
+                           calibrate_playback, normalise_mutations,
+                           time_to_nsecs)
 
 from util import get_test_type_database
 
@@ -46,7 +57,7 @@ def test_insert():
     Vector3 = db_type['geometry_msgs/Vector3']
     bag = build_test_bag(10)
 
-    time = Time(0.3, 0.1)
+    time = Time(0, 300000000)
     m = BagMessage(topic='/pos', message=Vector3(-1.0, -2.0, -3.0), time=time)
     bag_with_m = bag.insert(m)
     assert len(bag_with_m) == len(bag) + 1
@@ -82,3 +93,234 @@ def test_replace():
     by = bx.replace(i, rep)
     assert rep in by
     assert bx[i] not in by
+
+
+def test_compress_time():
+    bag = build_test_bag(5)
+    fast = bag.compress_time(rate=2.0)
+    assert len(fast) == len(bag)
+    assert fast[0].time == bag[0].time
+    assert [time_to_nsecs(m.time) for m in fast] == \
+        [i * 500000000 for i in range(5)]
+    assert [m.message for m in fast] == [m.message for m in bag]
+
+    db_type = get_test_type_database()
+    Vector3 = db_type['geometry_msgs/Vector3']
+    idle = BagMessage(topic='/pos',
+                      time=Time(secs=60, nsecs=0),
+                      message=Vector3(0.0, 0.0, 0.0))
+    warped = bag.insert(idle).compress_time(max_gap_secs=2.0)
+    assert time_to_nsecs(warped[-1].time) == 6 * NSECS_PER_SEC
+
+    with pytest.raises(ValueError):
+        bag.compress_time(rate=0.0)
+
+
+def test_normalise_mutations():
+    bag = build_test_bag(10)
+    x = (DropMessage(5), DropMessage(2))
+    y = (DropMessage(2), DropMessage(4))
+    assert normalise_mutations(x) == normalise_mutations(y)
+    for mutations in (x, y):
+        normalised = normalise_mutations(mutations)
+        assert Input(bag, normalised).value == Input(bag, mutations).value
+
+    z = (DropMessage(1), SwapMessage(0, 1), DropMessage(3), DropMessage(3))
+    normalised = normalise_mutations(z)
+    assert normalised == (DropMessage(1), SwapMessage(0, 1),
+                          DropMessage(4), DropMessage(3))
+    assert Input(bag, normalised).value == Input(bag, z).value
+
+
+def test_single_order_mutations():
+    bag = build_test_bag(3)
+    space = SingleOrderMutations(delays=(0.5, 2.0))(bag)
+    assert list(space) == [DropMessage(0), DropMessage(1), DropMessage(2),
+                           SwapMessage(0, 1), SwapMessage(1, 2),
+                           DelayMessage(0, 0.5), DelayMessage(0, 2.0),
+                           DelayMessage(1, 0.5), DelayMessage(1, 2.0),
+                           DelayMessage(2, 0.5), DelayMessage(2, 2.0)]
+
+    delayed = DelayMessage(0, 1.5)(bag)
+    assert [m.message for m in delayed] == \
+        [bag[1].message, bag[0].message, bag[2].message]
+    assert delayed[1].time == Time(secs=1, nsecs=500000000)
+
+
+def build_two_topic_bag(length: int) -> Bag:
+    """
+    Creates a bag that alternates between messages on two topics (/pos and
+    /vel), where each message is separated by 1 second delay.
+    """
+    db_type = get_test_type_database()
+    Vector3 = db_type['geometry_msgs/Vector3']
+    return Bag(BagMessage(topic=('/pos' if i % 2 == 0 else '/vel'),
+                          time=Time(secs=i, nsecs=0),
+                          message=Vector3(0.0 + i, 0.0, 0.0))
+               for i in range(length))
+
+
+def test_index_is_maintained():
+    db_type = get_test_type_database()
+    Vector3 = db_type['geometry_msgs/Vector3']
+    bag = build_two_topic_bag(10)
+    m = BagMessage(topic='/acc', time=Time(4, 5), message=Vector3(0, 0, 0))
+    variants = [bag.delete(0), bag.delete(9), bag.insert(m),
+                bag.insert(m).delete(5), bag.swap(2, 7), bag.swap(1, 3),
+                bag.replace(3, m), bag.delete(4).delete(4)]
+    for variant in variants:
+        rebuilt = Bag(list(variant))
+        assert variant == rebuilt
+        assert variant._topics.keys() == rebuilt._topics.keys()
+        for topic, positions in variant._topics.items():
+            assert list(positions) == list(rebuilt._topics[topic])
+
+
+def test_view():
+    bag = build_two_topic_bag(10)
+    assert bag.topics == frozenset(['/pos', '/vel'])
+    assert list(bag.view()) == list(bag)
+    assert list(bag.view('/vel')) == [m for m in bag if m.topic == '/vel']
+    assert list(bag.view('/acc')) == []
+
+    between = bag.view(start=Time(2, 0), stop=Time(5, 0))
+    assert [m.time.secs for m in between] == [2, 3, 4]
+    between = bag.view('/pos', start=Time(2, 500), stop=Time(9, 0))
+    assert [m.time.secs for m in between] == [4, 6, 8]
+    assert list(between[1:]) == list(between)[1:]
+
+    restricted = bag.restrict_to_topic('/pos')
+    assert restricted.topics == frozenset(['/pos'])
+    assert len(restricted) == 5
+
+
+def test_view_equality():
+    bag = build_two_topic_bag(10)
+    view = bag.view('/pos')
+    assert view == bag.view('/pos')
+    assert view == Bag(bag).view('/pos')
+    assert view != bag.view('/vel')
+    assert view != bag.view()
+    assert hash(view) == hash(bag.view('/pos'))
+    assert len({view, bag.view('/pos'), bag.view('/vel')}) == 2
+
+
+def test_timing_operations():
+    bag = build_two_topic_bag(10)
+
+    shifted = bag.shift(3.5, bag.view('/pos').positions)
+    assert len(shifted) == len(bag)
+    assert all(x.time <= y.time for x, y in zip(shifted, shifted[1:]))
+    assert sorted(time_to_nsecs(m.time) for m in shifted.view('/pos')) == \
+        [int((i + 3.5) * NSECS_PER_SEC) for i in range(0, 10, 2)]
+    assert list(shifted.view('/vel')) == list(bag.view('/vel'))
+
+    burst = bag.scale(0.0, range(2, 6))
+    assert [m.time.secs for m in burst] == [0, 1, 2, 2, 2, 2, 6, 7, 8, 9]
+    assert [m.message for m in burst] == [m.message for m in bag]
+
+    jittered = bag.jitter(0.25, seed=0)
+    assert jittered == bag.jitter(0.25, seed=0)
+    assert {m.message for m in jittered} == {m.message for m in bag}
+    for x, y in zip(jittered, bag):
+        delta = time_to_nsecs(x.time) - time_to_nsecs(y.time)
+        assert abs(delta) <= 0.25 * NSECS_PER_SEC
+
+
+def test_serialise_mutations():
+    db_type = get_test_type_database()
+    description = types.SimpleNamespace(types=db_type)
+    Vector3 = db_type['geometry_msgs/Vector3']
+    message = BagMessage(time=Time(secs=3, nsecs=5),
+                         message=Vector3(1.0, 2.0, 3.0),
+                         topic='/pos')
+    serialiser = BagSerialiser()
+    for mutation in (InsertMessage(message),
+                     ReplaceMessageData(2, Vector3(4.0, 5.0, 6.0)),
+                     DropMessage(3)):
+        data = serialiser.dumps_mutation(mutation)
+        assert serialiser.loads_mutation(description, data) == mutation
+
+
+def test_bag_operators():
+    random.seed(0)
+    bag = build_two_topic_bag(5)
+    for name, operator in BAG_OPERATORS.items():
+        assert operator(Bag()) is None
+        for _ in range(20):
+            mutated = operator(bag)(bag)
+            assert mutated.topics <= bag.topics
+            assert abs(len(mutated) - len(bag)) <= 1
+    assert BAG_OPERATORS['swap'](build_test_bag(1)) is None
+
+
+def test_non_integral_time():
+    bag = build_test_bag(3)
+    message = BagMessage(time=Time(secs=0.3, nsecs=0.1),
+                         message=bag[0].message,
+                         topic='/pos')
+    with pytest.raises(ValueError):
+        Bag([message])
+    with pytest.raises(ValueError):
+        bag.insert(message)
+
+
+def test_calibrate_playback(monkeypatch):
+    # coverage differs slightly between runs, and playback faster than five
+    # times real time causes half of the coverage to be lost
+    runs = itertools.count()
+
+    def execute(self, inp):
+        covered = set(range(10 if self.inject.rate <= 5.0 else 5))
+        covered.add(100 + next(runs) % 3)
+        return Execution(1.0, [], Coverage(covered))
+
+    monkeypatch.setattr(Fuzzer, 'execute', execute)
+    app = App(image='app',
+              workspace='/ws',
+              launch_filename='/ws/app.launch',
+              launch_prefix=None,
+              description=None)
+    fuzzer = Fuzzer(rsw=None,
+                    app=app,
+                    inject=BagInjector(),
+                    inputs=iter(()),
+                    detectors=[lambda app, has_failed: None])
+    seeds = [build_test_bag(3)]
+    rates = (2.0, 5.0, 10.0)
+    assert calibrate_playback(fuzzer, seeds, rates).rate == 5.0
+    assert calibrate_playback(fuzzer, seeds, rates, min_similarity=1.0).rate \
+        == 1.0
+
+
+def test_injector_uses_shared_directory(tmp_path, monkeypatch):
+    played = []
+
+    class FakePlayer:
+        def __init__(self, fn: str, file_on_host: bool = True) -> None:
+            fn_host = os.path.join(str(tmp_path), os.path.basename(fn))
+            played.append((fn, file_on_host, os.path.exists(fn_host)))
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args) -> None:
+            pass
+
+        def finished(self) -> bool:
+            return True
+
+    monkeypatch.setattr(Bag, 'save', lambda bag, fn: open(fn, 'wb').close())
+    container = AppContainer.__new__(AppContainer)
+    monkeypatch.setattr(AppContainer, 'dir_shared', str(tmp_path))
+    ros = types.SimpleNamespace(playback=FakePlayer)
+    instance = types.SimpleNamespace(container=container, ros=ros)
+    BagInjector()(instance, threading.Event(), Input(build_test_bag(3)))
+
+    # the player is given the location of the bag inside the container
+    (fn, file_on_host, existed), = played
+    assert os.path.dirname(fn) == '/.roswire'
+    assert fn.endswith('.bag')
+    assert not file_on_host
+    assert existed
+    assert not os.listdir(str(tmp_path))
@@ -0,0 +1,112 @@
+import itertools
+import random
+
+import attr
+
+import roshammer.cache
+from roshammer.cache import ExecutionCache
+from roshammer.core import (App, Coverage, Execution, Fuzzer, Input, Mutation,
+                            ResourceLimits)
+
+
+@attr.s(frozen=True)
+class Add(Mutation[int]):
+    amount: int = attr.ib()
+
+    def __call__(self, x: int) -> int:
+        return x + self.amount
+
+
+def outcome(*components: int) -> Execution:
+    return Execution(1.0, [], Coverage(components))
+
+
+def sort_mutations(mutations):
+    return tuple(sorted(mutations))
+
+
+def test_normalised_keys():
+    cache = ExecutionCache(normalise=sort_mutations)
+    cache.put(Input(0, (Add(1), Add(2))), outcome(3))
+    assert Input(0, (Add(2), Add(1))) in cache
+    assert cache.get(Input(0, (Add(2), Add(1)))) == outcome(3)
+    assert cache.get(Input(1, (Add(2), Add(1)))) is None
+    assert cache.num_hits == 1
+    assert cache.num_misses == 1
+    assert len(cache) == 1
+
+
+def test_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(roshammer.cache.time, 'time', lambda: now[0])
+    cache = ExecutionCache(ttl_secs=10.0)
+    cache.put(Input(0), outcome(0))
+    now[0] = 105.0
+    assert cache.get(Input(0)) == outcome(0)
+    now[0] = 111.0
+    assert cache.get(Input(0)) is None
+    assert len(cache) == 0
+
+
+def test_revalidation():
+    random.seed(0)
+    cache = ExecutionCache(revalidation_rate=0.25)
+    cache.put(Input(0), outcome(0))
+    for _ in range(1000):
+        cache.get(Input(0))
+    assert cache.num_hits + cache.num_misses == 1000
+    assert 200 < cache.num_misses < 300
+
+
+def test_inconsistent_outcomes():
+    cache = ExecutionCache()
+    cache.put(Input(0), outcome(0))
+    cache.put(Input(0), outcome(0))
+    assert cache.num_inconsistent == 0
+    cache.put(Input(0), outcome(1))
+    assert cache.num_inconsistent == 1
+    assert cache.get(Input(0)) == outcome(1)
+
+
+def build_fuzzer(limits: ResourceLimits, inputs) -> Fuzzer:
+    app = App(image='app',
+              workspace='/ws',
+              launch_filename='/ws/app.launch',
+              launch_prefix=None,
+              description=None)
+    fuzzer = Fuzzer(rsw=None,
+                    app=app,
+                    inject=None,
+                    inputs=inputs,
+                    detectors=[lambda app, has_failed: None],
+                    resource_limits=limits,
+                    cache=ExecutionCache())
+    fuzzer.executed = []
+
+    def execute(inp):
+        fuzzer.executed.append(inp)
+        return outcome(inp.value)
+
+    fuzzer.execute = execute
+    return fuzzer
+
+
+def cycle_inputs(n: int):
+    return itertools.cycle([Input(0, (Add(i),)) for i in range(n)])
+
+
+def test_fuzz_counts_cached_inputs():
+    limits = ResourceLimits(num_inputs=10, count_cached_inputs=True)
+    fuzzer = build_fuzzer(limits, cycle_inputs(4))
+    fuzzer.fuzz()
+    assert len(fuzzer.executed) == 4
+    assert fuzzer.resource_usage.num_inputs == 10
+
+
+def test_fuzz_stops_when_inputs_are_exhausted():
+    limits = ResourceLimits(num_inputs=10, max_consecutive_cached_inputs=50)
+    fuzzer = build_fuzzer(limits, cycle_inputs(4))
+    fuzzer.fuzz()
+    assert len(fuzzer.executed) == 4
+    assert fuzzer.resource_usage.num_inputs == 4
+    assert fuzzer.cache.num_hits == 50
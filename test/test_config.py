@@ -0,0 +1,131 @@
+import textwrap
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from roshammer.cli import cli
+from roshammer.config import CampaignConfig, SeedConfig
+from roshammer.core import (ContainerLimits, CoverageLevel, ResourceLimits,
+                            Sanitiser)
+from roshammer.search import AdaptiveMutator
+
+CONFIG = textwrap.dedent("""
+    image: roswire/helloworld:buggy
+    workspace: /ros_ws
+    launch: /ros_ws/src/ros_tutorials/roscpp_tutorials/launch/listener.launch
+    coverage: function
+    sanitisers: [asan]
+    seeds:
+      - filename: bad.bag
+        topics: [/chatter]
+    detectors:
+      - type: crash
+        nodes: [listener]
+      - type: hang
+        topics: {/chatter: 1.0}
+        window_secs: 5.0
+    num_workers: 2
+    playback:
+      rate: 5.0
+    resource_limits:
+      wall_clock_mins: 60
+      num_inputs: 1000
+""")
+
+
+def test_load(tmp_path):
+    fn = tmp_path / 'campaign.yml'
+    fn.write_text(CONFIG)
+    config = CampaignConfig.load(str(fn))
+    assert config.image == 'roswire/helloworld:buggy'
+    assert config.coverage == CoverageLevel.FUNCTION
+    assert config.sanitisers == (Sanitiser.ASAN,)
+    assert config.seeds == (SeedConfig(str(tmp_path / 'bad.bag'),
+                                       ('/chatter',)),)
+    assert config.num_workers == 2
+    assert config.resource_limits == ResourceLimits(wall_clock_mins=60,
+                                                    num_inputs=1000)
+    assert config.build_injector().rate == 5.0
+    assert len(config.build_detectors()) == 2
+
+
+@pytest.mark.parametrize('line', ['mutator: shuffle',
+                                  'num_workers: 0',
+                                  'colour: blue',
+                                  'detectors: [{type: crash, node: x}]',
+                                  'resource_limits: {num_execs: 10}',
+                                  'memory_budget_mb: 64',
+                                  'container_limits: {memory: 64}',
+                                  'container_limits: {pids: 0}',
+                                  'seeds: [bad.bag]',
+                                  'seeds: [{topics: [/chatter]}]'])
+def test_invalid(line):
+    d = yaml.safe_load(CONFIG)
+    d.update(yaml.safe_load(line))
+    with pytest.raises(ValueError):
+        CampaignConfig.from_dict(d)
+
+
+def test_cli_rejects_invalid_config(tmp_path):
+    fn = tmp_path / 'campaign.yml'
+    fn.write_text(CONFIG + 'mutator: shuffle\n')
+    result = CliRunner().invoke(cli, ['fuzz', str(fn)])
+    assert result.exit_code != 0
+    assert 'unknown mutator' in result.output
+
+
+def test_cli_distill_requires_coverage(tmp_path):
+    fn = tmp_path / 'campaign.yml'
+    fn.write_text(CONFIG.replace('coverage: function', 'coverage: disabled'))
+    out = tmp_path / 'distilled.yml'
+    result = CliRunner().invoke(cli, ['distill', str(fn), str(out)])
+    assert result.exit_code != 0
+    assert 'coverage must be enabled' in result.output
+
+
+def test_adaptive_mutator():
+    d = yaml.safe_load(CONFIG)
+    d['mutator'] = 'adaptive'
+    config = CampaignConfig.from_dict(d)
+    assert isinstance(config.build_mutator(), AdaptiveMutator)
+
+
+def test_tmpfs_workspace():
+    d = yaml.safe_load(CONFIG)
+    assert not CampaignConfig.from_dict(d).tmpfs_workspace
+    d['tmpfs_workspace'] = True
+    assert CampaignConfig.from_dict(d).tmpfs_workspace
+
+
+def test_memory_budget():
+    d = yaml.safe_load(CONFIG)
+    d['num_workers'] = 1
+    assert CampaignConfig.from_dict(d).memory_budget_mb is None
+    d['memory_budget_mb'] = 64
+    assert CampaignConfig.from_dict(d).memory_budget_mb == 64
+    d['memory_budget_mb'] = 0
+    with pytest.raises(ValueError):
+        CampaignConfig.from_dict(d)
+
+
+def test_container_limits():
+    d = yaml.safe_load(CONFIG)
+    config = CampaignConfig.from_dict(d)
+    assert config.container_limits == ContainerLimits()
+    assert not config.load_aware
+    d['container_limits'] = {'cpus': 0.5, 'memory_mb': 256}
+    d['load_aware'] = True
+    config = CampaignConfig.from_dict(d)
+    assert config.container_limits == ContainerLimits(cpus=0.5, memory_mb=256)
+    assert config.load_aware
+
+
+def test_cli_rejects_bad_seed(tmp_path):
+    d = yaml.safe_load(CONFIG)
+    d['seeds'] = ['bad.bag']
+    fn = tmp_path / 'campaign.yml'
+    fn.write_text(yaml.safe_dump(d))
+    result = CliRunner().invoke(cli, ['fuzz', str(fn)])
+    assert result.exit_code != 0
+    assert 'seed must have a filename' in result.output
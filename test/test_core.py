@@ -0,0 +1,188 @@
+import contextlib
+import types
+
+import attr
+
+import pytest
+
+import roshammer.core
+from roshammer.core import (App, AppContainer, CampaignStats, ContainerLimits,
+                            ContainerOOM, Execution, Fuzzer, Input)
+
+
+class FakeROS:
+    def __init__(self) -> None:
+        self.nodes = {}
+
+    def launch(self, filename, prefix=None) -> None:
+        pass
+
+
+class FakeSystem:
+    uuid = 'container'
+
+    @contextlib.contextmanager
+    def roscore(self):
+        yield FakeROS()
+
+
+def build_fuzzer(monkeypatch, checkpoint: bool):
+    """Builds a fuzzer for an application whose containers are faked.
+    Returns the fuzzer along with a log of container events."""
+    events = []
+    fake_rsw = types.SimpleNamespace(
+        client_docker=types.SimpleNamespace(api=None))
+
+    @contextlib.contextmanager
+    def provision(self, rsw):
+        events.append('provision')
+        yield AppContainer(self, FakeSystem(), rsw)
+        events.append('release')
+
+    @contextlib.contextmanager
+    def launch(self):
+        events.append('launch')
+        yield None
+
+    @contextlib.contextmanager
+    def restore(self, name):
+        events.append(f'restore:{name}')
+        yield None
+
+    monkeypatch.setattr(App, 'provision', provision)
+    monkeypatch.setattr(AppContainer, 'launch', launch)
+    monkeypatch.setattr(AppContainer, 'restore', restore)
+    monkeypatch.setattr(roshammer.core, '_wait_for_nodes', lambda ros: None)
+    monkeypatch.setattr(roshammer.core, '_create_checkpoint',
+                        lambda api, container, name: checkpoint)
+
+    app = App(image='app',
+              workspace='/ws',
+              launch_filename='/ws/app.launch',
+              launch_prefix=None,
+              description=None)
+    fuzzer = Fuzzer(rsw=fake_rsw,
+                    app=app,
+                    inject=None,
+                    inputs=iter(()),
+                    detectors=[lambda app, has_failed: None],
+                    snapshot=True)
+    return fuzzer, events
+
+
+def launch_twice(fuzzer: Fuzzer) -> None:
+    for _ in range(2):
+        with fuzzer._provision() as container:
+            with fuzzer._launch(container):
+                pass
+
+
+def test_snapshot_falls_back_to_launch(monkeypatch):
+    fuzzer, events = build_fuzzer(monkeypatch, checkpoint=False)
+    launch_twice(fuzzer)
+    assert not fuzzer.snapshot
+    assert events == ['provision', 'release',
+                      'provision', 'launch', 'release',
+                      'provision', 'launch', 'release']
+    fuzzer.close()
+    assert events.count('release') == 3
+
+
+def test_snapshot_restores_checkpoint(monkeypatch):
+    fuzzer, events = build_fuzzer(monkeypatch, checkpoint=True)
+    launch_twice(fuzzer)
+    assert fuzzer.snapshot
+    assert events == ['provision', 'restore:roshammer', 'restore:roshammer']
+    fuzzer.close()
+    assert events[-1] == 'release'
+
+
+def test_campaign_stats():
+    stats = CampaignStats()
+    assert str(stats).startswith('execs: 0 ')
+    stats.start()
+    stats.record(Execution(1.0, [], None, {'launch': 2.0, 'inject': 1.0}))
+    stats.record(Execution(1.0, [], None, {'launch': 4.0, 'inject': 1.0}))
+    assert stats.num_executions == 2
+    assert stats.mean_phase_secs == {'launch': 3.0, 'inject': 1.0}
+    assert 'launch=3.00s inject=1.00s' in str(stats)
+
+
+def test_container_limits():
+    assert ContainerLimits().to_docker() == {}
+    limits = ContainerLimits(cpus=1.5, memory_mb=512, pids=64)
+    assert limits.to_docker() == {'CpuPeriod': 100000,
+                                  'CpuQuota': 150000,
+                                  'Memory': 512 * 1024 * 1024,
+                                  'MemorySwap': 512 * 1024 * 1024,
+                                  'PidsLimit': 64}
+    with pytest.raises(ValueError):
+        ContainerLimits(memory_mb=0)
+
+
+def test_parse_oom_kills():
+    v2 = 'low 0\nhigh 0\nmax 12\noom 3\noom_kill 2\n'
+    v1 = 'oom_kill_disable 0\nunder_oom 0\noom_kill 5\n'
+    assert roshammer.core._parse_oom_kills(v2) == 2
+    assert roshammer.core._parse_oom_kills(v1) == 5
+    assert roshammer.core._parse_oom_kills('') == 0
+
+
+def test_provision_applies_limits(monkeypatch):
+    updates = []
+
+    @contextlib.contextmanager
+    def launch(image, description):
+        yield FakeSystem()
+
+    fake_rsw = types.SimpleNamespace(
+        launch=launch,
+        client_docker=types.SimpleNamespace(api=None))
+    monkeypatch.setattr(roshammer.core, '_update_container',
+                        lambda api, name, limits: updates.append(limits))
+    app = App(image='app',
+              workspace='/ws',
+              launch_filename='/ws/app.launch',
+              launch_prefix=None,
+              description=None)
+    with app.provision(fake_rsw):
+        pass
+    assert updates == []
+    app = attr.evolve(app, limits=ContainerLimits(pids=64))
+    with app.provision(fake_rsw):
+        pass
+    assert updates == [{'PidsLimit': 64}]
+
+
+class FakeDetector(contextlib.AbstractContextManager):
+    failure = None
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+@pytest.mark.parametrize('memory_mb', [None, 256])
+def test_execute_reports_oom(monkeypatch, memory_mb):
+    fuzzer, _ = build_fuzzer(monkeypatch, checkpoint=False)
+    fuzzer.snapshot = False
+    fuzzer.settle_secs = 0.0
+    fuzzer.inject = lambda app, has_failed, inp: None
+    fuzzer.detectors = [lambda app, has_failed: FakeDetector()]
+    fuzzer.app = attr.evolve(fuzzer.app,
+                             limits=ContainerLimits(memory_mb=memory_mb))
+    kills = iter([0, 1])
+    monkeypatch.setattr(AppContainer, 'num_oom_kills',
+                        lambda self: next(kills))
+    monkeypatch.setattr(AppContainer, 'read_coverage', lambda self: None)
+
+    # coverage is read via the container of the app instance
+    @contextlib.contextmanager
+    def launch(self):
+        yield types.SimpleNamespace(container=self)
+
+    monkeypatch.setattr(AppContainer, 'launch', launch)
+    execution = fuzzer.execute(Input(0))
+    if memory_mb is None:
+        assert not execution.failures
+    else:
+        assert execution.failures == frozenset([ContainerOOM(256)])
@@ -0,0 +1,62 @@
+import multiprocessing
+
+import pytest
+
+from roshammer.core import Coverage
+from roshammer.coverage import CoverageMap
+
+
+def test_update():
+    coverage_map = CoverageMap(size_bits=16, num_stripes=8)
+    assert len(coverage_map) == 2 ** 16
+    assert coverage_map.is_novel({1, 2, 3})
+    assert coverage_map.update({1, 2, 3}) == Coverage({1, 2, 3})
+    assert not coverage_map.is_novel({1, 2})
+    assert coverage_map.update({2, 3, 4}) == Coverage({4})
+    assert coverage_map.update(()) == Coverage()
+    assert not coverage_map.is_novel(())
+    assert 4 in coverage_map
+    assert 5 not in coverage_map
+    assert coverage_map.num_covered == 4
+
+
+def test_large_components():
+    coverage_map = CoverageMap()
+    pcs = {0x400000 + 4 * i for i in range(1000)} | {2 ** 64 - 1}
+    novel = coverage_map.update(pcs)
+    assert novel <= pcs
+    assert len(novel) == coverage_map.num_covered
+    assert not coverage_map.is_novel(pcs)
+
+
+def test_illegal_sizes():
+    with pytest.raises(ValueError):
+        CoverageMap(size_bits=0)
+    with pytest.raises(ValueError):
+        CoverageMap(size_bits=8, num_stripes=3)
+    with pytest.raises(ValueError):
+        CoverageMap(size_bits=2, num_stripes=8)
+
+
+def _update(coverage_map, components, novel):
+    novel.put(coverage_map.update(components))
+
+
+def test_shared_between_processes():
+    coverage_map = CoverageMap(size_bits=16)
+    novel = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_update,
+                                       args=(coverage_map,
+                                             range(i, i + 500),
+                                             novel))
+               for i in range(0, 1000, 100)]
+    for worker in workers:
+        worker.start()
+    reported = [novel.get(timeout=10) for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    # each component is reported as new by exactly one worker
+    assert sum(len(r) for r in reported) == len(set().union(*reported))
+    assert set().union(*reported) == set(range(1400))
+    assert not coverage_map.is_novel(range(1400))
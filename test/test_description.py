@@ -0,0 +1,41 @@
+import types
+
+from roswire.definitions import PackageDatabase
+
+from roshammer.core import AppDescription
+from roshammer.description import DescriptionCache
+
+from util import FORMAT_DB_MAVROS, TYPE_DB_MAVROS
+
+
+class FakeDescriptionManager:
+    def __init__(self) -> None:
+        self.num_builds = 0
+
+    def load_or_build(self, image: str) -> AppDescription:
+        self.num_builds += 1
+        return AppDescription(sha256='abc123',
+                              types=TYPE_DB_MAVROS,
+                              formats=FORMAT_DB_MAVROS,
+                              packages=PackageDatabase.from_dict([]))
+
+
+def test_description_cache(tmp_path):
+    manager = FakeDescriptionManager()
+    containers = types.SimpleNamespace(image_sha256=lambda image: 'abc123')
+    rsw = types.SimpleNamespace(workspace=str(tmp_path),
+                                containers=containers,
+                                descriptions=manager)
+
+    cache = DescriptionCache(rsw)
+    first = cache.load_or_build('app')
+    assert cache.load_or_build('app') is first
+    assert manager.num_builds == 1
+    assert (tmp_path / 'roshammer' / 'descriptions' / 'abc123.pickle').exists()
+
+    # a fresh cache (e.g., in a new worker process) loads from disk
+    loaded = DescriptionCache(rsw).load_or_build('app')
+    assert manager.num_builds == 1
+    assert loaded.sha256 == 'abc123'
+    assert set(loaded.formats.messages) == set(FORMAT_DB_MAVROS.messages)
+    assert 'geometry_msgs/Vector3' in loaded.types
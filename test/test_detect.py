@@ -0,0 +1,119 @@
+import itertools
+import threading
+import time
+import types
+
+from roshammer.detect import NodeHung, NodeHangDetector
+
+
+class FakeNodeHangDetector(NodeHangDetector):
+    """Replays a given stream of message counts and CPU usage."""
+    def __init__(self, counts, cpu, **kwargs) -> None:
+        self.counts = counts
+        self.cpu = cpu
+        self.topics = kwargs['topics']
+        super().__init__(None, threading.Event(), interval_secs=0.01, **kwargs)
+
+    def _count_messages(self):
+        return {topic: next(self.counts) for topic in self.topics}
+
+    def _measure_cpu(self):
+        return {'node': next(self.cpu)}
+
+
+def run(detector: NodeHangDetector, timeout_secs: float = 1.0):
+    with detector:
+        detector._has_failed.wait(timeout_secs)
+    return detector.failure
+
+
+def test_healthy():
+    detector = FakeNodeHangDetector(counts=itertools.count(),
+                                    cpu=itertools.repeat(50.0),
+                                    topics={'/out': 10.0},
+                                    nodes=['node'],
+                                    window_secs=0.1,
+                                    spin_cpu_percent=95.0,
+                                    idle_cpu_percent=1.0)
+    assert run(detector, 0.5) is None
+
+
+def test_topic_stalls():
+    counts = itertools.chain(range(20), itertools.repeat(20))
+    detector = FakeNodeHangDetector(counts=counts,
+                                    cpu=itertools.repeat(50.0),
+                                    topics={'/out': 10.0},
+                                    nodes=['node'],
+                                    window_secs=0.1,
+                                    spin_cpu_percent=95.0,
+                                    idle_cpu_percent=None)
+    started_at = time.time()
+    failure = run(detector)
+    assert isinstance(failure, NodeHung)
+    assert 'rate of /out' in failure.reason
+    assert time.time() - started_at < 1.0
+
+
+def test_node_spins():
+    detector = FakeNodeHangDetector(counts=itertools.count(),
+                                    cpu=itertools.repeat(100.0),
+                                    topics={},
+                                    nodes=['node'],
+                                    window_secs=0.1,
+                                    spin_cpu_percent=95.0,
+                                    idle_cpu_percent=None)
+    assert run(detector) == NodeHung('node', 'spinning at 100% CPU')
+
+
+def test_node_idles():
+    detector = FakeNodeHangDetector(counts=itertools.count(),
+                                    cpu=itertools.repeat(0.0),
+                                    topics={},
+                                    nodes=['node'],
+                                    window_secs=0.1,
+                                    spin_cpu_percent=95.0,
+                                    idle_cpu_percent=1.0)
+    assert run(detector) == NodeHung('node', 'idle at 0% CPU')
+
+
+def build_late_publisher():
+    """Builds a fake app instance whose /talker node only advertises /out
+    once the system state has been polled once, and then publishes a
+    message on each poll of its bus stats."""
+    states = itertools.chain([[]], itertools.repeat([['/out', ['/talker']]]))
+    sent = itertools.count(1)
+    connection = types.SimpleNamespace(
+        getSystemState=lambda caller: (1, '', [next(states), [], []]))
+    api = types.SimpleNamespace(
+        getBusStats=lambda caller: (1, '', [[['/out', 0,
+                                              [[0, 0, next(sent), True]]]],
+                                            [], []]))
+    nodes = {'/talker': types.SimpleNamespace(api=api)}
+    ros = types.SimpleNamespace(connection=connection, nodes=nodes)
+    return types.SimpleNamespace(ros=ros)
+
+
+def test_publishers_appear_late():
+    detector = NodeHangDetector(build_late_publisher(),
+                                threading.Event(),
+                                topics={'/out': 10.0},
+                                nodes=[],
+                                window_secs=0.1,
+                                spin_cpu_percent=None,
+                                idle_cpu_percent=None,
+                                interval_secs=0.01)
+    assert detector._count_messages() == {'/out': 0}
+    assert detector._count_messages() == {'/out': 1}
+    assert detector._count_messages() == {'/out': 2}
+
+
+def test_late_publishers_are_not_hung():
+    detector = NodeHangDetector(build_late_publisher(),
+                                threading.Event(),
+                                topics={'/out': 10.0},
+                                nodes=[],
+                                window_secs=0.1,
+                                spin_cpu_percent=None,
+                                idle_cpu_percent=None,
+                                interval_secs=0.01)
+    assert run(detector, 0.5) is None
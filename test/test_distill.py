@@ -0,0 +1,58 @@
+import pytest
+
+from roshammer.core import App, Coverage, Execution, Fuzzer, Input
+from roshammer.detect import NodeCrashed
+from roshammer.distill import distill, select_covering_subset
+
+
+def test_select_covering_subset():
+    coverages = [Coverage({1, 2}),
+                 Coverage({1, 2, 3, 4}),
+                 Coverage({3, 4}),
+                 Coverage({5}),
+                 None,
+                 Coverage()]
+    costs = [1.0] * len(coverages)
+    sizes = [1.0] * len(coverages)
+    assert select_covering_subset(coverages, costs, sizes) == [1, 3]
+
+
+def test_select_prefers_faster_and_smaller():
+    coverages = [Coverage({1, 2}), Coverage({1, 2}), Coverage({1, 2})]
+    assert select_covering_subset(coverages, [2.0, 1.0, 1.0],
+                                  [1.0, 5.0, 3.0]) == [2]
+
+
+def test_select_drops_redundant_candidates():
+    # greedy selects the cheap {1, 2} first, which {1, 2, 3} later subsumes
+    coverages = [Coverage({1, 2}), Coverage({1, 2, 3}), Coverage({4})]
+    selected = select_covering_subset(coverages, [0.1, 1.0, 1.0],
+                                      [1.0, 1.0, 1.0])
+    assert sorted(selected) == [1, 2]
+
+
+class CoverageFuzzer(Fuzzer):
+    """Covers the components listed by each seed, and fails on any seed
+    that covers zero."""
+    def execute(self, inp: Input) -> Execution:
+        seed = inp.value
+        failures = [NodeCrashed('node')] if 0 in seed else []
+        return Execution(1.0, failures, Coverage(seed))
+
+
+def test_distill():
+    app = App(image='app',
+              workspace='/ws',
+              launch_filename='/ws/app.launch',
+              launch_prefix=None,
+              description=None)
+    fuzzer = CoverageFuzzer(rsw=None,
+                            app=app,
+                            inject=None,
+                            inputs=iter(()),
+                            detectors=[lambda app, has_failed: None])
+    seeds = [(1, 2), (2, 3), (1, 2, 3), (0, 4), (3,), (5,)]
+    selected = distill(fuzzer, seeds, num_workers=3)
+    assert sorted(selected) == [2, 5]
+    with pytest.raises(ValueError):
+        distill(fuzzer, seeds, num_workers=0)
@@ -0,0 +1,140 @@
+import os
+import time
+
+import attr
+import pytest
+
+import roshammer.roshammer
+import roshammer.distributed
+from roshammer.core import (App, Coverage, Execution, Input, Mutation,
+                            SeedSerialiser)
+from roshammer.distributed import Coordinator
+from roshammer.load import LoadGovernor
+
+
+@attr.s(frozen=True)
+class Add(Mutation[int]):
+    amount: int = attr.ib()
+
+    def __call__(self, x: int) -> int:
+        return x + self.amount
+
+
+class IntSerialiser(SeedSerialiser[int]):
+    def dumps(self, seed: int) -> bytes:
+        return str(seed).encode('utf-8')
+
+    def loads(self, description, data: bytes) -> int:
+        return int(data.decode('utf-8'))
+
+
+class FakeROSHammer:
+    def __init__(self, rsw) -> None:
+        pass
+
+    def app(self, image, workspace, launch_filename, launch_prefix):
+        return build_app()
+
+
+class FakeFuzzer:
+    """Covers the value of each input together with a shared component.
+    Inputs with a value of 13 raise an error, inputs with a value of 7 kill
+    the worker, and inputs with a value of 42 take two seconds."""
+    def __init__(self, **kwargs) -> None:
+        pass
+
+    def execute(self, inp: Input[int]) -> Execution:
+        value = inp.value
+        if value == 13:
+            raise ValueError('unlucky')
+        if value == 7:
+            os._exit(1)
+        if value == 42:
+            time.sleep(2.0)
+        time.sleep(0.05)
+        return Execution(0.05, [], Coverage({value, 1000}))
+
+    def close(self) -> None:
+        pass
+
+
+def build_app() -> App:
+    return App(image='app',
+               workspace='/ws',
+               launch_filename='/ws/app.launch',
+               launch_prefix=None,
+               description=None)
+
+
+@pytest.mark.parametrize('coverage_map_bits', [None, 20])
+def test_coordinator(monkeypatch, coverage_map_bits):
+    monkeypatch.setattr(roshammer.distributed, 'ROSWire', lambda d: None)
+    monkeypatch.setattr(roshammer.distributed, 'Fuzzer', FakeFuzzer)
+    monkeypatch.setattr(roshammer.roshammer, 'ROSHammer', FakeROSHammer)
+
+    seed = 1
+    inputs = [Input(seed, (Add(i),)) for i in range(20)]
+    inputs.append(Input(seed, (Add(1),)))
+    coordinator = Coordinator(app=build_app(),
+                              inject=None,
+                              inputs=iter(inputs),
+                              detectors=[],
+                              serialiser=IntSerialiser(),
+                              num_local_workers=3,
+                              coverage_map_bits=coverage_map_bits)
+    coordinator.fuzz()
+
+    errors = dict(coordinator.errors)
+    assert errors.keys() == {Input(seed, (Add(12),)), Input(seed, (Add(6),))}
+    assert 'unlucky' in errors[Input(seed, (Add(12),))]
+    assert 'terminated' in errors[Input(seed, (Add(6),))]
+
+    executed = set(range(1, 21)) - {7, 13}
+    assert coordinator.coverage == executed | {1000}
+    assert coordinator.resource_usage.num_inputs == len(inputs)
+    assert len(coordinator.corpus) == len(executed)
+    assert set(inp.value for inp in coordinator.corpus) == executed
+
+
+def test_coordinator_governor(monkeypatch):
+    monkeypatch.setattr(roshammer.distributed, 'ROSWire', lambda d: None)
+    monkeypatch.setattr(roshammer.distributed, 'Fuzzer', FakeFuzzer)
+    monkeypatch.setattr(roshammer.roshammer, 'ROSHammer', FakeROSHammer)
+
+    governor = LoadGovernor(2)
+    calls = []
+    monkeypatch.setattr(governor, 'update', lambda: calls.append(1) or 1)
+    inputs = [Input(1, (Add(i),)) for i in range(1, 6)]
+    coordinator = Coordinator(app=build_app(),
+                              inject=None,
+                              inputs=iter(inputs),
+                              detectors=[],
+                              serialiser=IntSerialiser(),
+                              num_local_workers=2,
+                              governor=governor)
+    coordinator.fuzz()
+    assert coordinator.resource_usage.num_inputs == len(inputs)
+    assert len(calls) >= len(inputs)
+
+
+def test_coordinator_merges_late_results(monkeypatch):
+    monkeypatch.setattr(roshammer.distributed, 'ROSWire', lambda d: None)
+    monkeypatch.setattr(roshammer.distributed, 'Fuzzer', FakeFuzzer)
+    monkeypatch.setattr(roshammer.roshammer, 'ROSHammer', FakeROSHammer)
+
+    slow = Input(1, (Add(41),))
+    inputs = [slow] + [Input(1, (Add(i),)) for i in range(50, 80)]
+    coordinator = Coordinator(app=build_app(),
+                              inject=None,
+                              inputs=iter(inputs),
+                              detectors=[],
+                              serialiser=IntSerialiser(),
+                              num_local_workers=1,
+                              task_timeout_secs=0.5)
+    coordinator.fuzz()
+
+    # the slow task is abandoned, but its coverage is still merged
+    assert 'timed out' in dict(coordinator.errors)[slow]
+    assert 42 in coordinator.coverage
+    assert slow in coordinator.corpus
+    assert coordinator.resource_usage.num_inputs == len(inputs)
@@ -0,0 +1,93 @@
+import os
+import shutil
+import subprocess
+import types
+
+import numpy as np
+import pytest
+
+from roshammer import hitcount
+from roshammer.core import App, AppContainer, Coverage, CoverageLevel
+from roshammer.hitcount import (HITS_MAP_ENV, HITS_MAP_SIZE, clear_hits,
+                                read_hits)
+
+DRIVER = r"""
+#include <stdint.h>
+void __sanitizer_cov_trace_pc_guard_init(uint32_t *, uint32_t *);
+void __sanitizer_cov_trace_pc_guard(uint32_t *);
+static uint32_t guards[3];
+int main(void) {
+  int i;
+  __sanitizer_cov_trace_pc_guard_init(guards, guards + 3);
+  for (i = 0; i < 5; i++) {
+    __sanitizer_cov_trace_pc_guard(&guards[0]);
+    __sanitizer_cov_trace_pc_guard(&guards[1]);
+  }
+  __sanitizer_cov_trace_pc_guard(&guards[2]);
+  return 0;
+}
+"""
+
+
+def test_read_hits(tmp_path):
+    fn = str(tmp_path / 'hits.map')
+    clear_hits(fn)
+    assert os.path.getsize(fn) == HITS_MAP_SIZE
+    assert read_hits(fn).size == 0
+
+    hits = np.memmap(fn, dtype=np.uint8, mode='r+')
+    hits[10] = 1
+    hits[20] = 3
+    hits[30] = 200
+    hits.flush()
+    assert read_hits(fn).tolist() == [10 << 3, (20 << 3) | 2, (30 << 3) | 7]
+
+    # loop counts that fall into a new bucket are new components
+    hits[20] = 6
+    hits.flush()
+    assert (20 << 3) | 3 in read_hits(fn).tolist()
+
+    clear_hits(fn)
+    assert read_hits(fn).size == 0
+
+
+def test_app_container(tmp_path):
+    app = App(image='app',
+              workspace='/ws',
+              launch_filename='/ws/app.launch',
+              launch_prefix=None,
+              description=None,
+              coverage=CoverageLevel.EDGE_HITS)
+    system = types.SimpleNamespace(ws_host=str(tmp_path))
+    container = AppContainer(app, system, None)
+    container.clear_coverage()
+    fn = str(tmp_path / hitcount.HITS_MAP_FILENAME)
+    hits = np.memmap(fn, dtype=np.uint8, mode='r+')
+    hits[5] = 1
+    hits.flush()
+    assert container.read_coverage() == Coverage({5 << 3})
+
+
+@pytest.mark.skipif(shutil.which('cc') is None, reason='requires compiler')
+def test_runtime(tmp_path):
+    fn_runtime = tmp_path / 'hitcount.c'
+    fn_driver = tmp_path / 'driver.c'
+    fn_exe = str(tmp_path / 'driver')
+    fn_runtime.write_text(hitcount._RUNTIME_SOURCE)
+    fn_driver.write_text(DRIVER)
+    subprocess.check_call(['cc', '-O2', str(fn_driver), str(fn_runtime),
+                           '-ldl', '-o', fn_exe])
+
+    fn_hits = str(tmp_path / 'hits.map')
+    clear_hits(fn_hits)
+    env = dict(os.environ, **{HITS_MAP_ENV: fn_hits})
+    subprocess.check_call([fn_exe], env=env)
+    first = read_hits(fn_hits)
+    buckets = sorted((first & 7).tolist())
+    # entry, 0 -> 1 (x5), 1 -> 0 (x4), and 1 -> 2 (x1)
+    assert buckets == [0, 0, 3, 3]
+
+    # edge locations are stable across executions
+    clear_hits(fn_hits)
+    subprocess.check_call([fn_exe], env=env)
+    assert read_hits(fn_hits).tolist() == first.tolist()
@@ -0,0 +1,94 @@
+import types
+
+import pytest
+from docker.errors import APIError as DockerAPIError
+
+import roshammer.load
+from roshammer.load import HostLoad, LoadGovernor
+
+IDLE = HostLoad(cpu_percent=10.0, memory_percent=20.0, available_bytes=10 ** 9)
+BUSY = HostLoad(cpu_percent=99.0, memory_percent=20.0, available_bytes=10 ** 9)
+
+
+def test_additive_increase_multiplicative_decrease():
+    governor = LoadGovernor(8)
+    assert governor.concurrency == 1
+    for expected in [2, 3, 4, 5, 6, 7, 8, 8]:
+        assert governor.adjust(IDLE) == expected
+    assert governor.adjust(BUSY) == 4
+    assert governor.adjust(BUSY) == 2
+    assert governor.adjust(BUSY) == 1
+    assert governor.adjust(BUSY) == 1
+
+
+def test_memory_pressure():
+    governor = LoadGovernor(4)
+    full = HostLoad(10.0, 95.0, 10 ** 8)
+    assert governor.adjust(IDLE) == 2
+    assert governor.adjust(full) == 1
+
+    # containers that would not fit in the available memory are not added
+    tight = HostLoad(10.0, 50.0, 10 ** 8, container_bytes=2 * 10 ** 8)
+    assert governor.adjust(tight) == 1
+    roomy = HostLoad(10.0, 50.0, 10 ** 9, container_bytes=2 * 10 ** 8)
+    assert governor.adjust(roomy) == 2
+
+
+def test_update_interval(monkeypatch):
+    governor = LoadGovernor(4, interval_secs=5.0)
+    now = [0.0]
+    governor._clock = lambda: now[0]
+    monkeypatch.setattr(governor, 'measure', lambda: IDLE)
+    assert governor.update() == 2
+    now[0] = 4.0
+    assert governor.update() == 2
+    now[0] = 5.0
+    assert governor.update() == 3
+
+
+def test_docker_stats(monkeypatch):
+    # mirrors docker-py 3.7, whose stats do not accept a one_shot argument
+    def container(usage):
+        stats = {'memory_stats': {'usage': usage}}
+        return types.SimpleNamespace(stats=lambda stream: stats)
+
+    images = {'app': [container(100), container(300)], 'other': []}
+    containers = types.SimpleNamespace(
+        list=lambda filters: images[filters['ancestor']])
+    client = types.SimpleNamespace(containers=containers)
+    assert roshammer.load._container_bytes(client, 'app') == 200
+    assert roshammer.load._container_bytes(client, 'other') is None
+
+    governor = LoadGovernor(2, client_docker=client, image='app')
+    assert governor.measure().container_bytes == 200
+
+
+def test_docker_stats_errors():
+    def stats(stream):
+        raise DockerAPIError('no such container')
+
+    containers = types.SimpleNamespace(
+        list=lambda filters: [types.SimpleNamespace(stats=stats)])
+    client = types.SimpleNamespace(containers=containers)
+    assert roshammer.load._container_bytes(client, 'app') is None
+
+
+def test_primes_cpu_utilisation(monkeypatch):
+    calls = []
+    monkeypatch.setattr(roshammer.load.psutil, 'cpu_percent',
+                        lambda interval: calls.append(interval) or 50.0)
+    governor = LoadGovernor(2)
+    assert calls == [None]
+    assert governor.measure().cpu_percent == 50.0
+    assert calls == [None, None]
+
+
+@pytest.mark.parametrize('kwargs', [{'max_concurrency': 2,
+                                     'min_concurrency': 0},
+                                    {'max_concurrency': 2,
+                                     'min_concurrency': 3},
+                                    {'max_concurrency': 2,
+                                     'client_docker': object()}])
+def test_invalid(kwargs):
+    with pytest.raises(ValueError):
+        LoadGovernor(**kwargs)
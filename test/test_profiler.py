@@ -0,0 +1,23 @@
+import time
+
+from roshammer.profiler import SamplingProfiler
+
+
+def busy_wait(secs: float) -> None:
+    stop_at = time.time() + secs
+    while time.time() < stop_at:
+        pass
+
+
+def test_profiler(tmp_path):
+    with SamplingProfiler(interval_secs=0.001) as profiler:
+        busy_wait(0.2)
+    assert profiler.num_samples > 10
+    frame, fraction = profiler.hotspots(1)[0]
+    assert frame.startswith('busy_wait')
+
+    fn = tmp_path / 'profile.txt'
+    profiler.write(str(fn))
+    lines = fn.read_text().splitlines()
+    assert any('test_profiler' in line and 'busy_wait' in line
+               for line in lines)
@@ -0,0 +1,150 @@
+import itertools
+import pickle
+import random
+
+from roshammer.core import Execution, Input, Mutation, PackedInputs
+from roshammer.search import AdaptiveMutator, ExhaustiveInputGenerator
+
+import attr
+import pytest
+
+
+@attr.s(frozen=True)
+class Add(Mutation[int]):
+    amount: int = attr.ib()
+
+    def __call__(self, x: int) -> int:
+        return x + self.amount
+
+
+def add_up_to_seed(seed: int):
+    return [Add(i) for i in range(seed)]
+
+
+def test_exhaustive():
+    inputs = ExhaustiveInputGenerator([2, 3], add_up_to_seed)
+    assert len(inputs) == 5
+    values = [inp.value for inp in inputs]
+    assert values == [2, 3, 3, 4, 5]
+
+
+def test_exhaustive_resume():
+    inputs = ExhaustiveInputGenerator([2, 3], add_up_to_seed)
+    first = [next(inputs), next(inputs)]
+    resumed = ExhaustiveInputGenerator([2, 3], add_up_to_seed,
+                                       cursor=inputs.cursor)
+    assert first + list(resumed) == \
+        list(ExhaustiveInputGenerator([2, 3], add_up_to_seed))
+
+
+def test_exhaustive_shards():
+    everything = list(ExhaustiveInputGenerator([4, 5], add_up_to_seed))
+    shards = [list(ExhaustiveInputGenerator([4, 5], add_up_to_seed,
+                                            shard=i, num_shards=3))
+              for i in range(3)]
+    assert sum(len(s) for s in shards) == len(everything)
+    assert set(everything) == set(itertools.chain(*shards))
+
+
+def test_exhaustive_skips_executed():
+    executed = {Input(2, (Add(0),)), Input(3, (Add(2),))}
+    inputs = ExhaustiveInputGenerator([2, 3], add_up_to_seed,
+                                      executed=executed)
+    assert [inp.value for inp in inputs] == [3, 3, 4]
+
+
+def test_input_mutate_shares_prefix():
+    parent = Input(0, (Add(1), Add(2)))
+    left = parent.mutate(Add(3))
+    right = parent.mutate(Add(4))
+    assert left.parent is parent
+    assert right.parent is parent
+    assert left.depth == right.depth == 3
+    assert left.mutations == (Add(1), Add(2), Add(3))
+    assert left.value == 6
+    assert right.value == 7
+
+
+def test_input_deep_chain():
+    inp = Input(0)
+    for _ in range(100000):
+        inp = inp.mutate(Add(1))
+    assert inp.depth == 100000
+    assert inp.value == 100000
+    assert hash(inp) == hash(Input(0, inp.mutations))
+
+
+def test_input_equality():
+    chain = Input(1).mutate(Add(2)).mutate(Add(3))
+    flat = Input(1, (Add(2), Add(3)))
+    assert chain == flat
+    assert hash(chain) == hash(flat)
+    assert chain.parent == Input(1, (Add(2),))
+    assert chain != Input(1, (Add(3), Add(2)))
+    assert chain != Input(2, (Add(2), Add(3)))
+    assert Input(1) == Input(1, ())
+    assert len({chain, flat, Input(1)}) == 2
+
+
+def test_input_pickle():
+    inp = Input(1, (Add(2), Add(3)))
+    assert pickle.loads(pickle.dumps(inp)) == inp
+
+
+def test_packed_inputs():
+    parent = Input(0, (Add(1), Add(2)))
+    inputs = [parent.mutate(Add(3)), parent.mutate(Add(4)), Input(5), parent]
+    packed = PackedInputs.pack(inputs)
+    assert len(packed) == 4
+    assert packed.seeds == (0, 5)
+    assert len(packed.nodes) == 4
+
+    unpacked = pickle.loads(pickle.dumps(packed)).unpack()
+    assert unpacked == inputs
+    assert unpacked[0].parent is unpacked[1].parent
+    assert unpacked[0].parent is unpacked[3]
+
+
+def test_adaptive_mutator_learns():
+    random.seed(0)
+    operators = {'add': lambda x: Add(1),
+                 'nop': lambda x: Add(0),
+                 'never': lambda x: None}
+    mutator = AdaptiveMutator(operators, max_stack=1, exploration=0.1)
+    assert mutator.probabilities['add'] == pytest.approx(1 / 3)
+    for _ in range(200):
+        inp = mutator(Input(0))
+        novel = 1 if inp.value else 0
+        mutator.observe(inp, Execution(1.0, [], None), novel)
+    stats = mutator.stats
+    assert stats['never'].num_uses == 0
+    assert stats['add'].yield_rate == 1.0
+    assert stats['nop'].yield_rate == 0.0
+    assert stats['add'].num_uses > stats['nop'].num_uses
+    assert mutator.probabilities['add'] > 0.5
+    assert mutator.probabilities['nop'] < 0.1
+    assert mutator.probabilities['never'] >= 0.1 / 3
+
+
+def test_adaptive_mutator_stacks():
+    random.seed(0)
+    mutator = AdaptiveMutator({'add': lambda x: Add(1)}, max_stack=8)
+    sizes = set(len(mutator(Input(0)).mutations) for _ in range(100))
+    assert sizes == {1, 2, 4, 8}
+
+
+def test_adaptive_mutator_forgets_unexecuted_inputs():
+    mutator = AdaptiveMutator({'add': lambda x: Add(1)}, max_pending=3)
+    inputs = [mutator(Input(i)) for i in range(5)]
+    mutator.observe(inputs[0], Execution(1.0, [], None), 1)
+    assert mutator.stats['add'].num_uses == 0
+    mutator.observe(inputs[4], Execution(1.0, [], None), 1)
+    mutator.observe(inputs[4], Execution(1.0, [], None), 1)
+    assert mutator.stats['add'].num_uses == 1
+
+
+def test_adaptive_mutator_gives_up():
+    mutator = AdaptiveMutator({'never': lambda x: None})
+    assert mutator(Input(0)) == Input(0)
+    with pytest.raises(ValueError):
+        AdaptiveMutator({})
@@ -0,0 +1,186 @@
+import gc
+import random
+import weakref
+
+import attr
+import pytest
+
+from roshammer.core import (Coverage, Execution, Input, Mutation, Mutator,
+                            SeedSerialiser)
+from roshammer.bag import Bag
+from roshammer.search import CorpusInputGenerator
+from roshammer.store import CorpusStore
+
+
+@attr.s(frozen=True)
+class Append(Mutation[bytes]):
+    suffix: bytes = attr.ib()
+
+    def __call__(self, x: bytes) -> bytes:
+        return x + self.suffix
+
+
+class AppendMutator(Mutator[bytes]):
+    def __call__(self, inp: Input[bytes]) -> Input[bytes]:
+        return inp.mutate(Append(b'x'))
+
+
+class BytesSerialiser(SeedSerialiser[bytes]):
+    def dumps(self, seed: bytes) -> bytes:
+        return seed
+
+    def loads(self, description, data: bytes) -> bytes:
+        return bytes(data)
+
+
+class Blob:
+    """A seed that, unlike bytes, supports weak references."""
+    __slots__ = ('data', '__weakref__')
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+
+class BlobSerialiser(SeedSerialiser[Blob]):
+    def dumps(self, seed: Blob) -> bytes:
+        return seed.data
+
+    def loads(self, description, data: bytes) -> Blob:
+        return Blob(bytes(data))
+
+
+def build_store(budget_bytes: int, tmp_path) -> CorpusStore[bytes]:
+    return CorpusStore(BytesSerialiser(), None, budget_bytes,  # type: ignore
+                       dir_spill=str(tmp_path), decoded_overhead=1.0)
+
+
+def seed(i: int, size: int = 1000) -> bytes:
+    return bytes([i]) * size
+
+
+def test_unbounded(tmp_path):
+    store = build_store(10 ** 6, tmp_path)
+    a = store.add_seed(seed(1))
+    b = store.append(Input(seed(2)).mutate(Append(b'x')))
+    assert len(store) == 2
+    assert store.num_seeds == 2
+    assert store.get(a).value == seed(1)
+    assert store.get(b).value == seed(2) + b'x'
+    assert store.num_decoded == 2
+    assert store.stats.num_reloads == 0
+    assert store.stats.num_hits == 2
+
+
+def test_shares_seeds(tmp_path):
+    store = build_store(10 ** 6, tmp_path)
+    store.add_seed(seed(1))
+    inp = store.get(0).mutate(Append(b'x'))
+    store.append(inp)
+    store.append(Input(seed(1)).mutate(Append(b'y')))
+    assert len(store) == 3
+    assert store.num_seeds == 1
+
+
+def test_evicts_and_reloads(tmp_path):
+    # repetitive seeds compress well, so only decoded seeds are evicted
+    with build_store(2500, tmp_path) as store:
+        for i in range(5):
+            store.add_seed(seed(i))
+        assert store.resident_bytes <= store.budget_bytes
+        assert store.num_decoded == 2
+        assert store.num_spilled == 0
+        assert [inp.value for inp in store] == [seed(i) for i in range(5)]
+        assert store.stats.num_reloads >= 3
+        assert store.stats.num_disk_reads == 0
+        assert store.stats.mean_reload_secs >= 0.0
+
+
+def test_spills(tmp_path):
+    # random seeds do not compress, and so they are spilled to disk
+    seeds = [bytes(random_bytes(i)) for i in range(4)]
+    with build_store(1500, tmp_path) as store:
+        for s in seeds:
+            store.add_seed(s)
+        assert store.resident_bytes <= store.budget_bytes
+        assert store.num_spilled >= 2
+        assert [inp.value for inp in store] == seeds
+        assert store.stats.num_disk_reads >= 2
+
+
+def test_priority(tmp_path):
+    with build_store(2500, tmp_path) as store:
+        store.add_seed(seed(0))
+        store.add_seed(seed(1))
+        store.set_priority(0, 10.0)
+        store.add_seed(seed(2))
+        store.add_seed(seed(3))
+        assert store.priorities[0] == 10.0
+        hits = store.stats.num_hits
+        store.get(0)
+        assert store.stats.num_hits == hits + 1
+
+
+def test_invalid_budget(tmp_path):
+    with pytest.raises(ValueError):
+        build_store(0, tmp_path)
+
+
+def test_corpus_generator(tmp_path):
+    store = build_store(10 ** 6, tmp_path)
+    store.add_seed(seed(0, 10))
+    store.add_seed(seed(1, 10))
+    inputs = CorpusInputGenerator(store, AppendMutator())
+    for _ in range(10):
+        inp = next(inputs)
+        assert inp.value.endswith(b'x')
+        novel = inp.seed == seed(1, 10)
+        inputs.observe(inp, Execution(1.0, [], Coverage([])), int(novel))
+    assert store.priorities[0] == 1.0
+    assert store.priorities[1] > 1.0
+
+
+def test_corpus_generator_requires_seeds(tmp_path):
+    with pytest.raises(ValueError):
+        CorpusInputGenerator(build_store(100, tmp_path), AppendMutator())
+
+
+def random_bytes(i: int, size: int = 1000) -> bytes:
+    rng = random.Random(i)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def build_blob_store(budget_bytes: int, tmp_path) -> CorpusStore[Blob]:
+    return CorpusStore(BlobSerialiser(), None, budget_bytes,  # type: ignore
+                       dir_spill=str(tmp_path), decoded_overhead=1.0)
+
+
+def test_releases_demoted_seeds(tmp_path):
+    with build_blob_store(2500, tmp_path) as store:
+        store.add_seed(Blob(seed(0)))
+        ref = weakref.ref(store.get(0).seed)
+        for i in range(1, 5):
+            store.add_seed(Blob(seed(i)))
+        gc.collect()
+        assert ref() is None
+        assert store.pinned_bytes == 0
+        assert store.resident_bytes <= store.budget_bytes
+
+
+def test_reuses_pinned_seeds(tmp_path):
+    with build_blob_store(2500, tmp_path) as store:
+        store.add_seed(Blob(seed(0)))
+        held = store.get(0).seed
+        for i in range(1, 5):
+            store.add_seed(Blob(seed(i)))
+        assert store.pinned_bytes >= 1000
+        reloads = store.stats.num_reloads
+        assert store.get(0).seed is held
+        assert store.stats.num_reloads == reloads
+        assert store.stats.num_revivals == 1
+        assert store.append(Input(held)) == len(store) - 1
+        assert store.num_seeds == 5
+
+
+def test_bags_support_weak_references():
+    bag = Bag()
+    assert weakref.ref(bag)() is bag